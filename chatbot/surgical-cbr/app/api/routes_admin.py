@@ -1,8 +1,17 @@
 """Admin and health check routes."""
-from fastapi import APIRouter
-from typing import Dict
+import asyncio
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Any, Dict
+from app.services import reindex, startup
+from app.utils.concurrency import run_db
+from app.utils.metrics import render_metrics
 
 router = APIRouter(prefix="/health", tags=["admin"])
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
+metrics_router = APIRouter(prefix="/metrics", tags=["admin"])
+
+_reindex_task: "asyncio.Task | None" = None
 
 
 @router.get("")
@@ -10,3 +19,55 @@ async def health_check() -> Dict[str, str]:
     """Health check endpoint."""
     return {"status": "ok"}
 
+
+@router.get("/live")
+async def liveness() -> Dict[str, str]:
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness() -> JSONResponse:
+    """Readiness probe: 200 once SQLite and the vector store are initialized, 503 before."""
+    return JSONResponse(startup.readiness(), status_code=200 if startup.is_ready() else 503)
+
+
+@metrics_router.get("", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus metrics: stage/request latency, cache hit rates, in-flight external calls."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@admin_router.get("/reindex")
+async def reindex_status() -> Dict[str, Any]:
+    """Report the active collection, stale cases and the latest reindex job."""
+    return await run_db(reindex.get_reindex_status)
+
+
+@admin_router.post("/reindex", status_code=202)
+async def start_reindex(force: bool = False) -> Dict[str, Any]:
+    """
+    Start (or resume) re-embedding the corpus in the background.
+    
+    Poll ``GET /admin/reindex`` for progress; queries keep using the current
+    collection until the job swaps to the new one.
+    """
+    global _reindex_task
+    if _reindex_task is not None and not _reindex_task.done():
+        raise HTTPException(status_code=409, detail="A reindex is already running")
+    
+    _reindex_task = asyncio.create_task(reindex.run_reindex(force=force))
+    _reindex_task.add_done_callback(_log_reindex_result)
+    return {"status": "started"}
+
+
+def _log_reindex_result(task: "asyncio.Task"):
+    """Log the outcome of a background reindex."""
+    if task.cancelled():
+        print("Reindex cancelled")
+    elif task.exception() is not None:
+        print(f"Reindex failed: {task.exception()}")
+    else:
+        print(f"Reindex finished: {task.result()}")
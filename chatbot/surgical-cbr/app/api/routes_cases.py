@@ -1,11 +1,17 @@
 """API routes for case CRUD operations."""
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.models import CaseCreate, CaseResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+from app.models import CaseCreate, CaseResponse, BulkIngestResponse, BulkRowResult
 from app.db import case_store
 from app.db.case_store import build_blob_text
-from app.services.embeddings import embed_text
-from app.config import EMBED_MODEL, EMBED_DIMS
+from app.services.embeddings import embed_text_async, embed_texts_async
+from app.utils.concurrency import run_db
+from app.utils.metrics import span
+from app.utils.ndjson import iter_ndjson_lines
+from app.utils.serialization import FastJSONResponse, case_row_to_json, cases_to_json, dumps
+from app.config import INGEST_BATCH_SIZE
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
@@ -15,21 +21,29 @@ async def create_case(case: CaseCreate):
     """Create a new case."""
     case_dict = case.model_dump()
     
-    # Generate embedding
+    # Generate embedding (with the model of the active collection)
+    backend = await run_db(case_store.ready_vector_backend)
     blob_text = build_blob_text(case_dict)
-    vector = embed_text(blob_text)
+    with span("embed"):
+        vector = await embed_text_async(blob_text, backend.embed_model, backend.embed_dims)
     
     # Insert case
-    case_id = case_store.insert_case_with_cursor(
-        case=case_dict,
-        blob_text=blob_text,
-        embed_model=EMBED_MODEL,
-        embed_dims=EMBED_DIMS,
-        vector=vector
-    )
+    try:
+        case_id = await run_db(
+            case_store.insert_case_with_cursor,
+            case=case_dict,
+            blob_text=blob_text,
+            embed_model=backend.embed_model,
+            embed_dims=backend.embed_dims,
+            vector=vector,
+            backend=backend
+        )
+    except case_store.CollectionSwappedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     # Fetch created case
-    created_case = case_store.get_case_by_id(case_id)
+    with span("fetch"):
+        created_case = await run_db(case_store.get_case_by_id, case_id)
     if not created_case:
         raise HTTPException(status_code=500, detail="Failed to create case")
     
@@ -40,34 +54,157 @@ async def create_case(case: CaseCreate):
     return CaseResponse(**created_case)
 
 
+def _validation_message(exc: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a short one-line message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def _ingest_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> List[BulkRowResult]:
+    """Embed a chunk of validated cases in batch and insert them in one transaction."""
+    cases = [case for _, case in chunk]
+    blob_texts = [build_blob_text(case) for case in cases]
+    try:
+        backend = await run_db(case_store.ready_vector_backend)
+        with span("embed"):
+            vectors = await embed_texts_async(
+                blob_texts, model=backend.embed_model, dims=backend.embed_dims
+            )
+        case_ids = await run_db(
+            case_store.insert_cases_batch,
+            cases,
+            blob_texts,
+            backend.embed_model,
+            backend.embed_dims,
+            vectors=vectors,
+            backend=backend
+        )
+    except Exception as e:
+        print(f"Bulk chunk of {len(chunk)} case(s) failed: {e}")
+        return [BulkRowResult(line=line, error=f"Insert failed: {e}") for line, _ in chunk]
+    return [BulkRowResult(line=line, case_id=case_id) for (line, _), case_id in zip(chunk, case_ids)]
+
+
+@router.post("/bulk", response_model=BulkIngestResponse)
+async def bulk_create_cases(request: Request):
+    """
+    Create cases from a streamed NDJSON body (one CaseCreate object per line).
+    
+    Rows are validated as they arrive; valid rows are embedded in batches and
+    written INGEST_BATCH_SIZE at a time (one transaction and one vector upsert
+    per chunk). Invalid rows are reported without aborting the import.
+    """
+    results: List[BulkRowResult] = []
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    
+    async for line_number, line in iter_ndjson_lines(request.stream()):
+        try:
+            case = CaseCreate.model_validate_json(line)
+        except ValidationError as e:
+            results.append(BulkRowResult(line=line_number, error=_validation_message(e)))
+            continue
+        
+        chunk.append((line_number, case.model_dump()))
+        if len(chunk) >= INGEST_BATCH_SIZE:
+            results.extend(await _ingest_chunk(chunk))
+            chunk = []
+    
+    if chunk:
+        results.extend(await _ingest_chunk(chunk))
+    
+    results.sort(key=lambda row: row.line)
+    inserted = sum(1 for row in results if row.case_id is not None)
+    return BulkIngestResponse(
+        inserted=inserted,
+        failed=len(results) - inserted,
+        results=results
+    )
+
+
 @router.get("", response_model=List[CaseResponse])
 async def list_cases(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
+    donor_site: Optional[str] = None,
+    smoker: Optional[bool] = None,
+    synthetic: Optional[bool] = None,
+    outcome_rating: Optional[int] = Query(default=None, ge=1, le=5)
 ):
-    """List all cases."""
-    cases = case_store.get_all_cases(limit=limit, offset=offset)
+    """
+    List cases, newest first.
     
-    # Convert to response format
-    result = []
-    for case in cases:
-        case['smoker'] = bool(case['smoker'])
-        case['synthetic'] = bool(case['synthetic'])
-        result.append(CaseResponse(**case))
+    Pages are keyset-paginated: when more cases follow, the response carries
+    an ``X-Next-Cursor`` header to pass back as ``cursor``. ``offset`` is
+    still honoured (without a cursor) for older clients.
+    """
+    filters = dict(
+        donor_site=donor_site,
+        smoker=smoker,
+        synthetic=synthetic,
+        outcome_rating=outcome_rating
+    )
+    headers = {}
+    if offset and not cursor:
+        cases = await run_db(case_store.get_all_cases, limit=limit, offset=offset, **filters)
+    else:
+        try:
+            cases, next_cursor = await run_db(
+                case_store.get_cases_page, limit=limit, cursor=cursor, **filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+    
+    # Rows go straight to JSON bytes; the shape matches List[CaseResponse]
+    return FastJSONResponse(cases_to_json(cases), headers=headers)
+
+
+@router.get("/export")
+async def export_cases(
+    format: Literal["ndjson", "json"] = "ndjson",
+    page_size: int = Query(default=1000, ge=1, le=10000)
+):
+    """
+    Stream every case, newest first, as NDJSON (default) or a JSON array.
     
-    return result
+    Rows are read in keyset pages of ``page_size`` and written as they are
+    fetched, so memory use is bounded by one page.
+    """
+    async def pages() -> AsyncIterator[List[bytes]]:
+        cursor = None
+        while True:
+            cases, cursor = await run_db(case_store.get_cases_page, limit=page_size, cursor=cursor)
+            if cases:
+                yield [dumps(case_row_to_json(case)) for case in cases]
+            if not cursor:
+                break
+
+    async def ndjson_body() -> AsyncIterator[bytes]:
+        async for rows in pages():
+            yield b"".join(row + b"\n" for row in rows)
+
+    async def json_array_body() -> AsyncIterator[bytes]:
+        separator = b"["
+        async for rows in pages():
+            yield separator + b",".join(rows)
+            separator = b","
+        yield b"]" if separator == b"," else b"[]"
+
+    if format == "json":
+        return StreamingResponse(json_array_body(), media_type="application/json")
+    return StreamingResponse(ndjson_body(), media_type="application/x-ndjson")
 
 
 @router.get("/{case_id}", response_model=CaseResponse)
 async def get_case(case_id: int):
     """Get case by ID."""
-    case = case_store.get_case_by_id(case_id)
+    case = await run_db(case_store.get_case_by_id, case_id)
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
-    case['smoker'] = bool(case['smoker'])
-    case['synthetic'] = bool(case['synthetic'])
-    
-    return CaseResponse(**case)
-
+    return FastJSONResponse(case_row_to_json(case))
@@ -1,74 +1,342 @@
 """API routes for query/retrieval operations."""
-from fastapi import APIRouter, HTTPException
-from app.models import QueryRequest, QueryResponse
-from app.services.retrieval import retrieve_top_k
-from app.services.llm_client import generate_recommendation, extract_mermaid, extract_flags
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from app.config import (
+    EMBEDDING_WEIGHT, FEATURE_WEIGHT, QUERY_BATCH_LLM_CONCURRENCY,
+    QUERY_DEADLINE_MS, LLM_DEGRADED_FALLBACK
+)
+from app.db import case_store
+from app.models import (
+    BatchQueryRequest, QueryRequest, QueryResponse, RetrieveRequest, RetrieveResponse
+)
+from app.services.retrieval import (
+    fallback_scope, retrieve_top_k_async, retrieve_top_k_batch_async
+)
+from app.services.llm_client import (
+    PROMPT_VERSION, recommend_async, stream_recommendation_async, build_result
+)
+from app.services.llm_cache import get_recommendation_cache, recommendation_key
+from app.services.resilience import deadline, is_unavailable
+from app.utils.concurrency import run_db
+from app.utils.serialization import FastJSONResponse, dumps
 import json
 
 router = APIRouter(prefix="/query", tags=["query"])
 
 
+# Fields of a retrieved case returned in top_matches
+MATCH_FIELDS = (
+    "case_id", "title", "age", "sex", "bmi", "smoker", "defect_length_cm",
+    "donor_site", "technique_summary", "complications", "notes",
+    "outcome_rating", "final_score", "embedding_score", "keyword_score", "fused_score",
+    "feature_score", "retrieval_source",
+)
+
+
+def format_matches(top_matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Format top_matches for response (remove internal fields)."""
+    return [{field: match.get(field) for field in MATCH_FIELDS} for match in top_matches]
+
+
+# Score breakdown fields added to MATCH_FIELDS by /query/retrieve
+BREAKDOWN_FIELDS = ("feature_components",)
+
+
+def format_scored_matches(top_matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Format top_matches with their per-component feature scores."""
+    fields = MATCH_FIELDS + BREAKDOWN_FIELDS
+    return [{field: match.get(field) for field in fields} for match in top_matches]
+
+
+def retrieval_etag(request: RetrieveRequest, generation: int) -> str:
+    """
+    Weak ETag for a retrieval: the corpus generation plus a hash of the exact request.
+    
+    Not the retrieval cache key: that rounds the profile, and requests with
+    different profiles score the same cases differently.
+    """
+    body = json.dumps(request.model_dump(), sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(body.encode("utf-8"), digest_size=8).hexdigest()
+    return f'W/"{generation}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+async def recommend_or_degrade(
+    structured_profile: Dict[str, Any],
+    top_matches: List[Dict[str, Any]],
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
+    """
+    recommend_async, or a retrieval-only answer when the LLM is unavailable.
+    
+    With LLM_DEGRADED_FALLBACK, an open circuit breaker, a timeout, exhausted
+    retries or a spent deadline yield llm_text None and degraded True instead
+    of an error, so the matches are still served.
+    """
+    try:
+        result = await recommend_async(
+            structured_profile=structured_profile,
+            retrieved_cases=top_matches,
+            bypass_cache=bypass_cache
+        )
+    except Exception as e:
+        if not (LLM_DEGRADED_FALLBACK and is_unavailable(e)):
+            raise
+        print(f"LLM unavailable ({e!r}); answering retrieval-only")
+        return {"llm_text": None, "mermaid": None, "flags": [], "cached": False, "degraded": True}
+    return {**result, "degraded": False}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("", response_model=QueryResponse)
 async def query_cases(request: QueryRequest):
-    """Query cases using hybrid retrieval and generate LLM recommendation."""
+    """
+    Query cases using hybrid retrieval and generate LLM recommendation.
+    
+    The request is bounded by QUERY_DEADLINE_MS; if the LLM is unavailable
+    the matches are returned with ``degraded: true`` and no llm_text.
+    """
     try:
-        # Retrieve top cases
-        top_matches = retrieve_top_k(
-            user_text=request.user_text,
-            structured_profile=request.structured_profile,
-            top_k=request.top_k
-        )
-        
-        if not top_matches:
-            raise HTTPException(
-                status_code=404,
-                detail="No matching cases found"
+        with deadline(QUERY_DEADLINE_MS / 1000.0):
+            # Retrieve top cases
+            top_matches = await retrieve_top_k_async(
+                user_text=request.user_text,
+                structured_profile=request.structured_profile,
+                top_k=request.top_k,
+                filter_mode=request.filter_mode,
+                retrieval_mode=request.retrieval_mode
+            )
+            
+            if not top_matches:
+                raise HTTPException(
+                    status_code=404,
+                    detail="No matching cases found"
+                )
+            
+            # Generate (or reuse a cached) LLM recommendation with mermaid and flags
+            result = await recommend_or_degrade(
+                request.structured_profile, top_matches, request.bypass_cache
             )
         
-        # Prepare profile JSON for LLM
-        profile_json = json.dumps(request.structured_profile, indent=2)
+        # Serialized directly; the body matches QueryResponse
+        return FastJSONResponse({"top_matches": format_matches(top_matches), **result})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/retrieve", response_model=RetrieveResponse)
+async def retrieve_cases(
+    request: RetrieveRequest,
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Retrieval only: scored matches with score breakdowns, no LLM generation.
+    
+    Meant to be called on every keystroke (similar-case panels, live
+    filtering): an empty result is a 200 with no matches. Each match carries
+    final_score, embedding_score (keyword_score / fused_score for keyword and
+    hybrid matches), feature_score and feature_components.
+    
+    The response has a weak ETag derived from the corpus generation and the
+    exact request; sending it back in ``If-None-Match`` returns 304
+    without embedding or searching until a case is added (or a reindex swaps
+    the collection). Answers from the keyword fallback have ``fallback: true``,
+    no ETag and ``Cache-Control: no-store``, so a client never revalidates
+    degraded results once vector search recovers.
+    """
+    try:
+        generation = await run_db(case_store.get_corpus_generation)
+        etag = retrieval_etag(request, generation)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
         
-        # Generate LLM recommendation
-        llm_text = generate_recommendation(
-            new_profile_json=profile_json,
-            retrieved_cases=top_matches
+        with fallback_scope() as fallbacks, deadline(QUERY_DEADLINE_MS / 1000.0):
+            top_matches = await retrieve_top_k_async(
+                user_text=request.user_text,
+                structured_profile=request.structured_profile,
+                top_k=request.top_k,
+                filter_mode=request.filter_mode,
+                retrieval_mode=request.retrieval_mode
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if fallbacks:
+        headers = {"Cache-Control": "no-store"}
+    return FastJSONResponse(
+        {
+            "top_matches": format_scored_matches(top_matches),
+            "corpus_generation": generation,
+            "weights": {"feature": FEATURE_WEIGHT, "embedding": EMBEDDING_WEIGHT},
+            "fallback": bool(fallbacks),
+        },
+        headers=headers
+    )
+
+
+@router.post("/batch")
+async def query_cases_batch(request: BatchQueryRequest):
+    """
+    Run the queries of a planning session in one request, streamed as NDJSON.
+    
+    Retrieval for all patients is batched (one embedding call, one vector
+    search, one hydration). Recommendations are then generated concurrently,
+    at most QUERY_BATCH_LLM_CONCURRENCY at a time, and each patient's result
+    is written as soon as it is ready, so lines arrive in completion order:
+    
+    - ``{"index": i, "top_matches": [...], "llm_text": ..., "mermaid": ...,
+      "flags": [...], "cached": bool, "degraded": bool}`` (a QueryResponse
+      plus its index)
+    - ``{"index": i, "error": "...", "status_code": 404 | 500}`` when a
+      patient has no matching cases or generation fails
+    
+    Retrieval and each patient's generation get their own QUERY_DEADLINE_MS
+    budget (generation starts counting once it has a concurrency slot).
+    """
+    try:
+        with deadline(QUERY_DEADLINE_MS / 1000.0):
+            retrieved = await retrieve_top_k_batch_async([
+                {
+                    "user_text": query.user_text,
+                    "structured_profile": query.structured_profile,
+                    "top_k": query.top_k,
+                    "filter_mode": query.filter_mode,
+                    "retrieval_mode": query.retrieval_mode,
+                }
+                for query in request.queries
+            ])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    semaphore = asyncio.Semaphore(max(1, QUERY_BATCH_LLM_CONCURRENCY))
+    
+    async def answer(index: int, query: QueryRequest, top_matches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not top_matches:
+            return {"index": index, "error": "No matching cases found", "status_code": 404}
+        try:
+            async with semaphore:
+                with deadline(QUERY_DEADLINE_MS / 1000.0):
+                    result = await recommend_or_degrade(
+                        query.structured_profile, top_matches, query.bypass_cache
+                    )
+        except Exception as e:
+            return {"index": index, "error": str(e), "status_code": 500}
+        return {"index": index, "top_matches": format_matches(top_matches), **result}
+    
+    async def lines() -> AsyncIterator[bytes]:
+        tasks = [
+            asyncio.create_task(answer(index, query, top_matches))
+            for index, (query, top_matches) in enumerate(zip(request.queries, retrieved))
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield dumps(await completed) + b"\n"
+        finally:
+            # Stop outstanding generations if the client goes away
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/stream")
+async def query_cases_stream(request: QueryRequest):
+    """
+    Streaming variant of /query using server-sent events.
+    
+    Events, in order:
+    - ``matches``: {"top_matches": [...]} as soon as retrieval finishes
+    - ``token``: {"text": "..."} for each chunk of LLM output
+    - ``mermaid``: {"mermaid": "..." | null}
+    - ``flags``: {"flags": [...]}
+    - ``done``: {"cached": bool}
+    
+    A cached recommendation is sent as a single ``token`` event.
+    
+    If generation fails after the stream started, an ``error`` event with
+    {"detail": "..."} is sent instead of the remaining events.
+    
+    Retrieval and generation each get a QUERY_DEADLINE_MS budget.
+    """
+    try:
+        with deadline(QUERY_DEADLINE_MS / 1000.0):
+            top_matches = await retrieve_top_k_async(
+                user_text=request.user_text,
+                structured_profile=request.structured_profile,
+                top_k=request.top_k,
+                filter_mode=request.filter_mode,
+                retrieval_mode=request.retrieval_mode
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not top_matches:
+        raise HTTPException(
+            status_code=404,
+            detail="No matching cases found"
         )
+    
+    profile_json = json.dumps(request.structured_profile, indent=2)
+    cache = get_recommendation_cache()
+    cache_key = recommendation_key(PROMPT_VERSION, request.structured_profile, top_matches)
+    
+    async def events() -> AsyncIterator[str]:
+        yield sse_event("matches", {"top_matches": format_matches(top_matches)})
         
-        # Extract mermaid diagram
-        mermaid = extract_mermaid(llm_text)
-        
-        # Extract flags
-        flags = extract_flags(llm_text)
+        cached = None
+        if cache is not None and not request.bypass_cache:
+            cached = await run_db(cache.get, cache_key)
+        if cached is not None:
+            yield sse_event("token", {"text": cached["llm_text"]})
+            yield sse_event("mermaid", {"mermaid": cached["mermaid"]})
+            yield sse_event("flags", {"flags": cached["flags"]})
+            yield sse_event("done", {"cached": True})
+            return
         
-        # Format top_matches for response (remove internal fields)
-        formatted_matches = []
-        for match in top_matches:
-            formatted_match = {
-                "case_id": match.get("case_id"),
-                "title": match.get("title"),
-                "age": match.get("age"),
-                "sex": match.get("sex"),
-                "bmi": match.get("bmi"),
-                "smoker": match.get("smoker"),
-                "defect_length_cm": match.get("defect_length_cm"),
-                "donor_site": match.get("donor_site"),
-                "technique_summary": match.get("technique_summary"),
-                "complications": match.get("complications"),
-                "notes": match.get("notes"),
-                "outcome_rating": match.get("outcome_rating"),
-                "final_score": match.get("final_score"),
-                "embedding_score": match.get("embedding_score"),
-                "feature_score": match.get("feature_score")
-            }
-            formatted_matches.append(formatted_match)
+        chunks = []
+        try:
+            with deadline(QUERY_DEADLINE_MS / 1000.0):
+                async for text in stream_recommendation_async(
+                    new_profile_json=profile_json,
+                    retrieved_cases=top_matches
+                ):
+                    chunks.append(text)
+                    yield sse_event("token", {"text": text})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
         
-        return QueryResponse(
-            top_matches=formatted_matches,
-            llm_text=llm_text,
-            mermaid=mermaid if mermaid else None,
-            flags=flags
-        )
+        result = build_result("".join(chunks))
+        if cache is not None:
+            await run_db(cache.set, cache_key, result)
+        yield sse_event("mermaid", {"mermaid": result["mermaid"]})
+        yield sse_event("flags", {"flags": result["flags"]})
+        yield sse_event("done", {"cached": False})
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
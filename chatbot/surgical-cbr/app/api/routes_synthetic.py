@@ -1,40 +1,55 @@
 """API routes for synthetic case generation."""
 from fastapi import APIRouter, HTTPException
 from app.models import SyntheticCaseRequest, CaseResponse
-from app.services.synthetic import generate_synthetic_case
+from app.services.synthetic import generate_synthetic_case_async
 from app.db import case_store
 from app.db.case_store import build_blob_text
-from app.services.embeddings import embed_text
-from app.config import EMBED_MODEL, EMBED_DIMS
+from app.services.embeddings import embed_text_async
+from app.services.resilience import deadline, is_unavailable
+from app.utils.concurrency import run_db
+from app.utils.metrics import span
+from app.config import SYNTHETIC_DEADLINE_MS
 
 router = APIRouter(prefix="/dream", tags=["synthetic"])
 
 
 @router.post("", response_model=CaseResponse, status_code=201)
 async def generate_synthetic(request: SyntheticCaseRequest):
-    """Generate a synthetic case using Gemini."""
+    """
+    Generate a synthetic case using Gemini.
+    
+    Generation and embedding share a SYNTHETIC_DEADLINE_MS budget; a 503 is
+    returned when the provider is unavailable (open circuit, timeouts).
+    """
     try:
-        # Generate synthetic case
-        case_dict = generate_synthetic_case(
-            description=request.description,
-            constraints=request.constraints
-        )
-        
-        # Generate embedding
-        blob_text = build_blob_text(case_dict)
-        vector = embed_text(blob_text)
+        with deadline(SYNTHETIC_DEADLINE_MS / 1000.0):
+            # Generate synthetic case
+            with span("llm"):
+                case_dict = await generate_synthetic_case_async(
+                    description=request.description,
+                    constraints=request.constraints
+                )
+            
+            # Generate embedding (with the model of the active collection)
+            backend = await run_db(case_store.ready_vector_backend)
+            blob_text = build_blob_text(case_dict)
+            with span("embed"):
+                vector = await embed_text_async(blob_text, backend.embed_model, backend.embed_dims)
         
         # Insert case
-        case_id = case_store.insert_case_with_cursor(
+        case_id = await run_db(
+            case_store.insert_case_with_cursor,
             case=case_dict,
             blob_text=blob_text,
-            embed_model=EMBED_MODEL,
-            embed_dims=EMBED_DIMS,
-            vector=vector
+            embed_model=backend.embed_model,
+            embed_dims=backend.embed_dims,
+            vector=vector,
+            backend=backend
         )
         
         # Fetch created case
-        created_case = case_store.get_case_by_id(case_id)
+        with span("fetch"):
+            created_case = await run_db(case_store.get_case_by_id, case_id)
         if not created_case:
             raise HTTPException(status_code=500, detail="Failed to create synthetic case")
         
@@ -44,6 +59,10 @@ async def generate_synthetic(request: SyntheticCaseRequest):
         
         return CaseResponse(**created_case)
     
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        # A reindex swap during the insert is retryable, like an unavailable provider
+        retryable = is_unavailable(e) or isinstance(e, case_store.CollectionSwappedError)
+        raise HTTPException(status_code=503 if retryable else 500, detail=str(e))
 
@@ -5,31 +5,145 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_bool(name: str, default: str = "false") -> bool:
+    """Read a boolean flag from the environment."""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_optional_int(name: str):
+    """Read an optional integer from the environment (unset or empty -> None)."""
+    value = os.getenv(name, "").strip()
+    return int(value) if value else None
+
+
 # Base directory
 BASE_DIR = Path(__file__).parent.parent
 
 # Database paths
 DB_DIR = BASE_DIR / "app" / "db"
-DB_PATH = DB_DIR / "cases.db"
+DB_PATH = Path(os.getenv("DB_PATH", str(DB_DIR / "cases.db")))
 SCHEMA_PATH = DB_DIR / "schema.sql"
 
+# SQLite connection tuning (connections are per-thread and use WAL mode)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # page cache per connection
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough under WAL
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))  # prepared statements per connection
+
 # Qdrant settings
 QDRANT_PATH = os.getenv("QDRANT_PATH", str(BASE_DIR / "qdrant_data"))
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "surgical_cases")
 
+# Vector backend: "qdrant" (embedded/remote Qdrant) or "numpy" (exact, memory-mapped .npy)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant").strip().lower()
+VECTOR_INDEX_PATH = Path(os.getenv("VECTOR_INDEX_PATH", str(BASE_DIR / "vector_index")))
+
+# Vector storage: "none" (float32), "scalar" (int8, ~4x smaller) or "binary" (1 bit/dim, ~32x)
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").strip().lower()
+VECTOR_SCALAR_QUANTILE = float(os.getenv("VECTOR_SCALAR_QUANTILE", "1.0"))  # |value| quantile mapped to ±127
+VECTOR_ON_DISK = _env_bool("VECTOR_ON_DISK")  # keep original float vectors on disk (Qdrant)
+HNSW_M = _env_optional_int("HNSW_M")  # Qdrant index build settings (None = server default)
+HNSW_EF_CONSTRUCT = _env_optional_int("HNSW_EF_CONSTRUCT")
+# Vector payloads: "slim" (case_id + filter/feature fields; results are hydrated
+# from SQLite) or "full" (whole case record stored with each vector)
+VECTOR_PAYLOAD_MODE = os.getenv("VECTOR_PAYLOAD_MODE", "slim").strip().lower()
+
+# Default search parameters (overridable per call in retrieve_top_k)
+SEARCH_HNSW_EF = _env_optional_int("SEARCH_HNSW_EF")
+SEARCH_RESCORE = _env_bool("SEARCH_RESCORE", "true")  # re-rank quantized candidates with original vectors
+SEARCH_OVERSAMPLING = float(os.getenv("SEARCH_OVERSAMPLING", "2.0"))  # quantized candidates per result
+
+# Providers: "gemini" or "local" (offline hashing embedder / templated LLM)
+EMBED_PROVIDER = os.getenv("EMBED_PROVIDER", "gemini").strip().lower()
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+
 # Gemini settings
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.0-flash")
 
-# Embedding settings (Gemini)
-EMBED_MODEL = os.getenv("EMBED_MODEL", "models/text-embedding-004")
-EMBED_DIMS = int(os.getenv("EMBED_DIMS", "768"))
+# Embedding settings (recorded per case; the local provider gets its own model name)
+EMBED_MODEL = os.getenv(
+    "EMBED_MODEL",
+    "local/hashing-v1" if EMBED_PROVIDER == "local" else "models/text-embedding-004"
+)
+EMBED_DIMS = int(os.getenv("EMBED_DIMS", "768"))  # < 768 requests reduced-dimension Gemini embeddings
+
+# Local provider settings (simulated latency for load tests and benchmarks)
+LOCAL_EMBED_LATENCY_MS = float(os.getenv("LOCAL_EMBED_LATENCY_MS", "0"))  # per batch request
+LOCAL_LLM_LATENCY_MS = float(os.getenv("LOCAL_LLM_LATENCY_MS", "0"))  # per generation
+LOCAL_LLM_FIXTURE_PATH = os.getenv("LOCAL_LLM_FIXTURE_PATH")  # JSON {task: response text}
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "100"))  # texts per batch embed request
+
+# Recommendation cache (generated LLM text + parsed mermaid/flags)
+LLM_CACHE_ENABLED = _env_bool("LLM_CACHE_ENABLED", "true")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_PERSIST = _env_bool("LLM_CACHE_PERSIST", "false")  # also keep entries in SQLite
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(DB_PATH.parent / "llm_cache.db")))
+
+# Embedding cache (in-process LRU + persistent SQLite tier)
+EMBED_CACHE_ENABLED = _env_bool("EMBED_CACHE_ENABLED", "true")
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+# Next to the case database by default
+EMBED_CACHE_PATH = Path(os.getenv("EMBED_CACHE_PATH", str(DB_PATH.parent / "embed_cache.db")))
+
+# Ingest settings
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))  # cases per transaction/upsert
+
+# Reindex (re-embedding into a new collection when EMBED_MODEL / EMBED_DIMS change)
+REINDEX_BATCH_SIZE = int(os.getenv("REINDEX_BATCH_SIZE", "100"))  # cases per embed batch / checkpoint
+REINDEX_CONCURRENCY = int(os.getenv("REINDEX_CONCURRENCY", "4"))  # batches embedded concurrently
+REINDEX_LEASE_SECONDS = float(os.getenv("REINDEX_LEASE_SECONDS", "300"))  # job claim, renewed per checkpoint
+
+# Concurrency limits (async request path)
+SQLITE_EXECUTOR_WORKERS = int(os.getenv("SQLITE_EXECUTOR_WORKERS", "8"))
+GEMINI_EMBED_CONCURRENCY = int(os.getenv("GEMINI_EMBED_CONCURRENCY", "8"))
+GEMINI_LLM_CONCURRENCY = int(os.getenv("GEMINI_LLM_CONCURRENCY", "4"))
+VECTOR_SEARCH_CONCURRENCY = int(os.getenv("VECTOR_SEARCH_CONCURRENCY", "16"))
+SINGLE_FLIGHT_ENABLED = _env_bool("SINGLE_FLIGHT_ENABLED", "true")  # share identical in-flight embed / LLM calls
+
+# Provider resilience (embedding / LLM calls; see app.services.resilience)
+EMBED_TIMEOUT_MS = float(os.getenv("EMBED_TIMEOUT_MS", "10000"))  # per attempt
+LLM_TIMEOUT_MS = float(os.getenv("LLM_TIMEOUT_MS", "60000"))  # per attempt
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "2"))  # retries of retryable errors
+PROVIDER_RETRY_BASE_MS = float(os.getenv("PROVIDER_RETRY_BASE_MS", "200"))  # backoff: full jitter up to base * 2^n
+PROVIDER_RETRY_MAX_MS = float(os.getenv("PROVIDER_RETRY_MAX_MS", "5000"))
+EMBED_HEDGE_AFTER_MS = _env_optional_int("EMBED_HEDGE_AFTER_MS")  # send a duplicate embed request after this (None = off)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures that open it
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))  # open time before a trial call
+QUERY_DEADLINE_MS = float(os.getenv("QUERY_DEADLINE_MS", "30000"))  # budget per /query request (0 = none)
+SYNTHETIC_DEADLINE_MS = float(os.getenv("SYNTHETIC_DEADLINE_MS", "90000"))  # budget per /dream request
+LLM_DEGRADED_FALLBACK = _env_bool("LLM_DEGRADED_FALLBACK", "true")  # /query answers retrieval-only when the LLM is down
+
+# Startup: "eager" initializes the vector store before serving; "background"
+# serves immediately and reports readiness on /api/v1/health/ready
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager").strip().lower()
+VECTOR_INIT_RETRY_SECONDS = float(os.getenv("VECTOR_INIT_RETRY_SECONDS", "5"))  # background retry delay
+
+# Instrumentation (/api/v1/metrics and the Server-Timing response header)
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", "true")
+
+# Batch queries (POST /api/v1/query/batch)
+QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", "100"))  # patients per request
+QUERY_BATCH_LLM_CONCURRENCY = int(os.getenv("QUERY_BATCH_LLM_CONCURRENCY", "8"))  # generations in flight per request
 
 # Retrieval settings
-RETRIEVAL_TOP_K = 20
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "20"))  # vector candidates fetched for re-ranking
 RETRIEVAL_FINAL_K = 3
+FILTER_BMI_TOLERANCE = float(os.getenv("FILTER_BMI_TOLERANCE", "5.0"))  # +/- window for BMI filters
+FILTER_DEFECT_TOLERANCE_CM = float(os.getenv("FILTER_DEFECT_TOLERANCE_CM", "5.0"))  # +/- window for defect filters
+RETRIEVAL_CACHE_ENABLED = _env_bool("RETRIEVAL_CACHE_ENABLED", "true")
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_BMI_STEP = float(os.getenv("RETRIEVAL_CACHE_BMI_STEP", "0.5"))  # BMI rounding for cache keys
+RETRIEVAL_CACHE_DEFECT_STEP_CM = float(os.getenv("RETRIEVAL_CACHE_DEFECT_STEP_CM", "0.5"))  # defect rounding for cache keys
+RRF_K = int(os.getenv("RRF_K", "60"))  # reciprocal rank fusion constant (retrieval_mode "hybrid")
+# Zero-network fallback: answer from the keyword index when embedding/search fails
+RETRIEVAL_FALLBACK_ENABLED = _env_bool("RETRIEVAL_FALLBACK_ENABLED", "true")
+RETRIEVAL_EMBED_TIMEOUT_MS = float(os.getenv("RETRIEVAL_EMBED_TIMEOUT_MS", "2000"))  # async path; 0 = no timeout
 FEATURE_WEIGHT = 0.6
 EMBEDDING_WEIGHT = 0.4
 
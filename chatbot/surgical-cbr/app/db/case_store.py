@@ -1,55 +1,128 @@
-"""Database operations for cases (SQLite + Qdrant)."""
-import sqlite3
+"""Database operations for cases (SQLite + vector store)."""
+import base64
+import binascii
 import json
-from typing import Dict, List, Optional, Any
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from app.config import DB_PATH, SCHEMA_PATH, QDRANT_COLLECTION, EMBED_DIMS, EMBED_MODEL
-from app.services.qdrant_client import get_qdrant_client
+from app.config import (
+    DB_PATH, SCHEMA_PATH, EMBED_DIMS, EMBED_MODEL, INGEST_BATCH_SIZE, QDRANT_COLLECTION,
+    VECTOR_PAYLOAD_MODE
+)
+from app.db.connection import get_read_connection, write_transaction
+from app.services.filters import donor_site_key
+from app.services.vector_store import (
+    PAYLOAD_MODES, SLIM_PAYLOAD_FIELDS, VectorBackend, VectorPoint, get_vector_backend
+)
+from app.utils.metrics import span
+
+
+_sqlite_lock = threading.Lock()
+
+
+class CollectionSwappedError(RuntimeError):
+    """A reindex swapped the active collection after the vectors were embedded."""
+_vector_store_lock = threading.Lock()
+_sqlite_initialized = False
+_vector_store_initialized = False
+
+
+def schema_version(schema_sql: str) -> int:
+    """Fingerprint of the schema script, stored in PRAGMA user_version."""
+    return zlib.crc32(schema_sql.encode("utf-8")) & 0x7FFFFFFF
 
 
 def init_sqlite():
-    """Initialize SQLite database with schema."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-    
-    # Read and execute schema
-    with open(SCHEMA_PATH, 'r') as f:
-        schema_sql = f.read()
-    
-    cursor.executescript(schema_sql)
-    conn.commit()
-    conn.close()
+    """
+    Initialize SQLite database with schema (switches the file to WAL mode).
     
-    print(f"SQLite database initialized at {DB_PATH}")
+    Idempotent: the schema script only runs when the database's
+    ``PRAGMA user_version`` does not match the current schema fingerprint,
+    and at most once per process.
+    """
+    global _sqlite_initialized
+    with _sqlite_lock:
+        if _sqlite_initialized:
+            return
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Read and execute schema
+        with open(SCHEMA_PATH, 'r') as f:
+            schema_sql = f.read()
+        version = schema_version(schema_sql)
+        
+        with write_transaction() as conn:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            if current != version:
+                conn.executescript(schema_sql)
+                conn.execute(f"PRAGMA user_version = {version}")
+            _record_active_embedding(conn)
+        
+        _sqlite_initialized = True
+        if current != version:
+            print(f"SQLite database initialized at {DB_PATH}")
+        else:
+            print(f"SQLite database at {DB_PATH} is up to date")
 
 
-def init_qdrant():
-    """Initialize Qdrant collection."""
-    client = get_qdrant_client()
+def _record_active_embedding(conn: sqlite3.Connection):
+    """
+    Record which embedding the active collection holds, unless already known.
     
-    # Check if collection exists
-    collections = client.get_collections().collections
-    collection_names = [c.name for c in collections]
+    Databases created before this was tracked take the most common stamp
+    in ``cases``; new ones take EMBED_MODEL / EMBED_DIMS. Reindex swaps
+    update it afterwards.
+    """
+    row = conn.execute(
+        "SELECT embed_model, embed_dims FROM cases WHERE embed_model IS NOT NULL "
+        "GROUP BY embed_model, embed_dims ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    embed_model, embed_dims = (row[0], row[1]) if row else (EMBED_MODEL, EMBED_DIMS)
+    conn.executemany(
+        "INSERT OR IGNORE INTO corpus_meta (key, value) VALUES (?, ?)",
+        [('active_embed_model', embed_model), ('active_embed_dims', str(embed_dims))]
+    )
+
+
+def init_vector_store():
+    """Initialize the configured vector backend collection (once per process)."""
+    global _vector_store_initialized
+    with _vector_store_lock:
+        if _vector_store_initialized:
+            return
+        backend = get_vector_backend()
+        backend.ensure_collection()
+        _vector_store_initialized = True
     
-    if QDRANT_COLLECTION not in collection_names:
-        client.create_collection(
-            collection_name=QDRANT_COLLECTION,
-            vectors_config=VectorParams(
-                size=EMBED_DIMS,
-                distance=Distance.COSINE
-            )
+    # Warn when cases were embedded with another model (vectors would be mixed)
+    stale = count_stale_cases()
+    if stale:
+        print(
+            f"Warning: {stale} case(s) in '{backend.collection}' were not embedded with "
+            f"{EMBED_MODEL}/{EMBED_DIMS}; run scripts/reindex.py"
         )
-        print(f"Qdrant collection '{QDRANT_COLLECTION}' created")
-    else:
-        print(f"Qdrant collection '{QDRANT_COLLECTION}' already exists")
 
 
-def get_db_connection():
-    """Get SQLite database connection."""
-    return sqlite3.connect(str(DB_PATH), check_same_thread=False)
+def is_vector_store_initialized() -> bool:
+    """Return True once init_vector_store has completed in this process."""
+    return _vector_store_initialized
+
+
+def ready_vector_backend() -> VectorBackend:
+    """
+    Return the active vector backend, initializing it first if needed.
+    
+    With STARTUP_MODE=background a request can arrive while the collection
+    is still being created; it waits for that instead of failing. The
+    corpus generation is passed along so a reindex swap made by another
+    process is picked up.
+    """
+    if not _vector_store_initialized:
+        init_vector_store()
+    return get_vector_backend(get_corpus_generation())
 
 
 def build_blob_text(case: Dict[str, Any]) -> str:
@@ -77,176 +150,568 @@ def build_blob_text(case: Dict[str, Any]) -> str:
     return "\n".join(parts)
 
 
-def insert_case_with_cursor(
+def _case_row(
     case: Dict[str, Any],
     blob_text: str,
     embed_model: str,
+    embed_dims: int
+) -> tuple:
+    """Build the SQLite column values for a case (case_id may be None)."""
+    return (
+        case.get('case_id'),
+        case.get('title'),
+        case.get('age'),
+        case.get('sex'),
+        case.get('bmi'),
+        1 if case.get('smoker') else 0,
+        case.get('defect_length_cm'),
+        case.get('donor_site'),
+        case.get('technique_summary'),
+        case.get('complications'),
+        case.get('notes'),
+        case.get('outcome_rating'),
+        case.get('imaging_meta'),
+        1 if case.get('synthetic', False) else 0,
+        blob_text,
+        embed_model,
+        embed_dims
+    )
+
+
+def build_payload(
+    case: Dict[str, Any],
+    case_id: int,
+    blob_text: str,
+    mode: str = VECTOR_PAYLOAD_MODE
+) -> Dict[str, Any]:
+    """
+    Build the payload stored alongside a case vector.
+    
+    Args:
+        case: Case dictionary
+        case_id: Case ID
+        blob_text: Text representation of the case
+        mode: "slim" (SLIM_PAYLOAD_FIELDS only) or "full" (the whole record)
+        
+    Returns:
+        Payload dictionary
+    """
+    if mode not in PAYLOAD_MODES:
+        raise ValueError(f"Unknown VECTOR_PAYLOAD_MODE '{mode}' (expected one of {PAYLOAD_MODES})")
+    payload = {
+        "case_id": case_id,
+        "title": case.get('title'),
+        "age": case.get('age'),
+        "sex": case.get('sex'),
+        "bmi": case.get('bmi'),
+        "smoker": case.get('smoker', False),
+        "defect_length_cm": case.get('defect_length_cm'),
+        "donor_site": case.get('donor_site'),
+        "donor_site_key": donor_site_key(case.get('donor_site')),
+        "technique_summary": case.get('technique_summary'),
+        "complications": case.get('complications'),
+        "notes": case.get('notes'),
+        "outcome_rating": case.get('outcome_rating'),
+        "blob_text": blob_text
+    }
+    if mode == "slim":
+        return {field: payload[field] for field in SLIM_PAYLOAD_FIELDS}
+    return payload
+
+
+INSERT_CASE_SQL = """
+    INSERT INTO cases (
+        case_id, title, age, sex, bmi, smoker, defect_length_cm,
+        donor_site, technique_summary, complications, notes,
+        outcome_rating, imaging_meta, synthetic, blob_text,
+        embed_model, embed_dims
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def insert_cases_batch(
+    cases: List[Dict[str, Any]],
+    blob_texts: List[str],
+    embed_model: str,
     embed_dims: int,
-    vector: Optional[List[float]] = None
-):
+    vectors: Optional[List[Optional[List[float]]]] = None,
+    backend: Optional[VectorBackend] = None
+) -> List[int]:
     """
-    Insert case into SQLite using cursor and upsert to Qdrant if vector provided.
+    Insert several cases in one SQLite transaction and one vector store upsert.
+    
+    The vectors are upserted before the transaction commits: if the upsert
+    fails no row is stored, so a retried import does not create duplicates.
+    The upsert is refused when a reindex swap made another collection active
+    since the backend was resolved: the swap's catch-up pass would not see
+    the cases, leaving them only in the retired collection.
     
     Args:
-        case: Case dictionary with all fields
-        blob_text: Text representation for embedding
+        cases: Case dictionaries (case_id may be omitted to auto-assign)
+        blob_texts: Text representation for each case
         embed_model: Embedding model name
         embed_dims: Embedding dimensions
-        vector: Optional embedding vector for Qdrant
-    """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    case_id_provided = case.get('case_id') is not None
-    
-    # Insert into SQLite
-    if case_id_provided:
-        cursor.execute("""
-            INSERT INTO cases (
-                case_id, title, age, sex, bmi, smoker, defect_length_cm,
-                donor_site, technique_summary, complications, notes,
-                outcome_rating, imaging_meta, synthetic, blob_text,
-                embed_model, embed_dims
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            case.get('case_id'),
-            case.get('title'),
-            case.get('age'),
-            case.get('sex'),
-            case.get('bmi'),
-            1 if case.get('smoker') else 0,
-            case.get('defect_length_cm'),
-            case.get('donor_site'),
-            case.get('technique_summary'),
-            case.get('complications'),
-            case.get('notes'),
-            case.get('outcome_rating'),
-            case.get('imaging_meta'),
-            1 if case.get('synthetic', False) else 0,
-            blob_text,
-            embed_model,
-            embed_dims
-        ))
-        case_id = case.get('case_id')
-    else:
-        cursor.execute("""
-            INSERT INTO cases (
-                title, age, sex, bmi, smoker, defect_length_cm,
-                donor_site, technique_summary, complications, notes,
-                outcome_rating, imaging_meta, synthetic, blob_text,
-                embed_model, embed_dims
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            case.get('title'),
-            case.get('age'),
-            case.get('sex'),
-            case.get('bmi'),
-            1 if case.get('smoker') else 0,
-            case.get('defect_length_cm'),
-            case.get('donor_site'),
-            case.get('technique_summary'),
-            case.get('complications'),
-            case.get('notes'),
-            case.get('outcome_rating'),
-            case.get('imaging_meta'),
-            1 if case.get('synthetic', False) else 0,
-            blob_text,
-            embed_model,
-            embed_dims
-        ))
-        case_id = cursor.lastrowid
-    
-    conn.commit()
-    
-    # Upsert to Qdrant if vector provided
-    if vector is not None:
-        client = get_qdrant_client()
+        vectors: Optional embedding vector per case (None entries are skipped)
+        backend: Backend the vectors were embedded for (default: the active one)
         
-        payload = {
-            "case_id": case_id,
-            "title": case.get('title'),
-            "age": case.get('age'),
-            "sex": case.get('sex'),
-            "bmi": case.get('bmi'),
-            "smoker": case.get('smoker', False),
-            "defect_length_cm": case.get('defect_length_cm'),
-            "donor_site": case.get('donor_site'),
-            "technique_summary": case.get('technique_summary'),
-            "complications": case.get('complications'),
-            "notes": case.get('notes'),
-            "outcome_rating": case.get('outcome_rating'),
-            "blob_text": blob_text
-        }
+    Returns:
+        List of case IDs, in input order
         
-        point = PointStruct(
-            id=case_id,
-            vector=vector,
-            payload=payload
-        )
+    Raises:
+        CollectionSwappedError: If backend is no longer the active collection
+            (nothing is inserted; embed again with the active backend)
+        Exception: Whatever the vector store raised (nothing is inserted)
+    """
+    if vectors is not None and any(vector is not None for vector in vectors):
+        backend = backend or ready_vector_backend()
+    
+    case_ids = []
+    with write_transaction() as conn:
+        with span("sqlite_insert"):
+            cursor = conn.cursor()
+            for case, blob_text in zip(cases, blob_texts):
+                cursor.execute(INSERT_CASE_SQL, _case_row(case, blob_text, embed_model, embed_dims))
+                case_ids.append(cursor.lastrowid)
+        
+        # Upsert all vectors for this batch in a single request
+        if vectors is not None:
+            points = [
+                VectorPoint(
+                    case_id=case_id,
+                    vector=vector,
+                    payload=build_payload(case, case_id, blob_text)
+                )
+                for case, blob_text, case_id, vector in zip(cases, blob_texts, case_ids, vectors)
+                if vector is not None
+            ]
+            if points:
+                # The inserts hold the SQLite write lock, so a swap either
+                # committed before this read or waits for this transaction
+                # (and its catch-up pass then copies these cases)
+                row = conn.execute(
+                    "SELECT value FROM corpus_meta WHERE key = 'active_collection'"
+                ).fetchone()
+                active = row[0] if row else QDRANT_COLLECTION
+                if backend.collection != active:
+                    raise CollectionSwappedError(
+                        f"'{backend.collection}' was replaced by '{active}' during the insert; retry"
+                    )
+                with span("vector_upsert"):
+                    backend.upsert(points)
+                print(f"Upserted {len(points)} case(s) to {backend.name}")
+    
+    # Bumped once the vectors are searchable, so results cached at the
+    # new generation always include the new cases
+    bump_corpus_generation()
+    return case_ids
+
+
+def migrate_vector_payloads(
+    mode: str = VECTOR_PAYLOAD_MODE,
+    page_size: int = 256,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Rewrite the payloads of the active collection for a payload mode.
+    
+    Points are read page by page, their payloads rebuilt from SQLite (one
+    IN (...) query per page) and overwritten in one request per page;
+    vectors are left untouched, so no re-embedding is needed.
+    
+    Args:
+        mode: Target payload mode ("slim" or "full")
+        page_size: Points per page
+        dry_run: Only report what would change
         
-        client.upsert(
-            collection_name=QDRANT_COLLECTION,
-            points=[point]
+    Returns:
+        Counts of points, updated and orphaned points (no SQLite case) and
+        the JSON size of the payloads before and after
+    """
+    if mode not in PAYLOAD_MODES:
+        raise ValueError(f"Unknown VECTOR_PAYLOAD_MODE '{mode}' (expected one of {PAYLOAD_MODES})")
+    backend = ready_vector_backend()
+    stats = {
+        "collection": backend.collection, "mode": mode, "points": 0, "updated": 0,
+        "orphaned": 0, "payload_bytes_before": 0, "payload_bytes_after": 0,
+    }
+    if not backend.stores_payloads:
+        return stats
+    
+    for page in backend.scroll_payloads(page_size):
+        cases = get_cases_by_ids([case_id for case_id, _ in page])
+        updates = {}
+        for case_id, payload in page:
+            stats["points"] += 1
+            stats["payload_bytes_before"] += len(json.dumps(payload))
+            case = cases.get(case_id)
+            if case is None:
+                stats["orphaned"] += 1
+                stats["payload_bytes_after"] += len(json.dumps(payload))
+                continue
+            new_payload = build_payload(case, case_id, case['blob_text'], mode)
+            stats["payload_bytes_after"] += len(json.dumps(new_payload))
+            if new_payload != payload:
+                updates[case_id] = new_payload
+        if updates and not dry_run:
+            backend.overwrite_payloads(updates)
+        stats["updated"] += len(updates)
+    return stats
+
+
+def count_stale_cases(embed_model: str = EMBED_MODEL, embed_dims: int = EMBED_DIMS) -> int:
+    """Count cases whose stored embed_model/embed_dims differ from the given config."""
+    row = get_read_connection().execute(
+        "SELECT COUNT(*) FROM cases WHERE embed_model IS NOT ? OR embed_dims IS NOT ?",
+        (embed_model, embed_dims)
+    ).fetchone()
+    return int(row[0])
+
+
+def get_corpus_meta(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Return a corpus_meta value (default when unset or before init_sqlite)."""
+    try:
+        row = get_read_connection().execute(
+            "SELECT value FROM corpus_meta WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return default
+    return row[0] if row and row[0] is not None else default
+
+
+def set_corpus_meta(values: Dict[str, Any], conn: Optional[sqlite3.Connection] = None):
+    """
+    Set several corpus_meta values atomically.
+    
+    Args:
+        values: Mapping of key -> value (stored as text)
+        conn: Connection of an open write_transaction to join (optional)
+    """
+    rows = [(key, str(value)) for key, value in values.items()]
+    sql = "INSERT OR REPLACE INTO corpus_meta (key, value) VALUES (?, ?)"
+    if conn is not None:
+        conn.executemany(sql, rows)
+        return
+    with write_transaction() as conn:
+        conn.executemany(sql, rows)
+
+
+def get_corpus_generation() -> int:
+    """Return the corpus generation counter (changes on every case write)."""
+    return int(get_corpus_meta('generation', '0'))
+
+
+def bump_corpus_generation() -> int:
+    """Increment and return the corpus generation counter."""
+    with write_transaction() as conn:
+        conn.execute(
+            "INSERT INTO corpus_meta (key, value) VALUES ('generation', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
         )
-        print(f"Upserted case {case_id} to Qdrant")
+        row = conn.execute("SELECT value FROM corpus_meta WHERE key = 'generation'").fetchone()
+    return int(row[0])
+
+
+def insert_case_with_cursor(
+    case: Dict[str, Any],
+    blob_text: str,
+    embed_model: str,
+    embed_dims: int,
+    vector: Optional[List[float]] = None,
+    backend: Optional[VectorBackend] = None
+):
+    """
+    Insert case into SQLite using cursor and upsert to the vector store if vector provided.
     
-    conn.close()
-    return case_id
+    Args:
+        case: Case dictionary with all fields
+        blob_text: Text representation for embedding
+        embed_model: Embedding model name
+        embed_dims: Embedding dimensions
+        vector: Optional embedding vector for the vector store
+        backend: Backend the vector was embedded for (default: the active one)
+    """
+    return insert_cases_batch(
+        cases=[case],
+        blob_texts=[blob_text],
+        embed_model=embed_model,
+        embed_dims=embed_dims,
+        vectors=None if vector is None else [vector],
+        backend=backend
+    )[0]
 
 
-def batch_seed_from_json(seed_file: Path, embed_func):
+def batch_seed_from_json(
+    seed_file: Path,
+    embed_batch_func,
+    chunk_size: int = INGEST_BATCH_SIZE
+):
     """
     Batch seed cases from JSON file.
     
+    Cases are processed in chunks: each chunk is embedded with one batch call,
+    written in one SQLite transaction and upserted to the vector store in one request.
+    
     Args:
         seed_file: Path to seed JSON file
-        embed_func: Function to generate embeddings (text -> List[float])
+        embed_batch_func: Function to generate embeddings
+            (texts, model=..., dims=... -> List[List[float]]), called with the
+            embedding of the active collection
+        chunk_size: Number of cases per chunk
     """
     with open(seed_file, 'r') as f:
         cases = json.load(f)
     
-    for case in cases:
-        blob_text = build_blob_text(case)
-        vector = embed_func(blob_text)
+    backend = ready_vector_backend()
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(cases), chunk_size):
+        chunk = cases[start:start + chunk_size]
+        blob_texts = [build_blob_text(case) for case in chunk]
+        with span("embed"):
+            vectors = embed_batch_func(
+                blob_texts, model=backend.embed_model, dims=backend.embed_dims
+            )
         
-        insert_case_with_cursor(
-            case=case,
-            blob_text=blob_text,
-            embed_model=EMBED_MODEL,
-            embed_dims=EMBED_DIMS,
-            vector=vector
+        case_ids = insert_cases_batch(
+            cases=chunk,
+            blob_texts=blob_texts,
+            embed_model=backend.embed_model,
+            embed_dims=backend.embed_dims,
+            vectors=vectors,
+            backend=backend
         )
         
-        print(f"Seeded case {case.get('case_id', 'unknown')}")
+        print(f"Seeded cases {case_ids[0]}..{case_ids[-1]} ({len(case_ids)} cases)")
 
 
 def get_case_by_id(case_id: int) -> Optional[Dict[str, Any]]:
     """Get case by ID from SQLite."""
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM cases WHERE case_id = ?", (case_id,))
-    row = cursor.fetchone()
-    conn.close()
+    row = get_read_connection().execute(
+        "SELECT * FROM cases WHERE case_id = ?", (case_id,)
+    ).fetchone()
     
     if row:
         return dict(row)
     return None
 
 
-def get_all_cases(limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-    """Get all cases from SQLite."""
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def _case_filters(
+    donor_site: Optional[str] = None,
+    smoker: Optional[bool] = None,
+    synthetic: Optional[bool] = None,
+    outcome_rating: Optional[int] = None
+) -> Tuple[List[str], List[Any]]:
+    """Build WHERE clauses (matching the list indexes) for the case filters."""
+    clauses, params = [], []
+    if donor_site:
+        clauses.append("donor_site = ? COLLATE NOCASE")
+        params.append(donor_site.strip())
+    if smoker is not None:
+        clauses.append("smoker = ?")
+        params.append(int(smoker))
+    if synthetic is not None:
+        clauses.append("synthetic = ?")
+        params.append(int(synthetic))
+    if outcome_rating is not None:
+        clauses.append("outcome_rating = ?")
+        params.append(outcome_rating)
+    return clauses, params
+
+
+def encode_cursor(case: Dict[str, Any]) -> str:
+    """Encode the (created_at, case_id) position of a case as an opaque cursor."""
+    raw = json.dumps([str(case['created_at']), case['case_id']], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_cursor.
     
-    cursor.execute(
-        "SELECT * FROM cases ORDER BY created_at DESC LIMIT ? OFFSET ?",
-        (limit, offset)
-    )
-    rows = cursor.fetchall()
-    conn.close()
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, case_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(created_at), int(case_id)
+    except (ValueError, TypeError, UnicodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def get_all_cases(
+    limit: int = 100,
+    offset: int = 0,
+    **filters: Any
+) -> List[Dict[str, Any]]:
+    """Get cases from SQLite, newest first (offset pagination)."""
+    clauses, params = _case_filters(**filters)
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    rows = get_read_connection().execute(
+        f"SELECT * FROM cases {where}ORDER BY created_at DESC, case_id DESC LIMIT ? OFFSET ?",
+        (*params, limit, offset)
+    ).fetchall()
     
     return [dict(row) for row in rows]
 
+
+def get_cases_page(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **filters: Any
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of cases, newest first, using keyset pagination.
+    
+    Pages are addressed by the (created_at, case_id) of the last row seen, so
+    each page is a bounded index range scan regardless of depth.
+    
+    Args:
+        limit: Page size
+        cursor: Cursor returned with the previous page (None for the first page)
+        **filters: donor_site, smoker, synthetic and/or outcome_rating
+    
+    Returns:
+        (cases, next_cursor); next_cursor is None on the last page
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    clauses, params = _case_filters(**filters)
+    if cursor:
+        clauses.append("(created_at, case_id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    
+    # Fetch one extra row to know whether another page follows
+    rows = get_read_connection().execute(
+        f"SELECT * FROM cases {where}ORDER BY created_at DESC, case_id DESC LIMIT ?",
+        (*params, limit + 1)
+    ).fetchall()
+    
+    cases = [dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(cases[-1]) if len(rows) > limit else None
+    return cases, next_cursor
+
+
+def get_cases_by_ids(case_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Fetch several cases in one query.
+    
+    Returns:
+        Mapping of case_id -> case dictionary (smoker/synthetic as booleans);
+        unknown IDs are omitted
+    """
+    if not case_ids:
+        return {}
+    placeholders = ",".join("?" * len(case_ids))
+    rows = get_read_connection().execute(
+        f"SELECT * FROM cases WHERE case_id IN ({placeholders})",
+        list(case_ids)
+    ).fetchall()
+    
+    cases = {}
+    for row in rows:
+        case = dict(row)
+        case['smoker'] = bool(case['smoker'])
+        case['synthetic'] = bool(case['synthetic'])
+        cases[case['case_id']] = case
+    return cases
+
+
+# bm25 column weights for cases_fts: title, technique_summary, complications, notes
+FTS_COLUMN_WEIGHTS = (3.0, 1.0, 1.0, 1.0)
+FTS_MAX_TERMS = 32
+# Profile condition fields (see filters.profile_conditions) -> cases column expression
+_CONDITION_COLUMNS = {
+    "donor_site_key": "lower(trim(c.donor_site))",
+    "sex": "c.sex",
+    "smoker": "c.smoker",
+    "bmi": "c.bmi",
+    "defect_length_cm": "c.defect_length_cm",
+}
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression from free text.
+    
+    Every distinct word becomes a quoted term and terms are OR-ed, so any
+    user input is a valid query and cases matching more terms rank higher.
+    
+    Returns:
+        The MATCH expression, or None when the text has no words
+    """
+    terms = list(dict.fromkeys(re.findall(r"\w+", text.lower())))[:FTS_MAX_TERMS]
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def _condition_filters(conditions: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """Build WHERE clauses for profile conditions (exact values, value lists, ranges)."""
+    clauses, params = [], []
+    for field_name, value in conditions.items():
+        column = _CONDITION_COLUMNS.get(field_name)
+        if column is None:
+            continue
+        if isinstance(value, tuple):
+            lo, hi = value
+            if lo is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(lo)
+            if hi is not None:
+                clauses.append(f"{column} <= ?")
+                params.append(hi)
+        elif isinstance(value, list):
+            clauses.append(f"{column} IN ({','.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(int(value) if isinstance(value, bool) else value)
+    return clauses, params
+
+
+def search_cases_fts(
+    text: str,
+    limit: int,
+    conditions: Optional[Dict[str, Any]] = None
+) -> List[Tuple[Dict[str, Any], float]]:
+    """
+    Keyword search over title, technique_summary, complications and notes.
+    
+    Args:
+        text: Free text (see fts_query)
+        limit: Maximum number of cases
+        conditions: Optional profile conditions the cases must match
+        
+    Returns:
+        List of (case dictionary, bm25 relevance) pairs, most relevant first
+        (relevance is positive; higher is better)
+    """
+    query = fts_query(text)
+    if query is None or limit <= 0:
+        return []
+    
+    clauses, params = _condition_filters(conditions or {})
+    where = "".join(f" AND {clause}" for clause in clauses)
+    weights = ", ".join(str(weight) for weight in FTS_COLUMN_WEIGHTS)
+    rows = get_read_connection().execute(
+        f"""
+        SELECT c.*, -bm25(cases_fts, {weights}) AS relevance
+        FROM cases_fts JOIN cases c ON c.case_id = cases_fts.rowid
+        WHERE cases_fts MATCH ?{where}
+        ORDER BY relevance DESC
+        LIMIT ?
+        """,
+        [query, *params, limit]
+    ).fetchall()
+    
+    results = []
+    for row in rows:
+        case = dict(row)
+        relevance = case.pop('relevance')
+        case['smoker'] = bool(case['smoker'])
+        case['synthetic'] = bool(case['synthetic'])
+        results.append((case, relevance))
+    return results
+
@@ -0,0 +1,114 @@
+"""SQLite connection management (per-thread, WAL-mode connections)."""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+from app.config import (
+    DB_PATH,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS, SQLITE_STATEMENT_CACHE
+)
+
+
+_local = threading.local()
+_write_lock = threading.RLock()
+_registry_lock = threading.Lock()
+_open_connections: List[sqlite3.Connection] = []
+_generation = 0  # bumped by close_all() so threads reopen their connections
+
+
+def _apply_pragmas(conn: sqlite3.Connection, read_only: bool):
+    """Apply performance pragmas to a freshly opened connection."""
+    conn.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size = -{int(SQLITE_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if read_only:
+        conn.execute("PRAGMA query_only = 1")
+    else:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+
+
+def _open(read_only: bool) -> sqlite3.Connection:
+    """Open a new connection with statement caching and pragmas applied."""
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{DB_PATH}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE
+        )
+    else:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(DB_PATH),
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE
+        )
+    conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn, read_only)
+
+    with _registry_lock:
+        _open_connections.append(conn)
+    return conn
+
+
+def _thread_connection(name: str, read_only: bool) -> sqlite3.Connection:
+    """Return (or open) the named per-thread connection."""
+    if getattr(_local, "generation", None) != _generation:
+        _local.__dict__.clear()
+        _local.generation = _generation
+    conn = getattr(_local, name, None)
+    if conn is None:
+        conn = _open(read_only=read_only)
+        setattr(_local, name, conn)
+    return conn
+
+
+def get_write_connection() -> sqlite3.Connection:
+    """Return this thread's read-write connection, opening it on first use."""
+    return _thread_connection("writer", read_only=False)
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """
+    Return this thread's read-only connection, opening it on first use.
+
+    In WAL mode readers never block the writer (or each other), so list and
+    detail lookups go through this path.
+    """
+    return _thread_connection("reader", read_only=True)
+
+
+@contextmanager
+def write_transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Run a block inside a single write transaction.
+
+    Writes from all threads are serialized on one lock (SQLite allows a single
+    writer at a time); the transaction is committed on success and rolled
+    back on error.
+    """
+    with _write_lock:
+        conn = get_write_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def close_all():
+    """Close every connection opened by this process (used on shutdown)."""
+    global _generation
+    with _registry_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+        _generation += 1
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
@@ -19,3 +19,78 @@ CREATE TABLE IF NOT EXISTS cases (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Keyset pagination on (created_at, case_id), newest first, optionally
+-- narrowed by one of the list filters
+CREATE INDEX IF NOT EXISTS idx_cases_created ON cases(created_at DESC, case_id DESC);
+CREATE INDEX IF NOT EXISTS idx_cases_donor_site ON cases(donor_site COLLATE NOCASE, created_at DESC, case_id DESC);
+CREATE INDEX IF NOT EXISTS idx_cases_smoker ON cases(smoker, created_at DESC, case_id DESC);
+CREATE INDEX IF NOT EXISTS idx_cases_synthetic ON cases(synthetic, created_at DESC, case_id DESC);
+CREATE INDEX IF NOT EXISTS idx_cases_outcome ON cases(outcome_rating, created_at DESC, case_id DESC);
+
+-- Corpus-level metadata. "generation" is bumped on every case write so
+-- caches derived from the corpus (e.g. retrieval results) can be invalidated.
+CREATE TABLE IF NOT EXISTS corpus_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+INSERT OR IGNORE INTO corpus_meta (key, value) VALUES ('generation', '0');
+
+-- Re-embedding jobs (see app/services/reindex.py). last_case_id is the
+-- checkpoint: every case up to it has been written to target_collection.
+CREATE TABLE IF NOT EXISTS reindex_jobs (
+    job_id INTEGER PRIMARY KEY,
+    target_collection TEXT NOT NULL,
+    embed_model TEXT NOT NULL,
+    embed_dims INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    last_case_id INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Which process runs a reindex job. Claimed atomically and renewed at every
+-- checkpoint; another process may take the job over once expires_at (unix
+-- time) has passed.
+CREATE TABLE IF NOT EXISTS reindex_leases (
+    job_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+-- Keyword search over the free-text fields (external content: the text lives
+-- in cases, the index is kept in sync by the triggers below)
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+    title,
+    technique_summary,
+    complications,
+    notes,
+    content='cases',
+    content_rowid='case_id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS cases_fts_insert AFTER INSERT ON cases BEGIN
+    INSERT INTO cases_fts (rowid, title, technique_summary, complications, notes)
+    VALUES (new.case_id, new.title, new.technique_summary, new.complications, new.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cases_fts_delete AFTER DELETE ON cases BEGIN
+    INSERT INTO cases_fts (cases_fts, rowid, title, technique_summary, complications, notes)
+    VALUES ('delete', old.case_id, old.title, old.technique_summary, old.complications, old.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cases_fts_update
+AFTER UPDATE OF title, technique_summary, complications, notes ON cases BEGIN
+    INSERT INTO cases_fts (cases_fts, rowid, title, technique_summary, complications, notes)
+    VALUES ('delete', old.case_id, old.title, old.technique_summary, old.complications, old.notes);
+    INSERT INTO cases_fts (rowid, title, technique_summary, complications, notes)
+    VALUES (new.case_id, new.title, new.technique_summary, new.complications, new.notes);
+END;
+
+-- Index cases written before cases_fts existed (runs once per database)
+INSERT INTO cases_fts (cases_fts) SELECT 'rebuild'
+WHERE NOT EXISTS (SELECT 1 FROM corpus_meta WHERE key = 'fts_built');
+INSERT OR IGNORE INTO corpus_meta (key, value) VALUES ('fts_built', '1');
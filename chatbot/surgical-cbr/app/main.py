@@ -1,8 +1,13 @@
 """FastAPI application main entry point."""
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.config import DB_DIR
-from app.db import case_store
+from app.config import DB_DIR, METRICS_ENABLED
+from app.db.connection import close_all as close_db_connections
+from app.utils.metrics import (
+    HTTP_REQUEST_SECONDS, HTTP_REQUESTS, server_timing_header, start_request_timings
+)
+from app.services import startup
 from app.api import routes_cases, routes_query, routes_synthetic, routes_admin
 
 app = FastAPI(
@@ -25,22 +30,59 @@ app.include_router(routes_cases.router, prefix="/api/v1")
 app.include_router(routes_query.router, prefix="/api/v1")
 app.include_router(routes_synthetic.router, prefix="/api/v1")
 app.include_router(routes_admin.router, prefix="/api/v1")
+app.include_router(routes_admin.admin_router, prefix="/api/v1")
+app.include_router(routes_admin.metrics_router, prefix="/api/v1")
+
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """Record request latency and expose per-stage timings as Server-Timing."""
+    if not METRICS_ENABLED:
+        return await call_next(request)
+    
+    timings = start_request_timings()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    
+    # Label by route template (not the raw path) to keep cardinality bounded
+    route = request.scope.get("route")
+    labels = {
+        "method": request.method,
+        "route": getattr(route, "path", "unmatched"),
+        "status": str(response.status_code),
+    }
+    HTTP_REQUEST_SECONDS.observe(elapsed, **labels)
+    HTTP_REQUESTS.inc(**labels)
+    response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize services on startup."""
-    from app.config import DB_PATH, QDRANT_HOST, QDRANT_PORT, QDRANT_PATH
-    case_store.init_sqlite()
-    case_store.init_qdrant()
-    print("Surgical CBR API started")
+    """Initialize services on startup (the vector store in the background if STARTUP_MODE=background)."""
+    from app.config import (
+        DB_PATH, QDRANT_HOST, QDRANT_PORT, QDRANT_PATH, STARTUP_MODE,
+        VECTOR_BACKEND, VECTOR_INDEX_PATH
+    )
+    await startup.start(STARTUP_MODE)
+    print(f"Surgical CBR API started (startup mode: {STARTUP_MODE})")
     print(f"Database: {DB_PATH}")
-    if QDRANT_HOST:
+    if VECTOR_BACKEND == "numpy":
+        print(f"Vector index (numpy): {VECTOR_INDEX_PATH}")
+    elif QDRANT_HOST:
         print(f"Qdrant: {QDRANT_HOST}:{QDRANT_PORT}")
     else:
         print(f"Qdrant (embedded): {QDRANT_PATH}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled resources on shutdown."""
+    await startup.stop()
+    close_db_connections()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
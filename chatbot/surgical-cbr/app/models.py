@@ -1,7 +1,8 @@
 """Pydantic models for request/response validation."""
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
+from app.config import QUERY_BATCH_MAX_SIZE
 
 
 class CaseBase(BaseModel):
@@ -35,8 +36,22 @@ class CaseResponse(CaseBase):
         from_attributes = True
 
 
-class QueryRequest(BaseModel):
-    """Query request model."""
+class BulkRowResult(BaseModel):
+    """Outcome of one NDJSON row in a bulk import."""
+    line: int
+    case_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkIngestResponse(BaseModel):
+    """Bulk case import response."""
+    inserted: int
+    failed: int
+    results: List[BulkRowResult]
+
+
+class RetrieveRequest(BaseModel):
+    """Retrieval-only request model (no LLM generation)."""
     user_text: str
     structured_profile: Dict[str, Any] = Field(
         default_factory=lambda: {
@@ -49,14 +64,36 @@ class QueryRequest(BaseModel):
         }
     )
     top_k: int = 3
+    filter_mode: Literal["none", "hard", "soft"] = "none"
+    retrieval_mode: Literal["vector", "keyword", "hybrid"] = "vector"
+
+
+class QueryRequest(RetrieveRequest):
+    """Query request model."""
+    bypass_cache: bool = False
+
+
+class RetrieveResponse(BaseModel):
+    """Scored matches with their score breakdowns (fallback: answered by the keyword fallback)."""
+    top_matches: List[Dict[str, Any]]
+    corpus_generation: int
+    weights: Dict[str, float]
+    fallback: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    """Batch query request (one QueryRequest per patient)."""
+    queries: List[QueryRequest] = Field(..., min_length=1, max_length=QUERY_BATCH_MAX_SIZE)
 
 
 class QueryResponse(BaseModel):
-    """Query response model."""
+    """Query response model (llm_text is None when degraded to retrieval-only)."""
     top_matches: List[Dict[str, Any]]
-    llm_text: str
+    llm_text: Optional[str] = None
     mermaid: Optional[str] = None
     flags: List[Dict[str, Any]] = Field(default_factory=list)
+    cached: bool = False
+    degraded: bool = False
 
 
 class SyntheticCaseRequest(BaseModel):
@@ -0,0 +1,120 @@
+"""Content-addressed embedding cache (in-process LRU + persistent SQLite tier)."""
+import hashlib
+import sqlite3
+import threading
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import (
+    EMBED_CACHE_ENABLED, EMBED_CACHE_SIZE, EMBED_CACHE_PATH
+)
+from app.utils.cache import LRUCache
+
+
+CacheKey = Tuple[str, int, str]
+
+
+def text_hash(text: str) -> str:
+    """Return the SHA-256 hex digest used to address a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(model: str, dims: int, text: str) -> CacheKey:
+    """Build the (model, dims, text hash) cache key for a text."""
+    return (model, int(dims), text_hash(text))
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache.
+
+    Vectors are looked up in a bounded in-process LRU first, then in a SQLite
+    table keyed by (model, dims, text_hash). Persistent hits are promoted to
+    the LRU tier.
+    """
+
+    def __init__(self, path=EMBED_CACHE_PATH, maxsize: int = EMBED_CACHE_SIZE):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.path = path
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    dims INTEGER NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (model, dims, text_hash)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: CacheKey) -> Optional[List[float]]:
+        """Return a cached vector for key, or None on a miss in both tiers."""
+        vector = self.memory.get(key)
+        if vector is not None:
+            return vector
+
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND dims = ? AND text_hash = ?",
+                key
+            ).fetchone()
+            if row is None:
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+
+        vector = array("f", row[0]).tolist()
+        self.memory.set(key, vector)
+        return vector
+
+    def set(self, key: CacheKey, vector: List[float]):
+        """Store a vector in both tiers."""
+        self.set_many([(key, vector)])
+
+    def set_many(self, items: List[Tuple[CacheKey, List[float]]]):
+        """Store several vectors in both tiers using a single transaction."""
+        if not items:
+            return
+        for key, vector in items:
+            self.memory.set(key, list(vector))
+
+        rows = [(*key, array("f", vector).tobytes()) for key, vector in items]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dims, text_hash, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for both tiers."""
+        return {
+            "memory": self.memory.stats(),
+            "disk": {
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+            },
+        }
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the shared embedding cache, or None when caching is disabled."""
+    if not EMBED_CACHE_ENABLED:
+        return None
+    return EmbeddingCache()
@@ -1,31 +1,202 @@
-"""Gemini embeddings service."""
-from typing import List
-import google.generativeai as genai
-from app.config import GEMINI_API_KEY, EMBED_MODEL
+"""Embeddings service (cached, batched calls to the configured provider)."""
+from typing import Dict, List, Optional, Tuple
+from app.config import (
+    EMBED_MODEL, EMBED_DIMS, EMBED_BATCH_SIZE, EMBED_TIMEOUT_MS, EMBED_HEDGE_AFTER_MS
+)
+from app.services.embedding_cache import get_embedding_cache, make_key, CacheKey
+from app.services.providers import get_embedding_provider
+from app.services.resilience import call, call_async
+from app.utils.concurrency import run_db, single_flight
 
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+Pending = Dict[CacheKey, Tuple[str, List[int]]]
 
 
-def embed_text(text: str) -> List[float]:
+def _lookup_cached(
+    texts: List[str],
+    model: str = EMBED_MODEL,
+    dims: int = EMBED_DIMS
+) -> Tuple[List[List[float]], Pending]:
     """
-    Generate embedding for text using Gemini embeddings.
+    Resolve cache hits for texts embedded with model / dims.
+    
+    Returns:
+        Tuple of (vectors with None for misses, unique misses keyed by cache
+        key with the text and the positions it occurs at)
+    """
+    cache = get_embedding_cache()
+    vectors: List[List[float]] = [None] * len(texts)
+    pending: Pending = {}
+    for i, text in enumerate(texts):
+        key = make_key(model, dims, text)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            vectors[i] = cached
+        else:
+            pending.setdefault(key, (text, []))[1].append(i)
+    return vectors, pending
+
+
+def _fill(
+    vectors: List[List[float]],
+    chunk: List[Tuple[CacheKey, Tuple[str, List[int]]]],
+    embeddings: List[List[float]]
+) -> List[Tuple[CacheKey, List[float]]]:
+    """Place freshly embedded vectors at their positions; return cache entries."""
+    new_entries = []
+    for (key, (_, positions)), vector in zip(chunk, embeddings):
+        for i in positions:
+            vectors[i] = vector
+        new_entries.append((key, vector))
+    return new_entries
+
+
+def _store(entries: List[Tuple[CacheKey, List[float]]]):
+    cache = get_embedding_cache()
+    if cache is not None:
+        cache.set_many(entries)
+
+
+def _chunks(pending: Pending, batch_size: int):
+    misses = list(pending.items())
+    batch_size = max(1, batch_size)
+    for start in range(0, len(misses), batch_size):
+        yield misses[start:start + batch_size]
+
+
+def embed_text(text: str, model: str = EMBED_MODEL, dims: int = EMBED_DIMS) -> List[float]:
+    """
+    Generate embedding for text using the configured provider (Gemini by default).
+    
+    Identical texts are served from the embedding cache when enabled.
+    Provider calls time out after EMBED_TIMEOUT_MS and are retried / circuit
+    broken by app.services.resilience.
     
     Args:
         text: Input text to embed
+        model: Embedding model (pass the active collection's to search it)
+        dims: Embedding dimensions
         
     Returns:
         List of floats representing the embedding vector
     """
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not configured. Set GEMINI_API_KEY environment variable.")
+    vectors, pending = _lookup_cached([text], model, dims)
+    if not pending:
+        return vectors[0]
+    
+    provider = get_embedding_provider(model, dims)
+    embeddings = call("gemini_embed", lambda timeout: provider.embed([text], timeout), EMBED_TIMEOUT_MS)
+    _store(_fill(vectors, list(pending.items()), embeddings))
+    
+    return vectors[0]
+
+
+def embed_texts(
+    texts: List[str],
+    batch_size: int = EMBED_BATCH_SIZE,
+    model: str = EMBED_MODEL,
+    dims: int = EMBED_DIMS
+) -> List[List[float]]:
+    """
+    Generate embeddings for many texts using batch embedding requests.
+    
+    Cached texts are skipped, duplicate texts are embedded once, and the
+    remaining texts are sent in chunks of ``batch_size``.
+    
+    Args:
+        texts: Input texts to embed
+        batch_size: Maximum number of texts per batch request
+        model: Embedding model
+        dims: Embedding dimensions
+        
+    Returns:
+        List of embedding vectors, in the same order as ``texts``
+    """
+    vectors, pending = _lookup_cached(texts, model, dims)
+    if not pending:
+        return vectors
     
-    response = genai.embed_content(
-        model=EMBED_MODEL,
-        content=text,
-        task_type="SEMANTIC_SIMILARITY"
+    provider = get_embedding_provider(model, dims)
+    for chunk in _chunks(pending, batch_size):
+        chunk_texts = [text for _, (text, _) in chunk]
+        embeddings = call(
+            "gemini_embed", lambda timeout: provider.embed(chunk_texts, timeout), EMBED_TIMEOUT_MS
+        )
+        _store(_fill(vectors, chunk, embeddings))
+    
+    return vectors
+
+
+async def _fetch_embeddings(
+    keys: List[CacheKey],
+    texts: Dict[CacheKey, str],
+    model: str,
+    dims: int,
+    hedge_after_ms: Optional[float] = None
+) -> List[List[float]]:
+    """Embed the texts of ``keys`` in one provider call and store them in the cache."""
+    provider = get_embedding_provider(model, dims)
+    batch = [texts[key] for key in keys]
+    embeddings = await call_async(
+        "gemini_embed",
+        lambda timeout: provider.embed_async(batch, timeout),
+        EMBED_TIMEOUT_MS,
+        hedge_after_ms=hedge_after_ms
     )
+    await run_db(_store, list(zip(keys, embeddings)))
+    return embeddings
+
+
+async def embed_text_async(text: str, model: str = EMBED_MODEL, dims: int = EMBED_DIMS) -> List[float]:
+    """
+    Async variant of embed_text (cache I/O runs on the database executor).
+    
+    The provider call is bounded by GEMINI_EMBED_CONCURRENCY; with
+    EMBED_HEDGE_AFTER_MS set, a duplicate request is sent when the first has
+    not answered in time. Concurrent calls for the same text share one
+    provider call (SINGLE_FLIGHT_ENABLED).
+    """
+    vectors, pending = await run_db(_lookup_cached, [text], model, dims)
+    if not pending:
+        return vectors[0]
     
-    return response["embedding"]
+    pending_texts = {key: pending_text for key, (pending_text, _) in pending.items()}
+    embeddings = await single_flight("embedding").do_many(
+        list(pending), lambda keys: _fetch_embeddings(keys, pending_texts, model, dims, EMBED_HEDGE_AFTER_MS)
+    )
+    _fill(vectors, list(pending.items()), embeddings)
+    
+    return vectors[0]
+
+
+async def embed_texts_async(
+    texts: List[str],
+    batch_size: int = EMBED_BATCH_SIZE,
+    model: str = EMBED_MODEL,
+    dims: int = EMBED_DIMS
+) -> List[List[float]]:
+    """
+    Async variant of embed_texts; chunks are requested sequentially.
+    
+    Texts already being embedded by a concurrent call are awaited rather than
+    requested again.
+    """
+    vectors, pending = await run_db(_lookup_cached, texts, model, dims)
+    if not pending:
+        return vectors
+    
+    flight = single_flight("embedding")
+    for chunk in _chunks(pending, batch_size):
+        chunk_texts = {key: text for key, (text, _) in chunk}
+        embeddings = await flight.do_many(
+            [key for key, _ in chunk], lambda keys: _fetch_embeddings(keys, chunk_texts, model, dims)
+        )
+        _fill(vectors, chunk, embeddings)
+    
+    return vectors
+
 
+def get_cache_stats() -> dict:
+    """Return embedding cache hit/miss counters (empty when disabled)."""
+    cache = get_embedding_cache()
+    return cache.stats() if cache is not None else {}
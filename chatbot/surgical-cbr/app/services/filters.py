@@ -0,0 +1,83 @@
+"""Structured profile filters pushed down into vector search."""
+from typing import Any, Dict, Optional, Tuple
+from app.config import FILTER_BMI_TOLERANCE, FILTER_DEFECT_TOLERANCE_CM
+
+
+FILTER_MODES = ("none", "hard", "soft")
+
+
+def donor_site_key(donor_site: Optional[str]) -> Optional[str]:
+    """Normalize a donor site for exact (case-insensitive) payload matching."""
+    if not donor_site:
+        return None
+    return str(donor_site).strip().lower() or None
+
+
+def _range(
+    profile: Dict[str, Any],
+    value_key: str,
+    range_key: str,
+    tolerance: float
+) -> Optional[Tuple[float, float]]:
+    """Return an explicit [lo, hi] range from the profile, or value ± tolerance."""
+    explicit = profile.get(range_key)
+    if isinstance(explicit, (list, tuple)) and len(explicit) == 2:
+        lo, hi = explicit
+        return (float(lo) if lo is not None else None, float(hi) if hi is not None else None)
+
+    value = profile.get(value_key)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (float(value) - tolerance, float(value) + tolerance)
+    return None
+
+
+def profile_conditions(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract filter conditions from a structured profile.
+
+    Supported keys: donor_site, sex, smoker, and bmi / defect_length_cm
+    (matched within FILTER_*_TOLERANCE, or an explicit bmi_range /
+    defect_length_range pair).
+
+    Returns:
+        Mapping of payload field -> exact value, list of values, or (lo, hi) range
+    """
+    conditions: Dict[str, Any] = {}
+
+    key = donor_site_key(profile.get('donor_site'))
+    if key:
+        conditions['donor_site_key'] = key
+
+    sex = profile.get('sex')
+    if isinstance(sex, str) and sex.strip():
+        conditions['sex'] = sorted({sex.strip(), sex.strip().upper()})
+
+    if isinstance(profile.get('smoker'), bool):
+        conditions['smoker'] = profile['smoker']
+
+    bmi = _range(profile, 'bmi', 'bmi_range', FILTER_BMI_TOLERANCE)
+    if bmi:
+        conditions['bmi'] = bmi
+
+    defect = _range(profile, 'defect_length_cm', 'defect_length_range', FILTER_DEFECT_TOLERANCE_CM)
+    if defect:
+        conditions['defect_length_cm'] = defect
+
+    return conditions
+
+
+def to_qdrant_filter(conditions: Dict[str, Any]) -> Optional["Filter"]:
+    """Convert profile conditions into a Qdrant Filter (None when empty)."""
+    # Imported here so the numpy backend never loads qdrant_client
+    from qdrant_client.models import Filter, FieldCondition, MatchAny, MatchValue, Range
+    
+    must = []
+    for field_name, value in conditions.items():
+        if isinstance(value, tuple):
+            lo, hi = value
+            must.append(FieldCondition(key=field_name, range=Range(gte=lo, lte=hi)))
+        elif isinstance(value, list):
+            must.append(FieldCondition(key=field_name, match=MatchAny(any=value)))
+        else:
+            must.append(FieldCondition(key=field_name, match=MatchValue(value=value)))
+    return Filter(must=must) if must else None
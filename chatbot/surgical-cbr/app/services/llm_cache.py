@@ -0,0 +1,142 @@
+"""TTL cache for generated recommendations (in-process LRU + optional SQLite tier)."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from app.config import (
+    GEMINI_MODEL, LLM_PROVIDER,
+    LLM_CACHE_ENABLED, LLM_CACHE_SIZE, LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_PERSIST, LLM_CACHE_PATH
+)
+from app.utils.cache import LRUCache
+
+
+def canonical_json(value: Any) -> str:
+    """Serialize a value deterministically (sorted keys, no whitespace)."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def recommendation_key(
+    prompt_version: str,
+    structured_profile: Dict[str, Any],
+    retrieved_cases: List[Dict[str, Any]]
+) -> str:
+    """
+    Build the cache key for a recommendation.
+
+    The key covers (LLM_PROVIDER, GEMINI_MODEL, prompt version, canonical
+    profile JSON, ordered retrieved case_ids), hashed to a fixed-length string.
+    """
+    material = canonical_json([
+        LLM_PROVIDER,
+        GEMINI_MODEL,
+        prompt_version,
+        canonical_json(structured_profile),
+        [case.get("case_id") for case in retrieved_cases],
+    ])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Cache of {"llm_text", "mermaid", "flags"} results keyed by recommendation_key.
+
+    Entries expire after ``ttl`` seconds. With ``persist`` enabled, entries are
+    also written to a SQLite table so they survive restarts and are shared by
+    all workers on the host.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+        persist: bool = LLM_CACHE_PERSIST,
+        path=LLM_CACHE_PATH
+    ):
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.persist = persist
+        self.path = path
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS recommendations (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_recommendations_expires ON recommendations(expires_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None if missing or expired."""
+        value = self.memory.get(key)
+        if value is not None or not self.persist:
+            return value
+
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM recommendations WHERE cache_key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a result in both tiers."""
+        self.memory.set(key, value)
+        if not self.persist:
+            return
+
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO recommendations (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl)
+            )
+            # Opportunistically drop expired rows
+            conn.execute("DELETE FROM recommendations WHERE expires_at <= ?", (now,))
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for both tiers."""
+        return {
+            "memory": self.memory.stats(),
+            "disk": {
+                "enabled": self.persist,
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+            },
+        }
+
+
+@lru_cache(maxsize=1)
+def get_recommendation_cache() -> Optional[RecommendationCache]:
+    """Return the shared recommendation cache, or None when caching is disabled."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    return RecommendationCache()
@@ -1,13 +1,17 @@
-"""Gemini LLM client for case-based reasoning."""
+"""LLM client for case-based reasoning (Gemini or the configured provider)."""
 import json
-from typing import List, Dict, Any
-import google.generativeai as genai
-from app.config import GEMINI_API_KEY, GEMINI_MODEL
+from typing import AsyncIterator, List, Dict, Any
+from app.config import LLM_TIMEOUT_MS
+from app.services.llm_cache import get_recommendation_cache, recommendation_key
+from app.services.providers import get_llm_provider
+from app.services.resilience import call, call_async, stream_async
+from app.utils.concurrency import run_db, single_flight
+from app.utils.metrics import span
 
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
+# Bump whenever SYSTEM_PROMPT or build_recommendation_prompt changes so cached
+# recommendations generated from the old prompt are not reused
+PROMPT_VERSION = "1"
 
 SYSTEM_PROMPT = """You are a clinical case-based reasoning assistant for reconstructive surgery.
 Be conservative. Cite case IDs. Output sections:
@@ -19,23 +23,11 @@ Be conservative. Cite case IDs. Output sections:
 Follow strictly."""
 
 
-def generate_recommendation(
+def build_recommendation_prompt(
     new_profile_json: str,
     retrieved_cases: List[Dict[str, Any]]
 ) -> str:
-    """
-    Generate recommendation using Gemini LLM.
-    
-    Args:
-        new_profile_json: JSON string of new patient profile
-        retrieved_cases: List of retrieved case dictionaries
-        
-    Returns:
-        LLM-generated recommendation text
-    """
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not configured")
-    
+    """Build the full recommendation prompt (system + user sections)."""
     # Format retrieved cases
     case_texts = []
     for i, case in enumerate(retrieved_cases[:3], 1):
@@ -66,13 +58,121 @@ Instructions:
   Patient -> Case -> Risks -> Adjustment
 """
     
-    model = genai.GenerativeModel(GEMINI_MODEL)
+    return f"{SYSTEM_PROMPT}\n\n{user_prompt}"
+
+
+def generate_recommendation(
+    new_profile_json: str,
+    retrieved_cases: List[Dict[str, Any]]
+) -> str:
+    """
+    Generate recommendation using the configured LLM provider.
     
-    full_prompt = f"{SYSTEM_PROMPT}\n\n{user_prompt}"
+    Args:
+        new_profile_json: JSON string of new patient profile
+        retrieved_cases: List of retrieved case dictionaries
+        
+    Returns:
+        LLM-generated recommendation text
+    """
+    full_prompt = build_recommendation_prompt(new_profile_json, retrieved_cases)
+    provider = get_llm_provider()
+    
+    return call(
+        "gemini_llm",
+        lambda timeout: provider.generate(full_prompt, task="recommendation", timeout=timeout),
+        LLM_TIMEOUT_MS
+    )
+
+
+async def generate_recommendation_async(
+    new_profile_json: str,
+    retrieved_cases: List[Dict[str, Any]]
+) -> str:
+    """Async variant of generate_recommendation (bounded by GEMINI_LLM_CONCURRENCY)."""
+    full_prompt = build_recommendation_prompt(new_profile_json, retrieved_cases)
+    provider = get_llm_provider()
+    
+    return await call_async(
+        "gemini_llm",
+        lambda timeout: provider.generate_async(full_prompt, task="recommendation", timeout=timeout),
+        LLM_TIMEOUT_MS
+    )
+
+
+async def recommend_async(
+    structured_profile: Dict[str, Any],
+    retrieved_cases: List[Dict[str, Any]],
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
+    """
+    Generate (or reuse) a recommendation with its parsed mermaid and flags.
+    
+    Results are cached by (LLM provider/model, PROMPT_VERSION, profile, case_ids).
+    ``bypass_cache`` skips the lookup but still refreshes the cached entry.
+    Concurrent calls with the same key share one generation.
+    
+    Returns:
+        Dictionary with llm_text, mermaid (or None), flags and cached
+    """
+    cache = get_recommendation_cache()
+    key = recommendation_key(PROMPT_VERSION, structured_profile, retrieved_cases)
+    if cache is not None and not bypass_cache:
+        with span("llm_cache"):
+            cached = await run_db(cache.get, key)
+        if cached is not None:
+            return {**cached, "cached": True}
+    
+    async def generate() -> Dict[str, Any]:
+        with span("llm"):
+            llm_text = await generate_recommendation_async(
+                new_profile_json=json.dumps(structured_profile, indent=2),
+                retrieved_cases=retrieved_cases
+            )
+        with span("extract"):
+            result = build_result(llm_text)
+        
+        if cache is not None:
+            await run_db(cache.set, key, result)
+        return result
+    
+    result = await single_flight("recommendation").do(key, generate)
+    
+    return {**result, "cached": False}
+
+
+def build_result(llm_text: str) -> Dict[str, Any]:
+    """Parse mermaid and flags out of a recommendation."""
+    mermaid = extract_mermaid(llm_text)
+    return {
+        "llm_text": llm_text,
+        "mermaid": mermaid if mermaid else None,
+        "flags": extract_flags(llm_text),
+    }
+
+
+async def stream_recommendation_async(
+    new_profile_json: str,
+    retrieved_cases: List[Dict[str, Any]]
+) -> AsyncIterator[str]:
+    """
+    Stream a recommendation from the LLM provider as it is generated.
     
-    response = model.generate_content(full_prompt)
+    Failures before the first chunk are retried; LLM_TIMEOUT_MS bounds the
+    whole stream.
     
-    return response.text
+    Yields:
+        Text chunks in generation order (concatenated they form llm_text)
+    """
+    full_prompt = build_recommendation_prompt(new_profile_json, retrieved_cases)
+    provider = get_llm_provider()
+    
+    async for chunk in stream_async(
+        "gemini_llm",
+        lambda timeout: provider.stream_async(full_prompt, task="recommendation", timeout=timeout),
+        LLM_TIMEOUT_MS
+    ):
+        yield chunk
 
 
 def extract_mermaid(text: str) -> str:
@@ -0,0 +1,68 @@
+"""Embedding and LLM providers (selected with EMBED_PROVIDER / LLM_PROVIDER)."""
+import threading
+from functools import lru_cache
+from typing import Dict, Tuple
+from app.config import EMBED_PROVIDER, LLM_PROVIDER, EMBED_MODEL, EMBED_DIMS
+from app.services.providers.base import EmbeddingProvider, LLMProvider
+
+
+PROVIDERS = ("gemini", "local")
+
+
+def create_embedding_provider(
+    name: str,
+    model: str = EMBED_MODEL,
+    dims: int = EMBED_DIMS
+) -> EmbeddingProvider:
+    """Instantiate an embedding provider by name for an embedding model and size."""
+    if name == "gemini":
+        from app.services.providers.gemini import GeminiEmbeddingProvider
+        return GeminiEmbeddingProvider(model, dims)
+    if name == "local":
+        from app.services.providers.local import HashingEmbeddingProvider
+        return HashingEmbeddingProvider(dims)
+    raise ValueError(f"Unknown EMBED_PROVIDER '{name}' (expected one of {PROVIDERS})")
+
+
+def create_llm_provider(name: str) -> LLMProvider:
+    """Instantiate an LLM provider by name."""
+    if name == "gemini":
+        from app.services.providers.gemini import GeminiLLMProvider
+        return GeminiLLMProvider()
+    if name == "local":
+        from app.services.providers.local import TemplateLLMProvider
+        return TemplateLLMProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER '{name}' (expected one of {PROVIDERS})")
+
+
+_embedding_providers: Dict[Tuple[str, int], EmbeddingProvider] = {}
+_embedding_providers_lock = threading.Lock()
+
+
+def get_embedding_provider(model: str = EMBED_MODEL, dims: int = EMBED_DIMS) -> EmbeddingProvider:
+    """
+    Return the configured embedding provider for an embedding model and size.
+    
+    Defaults to EMBED_MODEL / EMBED_DIMS; queries pass the embedding of the
+    active collection, which differs from them until a reindex swaps.
+    """
+    with _embedding_providers_lock:
+        provider = _embedding_providers.get((model, dims))
+        if provider is None:
+            provider = _embedding_providers[(model, dims)] = create_embedding_provider(
+                EMBED_PROVIDER, model, dims
+            )
+        return provider
+
+
+@lru_cache(maxsize=1)
+def get_llm_provider() -> LLMProvider:
+    """Return the configured LLM provider."""
+    return create_llm_provider(LLM_PROVIDER)
+
+
+__all__ = [
+    'EmbeddingProvider', 'LLMProvider',
+    'create_embedding_provider', 'create_llm_provider',
+    'get_embedding_provider', 'get_llm_provider'
+]
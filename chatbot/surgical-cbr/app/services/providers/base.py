@@ -0,0 +1,54 @@
+"""Provider interfaces for embeddings and text generation."""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns texts into vectors of one embedding model and size (EMBED_MODEL /
+    EMBED_DIMS unless the provider was created for another).
+
+    ``timeout`` (seconds) bounds a single request at the transport level;
+    retries and deadlines are handled by app.services.resilience.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Embed a batch of texts (one vector per text, same order)."""
+
+    async def embed_async(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Async embed; by default runs embed() in a worker thread."""
+        return await asyncio.to_thread(self.embed, texts, timeout)
+
+
+class LLMProvider(ABC):
+    """
+    Generates text from a prompt.
+
+    ``task`` names the prompt family ("recommendation" or "synthetic"); remote
+    models ignore it, local stand-ins use it to pick a response template.
+    ``timeout`` bounds a single request, as for EmbeddingProvider.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def generate(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> str:
+        """Return the full response text."""
+
+    async def generate_async(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> str:
+        """Async generate; by default runs generate() in a worker thread."""
+        return await asyncio.to_thread(self.generate, prompt, task, timeout)
+
+    async def stream_async(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Yield the response in chunks; by default as a single chunk."""
+        yield await self.generate_async(prompt, task, timeout)
@@ -0,0 +1,84 @@
+"""Google Gemini embedding and generation providers."""
+from typing import AsyncIterator, List, Optional
+import google.generativeai as genai
+from app.config import GEMINI_API_KEY, GEMINI_MODEL, EMBED_MODEL, EMBED_DIMS
+from app.services.providers.base import EmbeddingProvider, LLMProvider
+
+
+if GEMINI_API_KEY:
+    genai.configure(api_key=GEMINI_API_KEY)
+
+
+def _require_api_key():
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not configured. Set GEMINI_API_KEY environment variable.")
+
+
+def _request_options(timeout: Optional[float]) -> dict:
+    """Per-request timeout with the SDK's own retries disabled (see app.services.resilience)."""
+    return {"retry": None, "timeout": timeout}
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """Gemini batch embeddings (SEMANTIC_SIMILARITY task, EMBED_MODEL / EMBED_DIMS by default)."""
+
+    name = "gemini"
+
+    def __init__(self, model: str = EMBED_MODEL, dims: int = EMBED_DIMS):
+        self.model = model
+        self.dims = dims
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        _require_api_key()
+        response = genai.embed_content(
+            model=self.model,
+            content=texts,
+            task_type="SEMANTIC_SIMILARITY",
+            output_dimensionality=self.dims,
+            request_options=_request_options(timeout)
+        )
+        return response["embedding"]
+
+    async def embed_async(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        _require_api_key()
+        response = await genai.embed_content_async(
+            model=self.model,
+            content=texts,
+            task_type="SEMANTIC_SIMILARITY",
+            output_dimensionality=self.dims,
+            request_options=_request_options(timeout)
+        )
+        return response["embedding"]
+
+
+class GeminiLLMProvider(LLMProvider):
+    """Gemini text generation with GEMINI_MODEL."""
+
+    name = "gemini"
+
+    def generate(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> str:
+        _require_api_key()
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        return model.generate_content(prompt, request_options=_request_options(timeout)).text
+
+    async def generate_async(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> str:
+        _require_api_key()
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        response = await model.generate_content_async(prompt, request_options=_request_options(timeout))
+        return response.text
+
+    async def stream_async(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        _require_api_key()
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        response = await model.generate_content_async(
+            prompt, stream=True, request_options=_request_options(timeout)
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
@@ -0,0 +1,205 @@
+"""Offline providers: hashing embedder and templated LLM stand-in."""
+import asyncio
+import hashlib
+import json
+import math
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from app.config import (
+    EMBED_DIMS,
+    LOCAL_EMBED_LATENCY_MS, LOCAL_LLM_LATENCY_MS, LOCAL_LLM_FIXTURE_PATH
+)
+from app.services.providers.base import EmbeddingProvider, LLMProvider
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dims: int) -> Tuple[int, float]:
+    """Map a feature to a (dimension, sign) pair with a stable hash."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dims, (1.0 if digest >> 63 else -1.0)
+
+
+def hash_embedding(text: str, dims: int = EMBED_DIMS) -> List[float]:
+    """
+    Deterministic bag-of-words embedding via signed feature hashing.
+    
+    Unigrams and bigrams are hashed into ``dims`` buckets with sublinear
+    (1 + log tf) weights and the result is L2-normalized, so texts sharing
+    vocabulary have a positive cosine similarity.
+    """
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature, count in features.items():
+        index, sign = _bucket(feature, dims)
+        vector[index] += sign * (1.0 + math.log(count))
+    
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        vector[0] = 1.0  # empty text: any fixed unit vector keeps cosine defined
+        return vector.tolist()
+    return (vector / norm).tolist()
+
+
+def _simulate_latency(latency: float, timeout: Optional[float]):
+    """Sleep for a simulated round trip, raising TimeoutError past the request timeout."""
+    if timeout is not None and latency > timeout:
+        time.sleep(max(0.0, timeout))
+        raise TimeoutError(f"simulated request exceeded its {timeout:.3f}s timeout")
+    time.sleep(latency)
+
+
+async def _simulate_latency_async(latency: float, timeout: Optional[float]):
+    """Await a simulated round trip, raising TimeoutError past the request timeout."""
+    await asyncio.wait_for(asyncio.sleep(latency), timeout)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Local embedder; LOCAL_EMBED_LATENCY_MS simulates a per-batch network round trip."""
+
+    name = "local"
+
+    def __init__(self, dims: int = EMBED_DIMS, latency_ms: float = LOCAL_EMBED_LATENCY_MS):
+        self.dims = dims
+        self.latency = latency_ms / 1000.0
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        if self.latency:
+            _simulate_latency(self.latency, timeout)
+        return [hash_embedding(text, self.dims) for text in texts]
+
+    async def embed_async(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        if self.latency:
+            await _simulate_latency_async(self.latency, timeout)
+        return [hash_embedding(text, self.dims) for text in texts]
+
+
+RECOMMENDATION_TEMPLATE = """1) Similarity
+{similarity}
+
+2) Recommended technique
+Follow the approach of case {best_case}, adjusted for the patient's profile (speculative).
+
+3) Red flags
+- Red flag: active smoking increases flap failure risk (70%)
+- Red flag: elevated BMI increases wound complication risk (40%)
+
+4) Next steps
+- Confirm donor site perfusion pre-operatively
+- Review imaging for recipient vessels
+- Plan smoking cessation and follow-up
+
+5) Diagram
+```mermaid
+graph TD
+    Patient --> Case{best_case}
+    Case{best_case} --> Risks
+    Risks --> Adjustment
+```
+"""
+
+_CASE_ID_PATTERN = re.compile(r'"case_id":\s*(\d+)')
+_DESCRIPTION_PATTERN = re.compile(r"^Description:\s*(.*)$", re.MULTILINE)
+
+
+def _load_fixtures(path: Optional[str]) -> Dict[str, str]:
+    """Load {task: response text} fixtures from a JSON file."""
+    if not path:
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _synthetic_case(prompt: str) -> Dict[str, Any]:
+    """Build a plausible synthetic case seeded by the prompt's description."""
+    match = _DESCRIPTION_PATTERN.search(prompt)
+    description = match.group(1).strip() if match else "synthetic case"
+    seed = int.from_bytes(hashlib.blake2b(description.encode("utf-8"), digest_size=4).digest(), "little")
+    donor_sites = ("anterolateral thigh", "latissimus dorsi", "radial forearm", "fibula")
+    return {
+        "case_id": None,
+        "title": f"Synthetic: {description[:60]}",
+        "age": 25 + seed % 55,
+        "sex": "F" if seed % 2 else "M",
+        "bmi": round(18 + (seed % 170) / 10, 1),
+        "smoker": bool(seed % 3 == 0),
+        "defect_length_cm": round(1 + (seed % 290) / 10, 1),
+        "donor_site": donor_sites[seed % len(donor_sites)],
+        "technique_summary": f"Free flap reconstruction for {description}",
+        "complications": None,
+        "notes": "Generated by the local template provider",
+        "outcome_rating": 1 + seed % 5,
+        "imaging_meta": None,
+        "synthetic": True,
+    }
+
+
+class TemplateLLMProvider(LLMProvider):
+    """
+    Offline LLM stand-in.
+
+    Responses come from LOCAL_LLM_FIXTURE_PATH (a JSON object of task ->
+    text) when set, otherwise from built-in templates filled from the prompt.
+    LOCAL_LLM_LATENCY_MS is spread across the streamed chunks.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        latency_ms: float = LOCAL_LLM_LATENCY_MS,
+        fixture_path: Optional[str] = LOCAL_LLM_FIXTURE_PATH
+    ):
+        self.latency = latency_ms / 1000.0
+        self.fixtures = _load_fixtures(fixture_path)
+
+    def _render(self, prompt: str, task: str) -> str:
+        if task in self.fixtures:
+            return self.fixtures[task]
+        if task == "synthetic":
+            return json.dumps(_synthetic_case(prompt))
+        
+        case_ids = _CASE_ID_PATTERN.findall(prompt)
+        similarity = "\n".join(
+            f"- Case {case_id}: comparable defect and donor site" for case_id in case_ids
+        ) or "- No retrieved cases"
+        return RECOMMENDATION_TEMPLATE.format(
+            similarity=similarity,
+            best_case=case_ids[0] if case_ids else "N/A"
+        )
+
+    def generate(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> str:
+        if self.latency:
+            _simulate_latency(self.latency, timeout)
+        return self._render(prompt, task)
+
+    async def generate_async(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> str:
+        if self.latency:
+            await _simulate_latency_async(self.latency, timeout)
+        return self._render(prompt, task)
+
+    async def stream_async(
+        self, prompt: str, task: str = "recommendation", timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        lines = self._render(prompt, task).splitlines(keepends=True)
+        delay = self.latency / max(1, len(lines))
+        # The timeout bounds the whole stream, not each chunk
+        expires = None if timeout is None else time.monotonic() + timeout
+        for line in lines:
+            if delay:
+                remaining = None if expires is None else expires - time.monotonic()
+                await _simulate_latency_async(delay, remaining)
+            yield line
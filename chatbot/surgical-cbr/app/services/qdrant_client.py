@@ -1,11 +1,17 @@
 """Utilities for creating a shared Qdrant client."""
+import threading
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from qdrant_client import QdrantClient
+from typing import Optional, Tuple
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from app.config import QDRANT_PATH, QDRANT_HOST, QDRANT_PORT
 
 
+# Embedded storage can only be opened once, so the first client is created
+# under a lock (background startup may race a request for it)
+_client_lock = threading.Lock()
+
+
 def _ensure_qdrant_path():
     """Make sure the embedded Qdrant directory exists."""
     qdrant_dir = Path(QDRANT_PATH)
@@ -27,17 +33,47 @@ def _try_remote_client() -> Optional[QdrantClient]:
         return None
 
 
+def _resolve_client() -> Tuple[QdrantClient, bool]:
+    """Return the shared client; returns (client, is_remote)."""
+    with _client_lock:
+        return _create_client()
+
+
 @lru_cache(maxsize=1)
+def _create_client() -> Tuple[QdrantClient, bool]:
+    """Create the shared client; returns (client, is_remote)."""
+    remote = _try_remote_client()
+    if remote:
+        return remote, True
+
+    _ensure_qdrant_path()
+    return QdrantClient(path=QDRANT_PATH), False
+
+
 def get_qdrant_client() -> QdrantClient:
     """
     Return a cached QdrantClient instance.
 
     Prefers embedded/local storage but will connect to a remote host when available.
     """
-    remote = _try_remote_client()
-    if remote:
-        return remote
+    return _resolve_client()[0]
 
-    _ensure_qdrant_path()
-    return QdrantClient(path=QDRANT_PATH)
+
+def is_remote_qdrant() -> bool:
+    """Return True when the shared client talks to a remote Qdrant server."""
+    return _resolve_client()[1]
+
+
+@lru_cache(maxsize=1)
+def get_async_qdrant_client() -> Optional[AsyncQdrantClient]:
+    """
+    Return a cached AsyncQdrantClient when talking to a remote Qdrant.
+
+    Embedded storage can only be opened by one client per process, so in
+    embedded mode this returns None and callers should run the sync client
+    in a worker thread instead.
+    """
+    if not is_remote_qdrant():
+        return None
+    return AsyncQdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
 
@@ -0,0 +1,374 @@
+"""Resumable re-embedding of the case corpus into a new vector collection."""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from app.config import (
+    EMBED_MODEL, EMBED_DIMS, QDRANT_COLLECTION, VECTOR_BACKEND,
+    REINDEX_BATCH_SIZE, REINDEX_CONCURRENCY, REINDEX_LEASE_SECONDS
+)
+from app.db import case_store
+from app.db.connection import get_read_connection, write_transaction
+from app.services.embeddings import embed_texts_async
+from app.services.vector_store import (
+    VectorBackend, VectorPoint, active_collection_name, active_embedding, create_backend,
+    set_vector_backend
+)
+from app.utils.concurrency import run_db
+
+
+_run_lock = asyncio.Lock()
+
+
+class LeaseLostError(RuntimeError):
+    """Another process took over the reindex job (our lease expired)."""
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Return a reindex job row."""
+    row = get_read_connection().execute(
+        "SELECT * FROM reindex_jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_latest_job() -> Optional[Dict[str, Any]]:
+    """Return the most recent reindex job row."""
+    row = get_read_connection().execute(
+        "SELECT * FROM reindex_jobs ORDER BY job_id DESC LIMIT 1"
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_reindex_status() -> Dict[str, Any]:
+    """Summarize the active and retained collections, stale cases and the latest job."""
+    active_model, active_dims = active_embedding()
+    return {
+        "active_collection": active_collection_name(),
+        "active_embed_model": active_model,
+        "active_embed_dims": active_dims,
+        "previous_collection": case_store.get_corpus_meta('previous_collection'),
+        "embed_model": EMBED_MODEL,
+        "embed_dims": EMBED_DIMS,
+        "stale_cases": case_store.count_stale_cases(),
+        "running": _run_lock.locked(),
+        "job": get_latest_job(),
+    }
+
+
+def _claim_job(owner: str) -> Optional[Dict[str, Any]]:
+    """
+    Claim the running job for the current EMBED_MODEL/EMBED_DIMS, or start one.
+    
+    Running jobs for another embedding config are marked abandoned. The
+    claim is a lease in reindex_leases taken under BEGIN IMMEDIATE, so of
+    several processes (API workers, scripts/reindex.py) only one runs the
+    job; the others get None until the owner releases it or its lease
+    expires without being renewed.
+    
+    Args:
+        owner: Identifier of this run
+    
+    Returns:
+        The claimed job row, or None when another process holds the lease
+    """
+    now = time.time()
+    with write_transaction() as conn:
+        # Take the write lock before reading, so no other process can claim
+        # the job between the lease check and the update
+        conn.execute("BEGIN IMMEDIATE")
+        held = conn.execute(
+            "SELECT 1 FROM reindex_leases l JOIN reindex_jobs j ON j.job_id = l.job_id "
+            "WHERE j.status = 'running' AND l.owner != ? AND l.expires_at > ?",
+            (owner, now)
+        ).fetchone()
+        if held:
+            return None
+        
+        row = conn.execute(
+            "SELECT job_id FROM reindex_jobs "
+            "WHERE status = 'running' AND embed_model = ? AND embed_dims = ? "
+            "ORDER BY job_id DESC LIMIT 1",
+            (EMBED_MODEL, EMBED_DIMS)
+        ).fetchone()
+        if row:
+            job_id = row[0]
+        else:
+            conn.execute(
+                "UPDATE reindex_jobs SET status = 'abandoned', updated_at = CURRENT_TIMESTAMP "
+                "WHERE status = 'running'"
+            )
+            job_id = conn.execute(
+                "INSERT INTO reindex_jobs (target_collection, embed_model, embed_dims) VALUES ('', ?, ?)",
+                (EMBED_MODEL, EMBED_DIMS)
+            ).lastrowid
+            conn.execute(
+                "UPDATE reindex_jobs SET target_collection = ? WHERE job_id = ?",
+                (f"{QDRANT_COLLECTION}_r{job_id}", job_id)
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO reindex_leases (job_id, owner, expires_at) VALUES (?, ?, ?)",
+            (job_id, owner, now + REINDEX_LEASE_SECONDS)
+        )
+    return get_job(job_id)
+
+
+def _renew_lease(conn, job_id: int, owner: str):
+    """
+    Extend the lease on a job inside a write transaction.
+    
+    Raises:
+        LeaseLostError: If another process has claimed the job since
+    """
+    renewed = conn.execute(
+        "UPDATE reindex_leases SET expires_at = ? WHERE job_id = ? AND owner = ?",
+        (time.time() + REINDEX_LEASE_SECONDS, job_id, owner)
+    ).rowcount
+    if not renewed:
+        raise LeaseLostError(f"Reindex job {job_id} was claimed by another process")
+
+
+def _release_lease(job_id: int, owner: str):
+    """Give up the lease on a job (if still held)."""
+    with write_transaction() as conn:
+        conn.execute(
+            "DELETE FROM reindex_leases WHERE job_id = ? AND owner = ?", (job_id, owner)
+        )
+
+
+def _fetch_cases_after(case_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Return up to limit cases with case_id > case_id, in id order."""
+    rows = get_read_connection().execute(
+        "SELECT * FROM cases WHERE case_id > ? ORDER BY case_id LIMIT ?",
+        (case_id, limit)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _checkpoint(job_id: int, owner: str, last_case_id: int, processed: int):
+    """Record that every case up to last_case_id is in the target collection and renew the lease."""
+    with write_transaction() as conn:
+        _renew_lease(conn, job_id, owner)
+        conn.execute(
+            "UPDATE reindex_jobs SET last_case_id = ?, processed = processed + ?, "
+            "error = NULL, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+            (last_case_id, processed, job_id)
+        )
+
+
+def _record_error(job_id: int, error: str):
+    """Store the error of a failed run (the job stays resumable)."""
+    with write_transaction() as conn:
+        conn.execute(
+            "UPDATE reindex_jobs SET error = ?, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+            (error, job_id)
+        )
+
+
+def _mark_reindexed(conn, job: Dict[str, Any]):
+    """Stamp cases covered by the job with the embedding config they now have."""
+    conn.execute(
+        "UPDATE cases SET embed_model = ?, embed_dims = ? WHERE case_id <= ?",
+        (job['embed_model'], job['embed_dims'], job['last_case_id'])
+    )
+
+
+def _swap(job: Dict[str, Any], owner: str) -> Optional[str]:
+    """
+    Atomically make the job's collection the active one and complete the job.
+    
+    The replaced collection is recorded as ``previous_collection`` (kept
+    until drop_previous_collection) so other processes can finish the
+    queries they started against it.
+    
+    Returns:
+        The collection retained from an earlier swap, which is no longer
+        referenced and can be dropped
+    
+    Raises:
+        LeaseLostError: If another process has claimed the job since
+    """
+    with write_transaction() as conn:
+        _renew_lease(conn, job['job_id'], owner)
+        _mark_reindexed(conn, job)
+        meta = dict(conn.execute(
+            "SELECT key, value FROM corpus_meta WHERE key IN ('active_collection', 'previous_collection')"
+        ).fetchall())
+        previous = meta.get('active_collection', QDRANT_COLLECTION)
+        case_store.set_corpus_meta({
+            'active_collection': job['target_collection'],
+            'active_embed_model': job['embed_model'],
+            'active_embed_dims': job['embed_dims'],
+            'previous_collection': previous,
+        }, conn=conn)
+        conn.execute(
+            "UPDATE reindex_jobs SET status = 'completed', updated_at = CURRENT_TIMESTAMP "
+            "WHERE job_id = ?",
+            (job['job_id'],)
+        )
+    # Cached retrieval results came from the previous collection; the new
+    # generation also makes other processes look up the active collection
+    case_store.bump_corpus_generation()
+    superseded = meta.get('previous_collection')
+    if superseded in (previous, job['target_collection']):
+        return None
+    return superseded
+
+
+def drop_previous_collection() -> Optional[str]:
+    """
+    Delete the collection replaced by the last reindex swap.
+    
+    Returns:
+        The dropped collection, or None when none is retained
+    """
+    previous = case_store.get_corpus_meta('previous_collection')
+    if not previous:
+        return None
+    if previous == active_collection_name():
+        raise RuntimeError(f"'{previous}' is the active collection")
+    create_backend(VECTOR_BACKEND, previous).drop_collection()
+    with write_transaction() as conn:
+        conn.execute("DELETE FROM corpus_meta WHERE key = 'previous_collection'")
+    return previous
+
+
+def _mark_caught_up(job: Dict[str, Any]):
+    """Stamp cases copied after the swap."""
+    with write_transaction() as conn:
+        _mark_reindexed(conn, job)
+
+
+async def _write_batch(backend: VectorBackend, cases: List[Dict[str, Any]]):
+    """Embed a batch of cases with the backend's model and upsert it."""
+    blob_texts = [case.get('blob_text') or case_store.build_blob_text(case) for case in cases]
+    vectors = await embed_texts_async(
+        blob_texts, model=backend.embed_model, dims=backend.embed_dims
+    )
+    points = [
+        VectorPoint(
+            case_id=case['case_id'],
+            vector=vector,
+            payload=case_store.build_payload(
+                {**case, 'smoker': bool(case['smoker'])}, case['case_id'], blob_text
+            )
+        )
+        for case, blob_text, vector in zip(cases, blob_texts, vectors)
+    ]
+    await asyncio.to_thread(backend.upsert, points)
+
+
+async def _copy_cases(
+    job: Dict[str, Any],
+    owner: str,
+    backend: VectorBackend,
+    batch_size: int,
+    concurrency: int
+) -> int:
+    """
+    Copy every case after the job's checkpoint into the target collection.
+    
+    Up to ``concurrency`` batches are embedded at once; the checkpoint is
+    advanced once all of them are stored.
+    
+    Returns:
+        Number of cases copied
+    """
+    copied = 0
+    while True:
+        cases = await run_db(_fetch_cases_after, job['last_case_id'], batch_size * concurrency)
+        if not cases:
+            return copied
+        
+        batches = [cases[i:i + batch_size] for i in range(0, len(cases), batch_size)]
+        await asyncio.gather(*(_write_batch(backend, batch) for batch in batches))
+        
+        job['last_case_id'] = cases[-1]['case_id']
+        job['processed'] += len(cases)
+        await run_db(_checkpoint, job['job_id'], owner, job['last_case_id'], len(cases))
+        copied += len(cases)
+        print(f"Reindex job {job['job_id']}: {job['processed']} case(s), checkpoint at case {job['last_case_id']}")
+
+
+async def run_reindex(
+    batch_size: int = REINDEX_BATCH_SIZE,
+    concurrency: int = REINDEX_CONCURRENCY,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Re-embed all cases with EMBED_MODEL/EMBED_DIMS into a new collection and swap to it.
+    
+    The job is checkpointed after every round of batches; calling this again
+    after a crash resumes from the checkpoint. The active collection keeps
+    serving queries until the swap, which is a single SQLite transaction.
+    Cases added while the job runs are picked up before (and right after)
+    the swap; inserts embedded for the old collection that reach SQLite
+    after the swap are refused (see case_store.insert_cases_batch).
+    
+    Only one process runs a job at a time: the run claims a lease on it in
+    SQLite and renews it at every checkpoint.
+    
+    Args:
+        batch_size: Cases per embedding batch
+        concurrency: Batches embedded concurrently
+        force: Rebuild even when no case is stale
+    
+    Returns:
+        The job row, {"status": "up_to_date"} when nothing needed reindexing,
+        or {"status": "running_elsewhere"} when another process holds the job
+    
+    Raises:
+        RuntimeError: If a reindex is already running in this process
+        LeaseLostError: If another process took the job over mid-run
+    """
+    if _run_lock.locked():
+        raise RuntimeError("A reindex is already running")
+    
+    async with _run_lock:
+        stale = await run_db(case_store.count_stale_cases)
+        latest = await run_db(get_latest_job)
+        resumable = latest is not None and latest['status'] == 'running'
+        if not (stale or force or resumable):
+            return {"status": "up_to_date", "active_collection": await run_db(active_collection_name)}
+        
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        job = await run_db(_claim_job, owner)
+        if job is None:
+            print("Reindex skipped: another process is running the job")
+            return {"status": "running_elsewhere", "job": await run_db(get_latest_job)}
+        print(
+            f"Reindex job {job['job_id']}: {stale} stale case(s) -> '{job['target_collection']}' "
+            f"({job['embed_model']}/{job['embed_dims']}), resuming after case {job['last_case_id']}"
+        )
+        backend = create_backend(
+            VECTOR_BACKEND, job['target_collection'],
+            embed_model=job['embed_model'], embed_dims=job['embed_dims']
+        )
+        
+        try:
+            await asyncio.to_thread(backend.ensure_collection)
+            await _copy_cases(job, owner, backend, batch_size, concurrency)
+            superseded = await run_db(_swap, job, owner)
+            set_vector_backend(backend)
+            print(f"Reindex job {job['job_id']}: active collection is now '{job['target_collection']}'")
+            
+            # Cases inserted into the previous collection while swapping
+            if await _copy_cases(job, owner, backend, batch_size, concurrency):
+                await run_db(_mark_caught_up, job)
+        except Exception as e:
+            await run_db(_record_error, job['job_id'], str(e))
+            raise
+        finally:
+            await run_db(_release_lease, job['job_id'], owner)
+        
+        if superseded:
+            await asyncio.to_thread(create_backend(VECTOR_BACKEND, superseded).drop_collection)
+        previous = await run_db(case_store.get_corpus_meta, 'previous_collection')
+        print(
+            f"Reindex job {job['job_id']}: previous collection '{previous}' retained; "
+            f"drop it with scripts/reindex.py --drop-previous"
+        )
+        
+        return await run_db(get_job, job['job_id'])
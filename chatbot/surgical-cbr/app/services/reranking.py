@@ -0,0 +1,181 @@
+"""Vectorized hybrid re-ranking (feature score + embedding score fusion)."""
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.config import FEATURE_WEIGHT, EMBEDDING_WEIGHT
+
+
+# Component weights, in the order compute_feature_score accumulates them
+DEFECT_WEIGHT = 0.3
+DONOR_WEIGHT = 0.3
+SMOKER_WEIGHT = 0.2
+BMI_WEIGHT = 0.2
+
+DEFECT_SCALE_CM = 20.0  # difference at which defect closeness reaches 0
+BMI_SCALE = 15.0        # difference at which BMI closeness reaches 0
+
+COMPONENT_WEIGHTS = {
+    'defect': DEFECT_WEIGHT,
+    'donor': DONOR_WEIGHT,
+    'smoker': SMOKER_WEIGHT,
+    'bmi': BMI_WEIGHT,
+}
+
+
+def _number(value: Any) -> Optional[float]:
+    """Return a float for numeric values, None otherwise."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+class CandidateArrays:
+    """Column-oriented view of a candidate set used for batched scoring."""
+
+    def __init__(self, candidates: Sequence[Dict[str, Any]]):
+        n = len(candidates)
+        self.defect = np.full(n, np.nan)
+        self.bmi = np.full(n, np.nan)
+        self.smoker = np.full(n, np.nan)
+        self.donor = np.full(n, -1, dtype=np.int64)
+        self.donor_codes: Dict[str, int] = {}
+
+        for i, case in enumerate(candidates):
+            # Falsy values (None, 0) are treated as missing, as in compute_feature_score
+            if case.get('defect_length_cm'):
+                self.defect[i] = case['defect_length_cm']
+            if case.get('bmi'):
+                self.bmi[i] = case['bmi']
+            if case.get('smoker') is not None:
+                self.smoker[i] = float(case['smoker'])
+            if case.get('donor_site'):
+                self.donor[i] = self.intern(case['donor_site'])
+
+    def intern(self, donor_site: str) -> int:
+        """Return the integer code for a donor site (case-insensitive)."""
+        key = donor_site.lower()
+        code = self.donor_codes.get(key)
+        if code is None:
+            code = len(self.donor_codes)
+            self.donor_codes[key] = code
+        return code
+
+
+def feature_components(
+    arrays: CandidateArrays,
+    profile: Dict[str, Any]
+) -> Dict[str, np.ndarray]:
+    """
+    Compute per-component feature scores for every candidate.
+
+    Missing components are NaN, so callers can tell "no data" from a score of 0.
+    """
+    n = len(arrays.defect)
+    components = {}
+
+    profile_defect = _number(profile.get('defect_length_cm'))
+    if profile_defect is not None:
+        diff = np.abs(profile_defect - arrays.defect)
+        components['defect'] = np.maximum(0, 1 - (diff / DEFECT_SCALE_CM))
+    else:
+        components['defect'] = np.full(n, np.nan)
+
+    profile_donor = profile.get('donor_site')
+    if profile_donor:
+        code = arrays.donor_codes.get(profile_donor.lower(), -2)
+        components['donor'] = np.where(
+            arrays.donor >= 0, (arrays.donor == code).astype(float), np.nan
+        )
+    else:
+        components['donor'] = np.full(n, np.nan)
+
+    profile_smoker = profile.get('smoker')
+    if profile_smoker is not None:
+        smoker_value = _number(profile_smoker)
+        if isinstance(profile_smoker, bool):
+            smoker_value = float(profile_smoker)
+        if smoker_value is None:
+            match = np.zeros(n)
+        else:
+            match = (arrays.smoker == smoker_value).astype(float)
+        components['smoker'] = np.where(np.isnan(arrays.smoker), np.nan, match)
+    else:
+        components['smoker'] = np.full(n, np.nan)
+
+    profile_bmi = _number(profile.get('bmi'))
+    if profile_bmi is not None:
+        diff = np.abs(profile_bmi - arrays.bmi)
+        components['bmi'] = np.maximum(0, 1 - (diff / BMI_SCALE))
+    else:
+        components['bmi'] = np.full(n, np.nan)
+
+    return components
+
+
+def feature_scores(components: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Weighted average of the available components per candidate.
+
+    Components are accumulated in the same order as compute_feature_score so
+    the floating point results are identical.
+    """
+    weighted_sum = None
+    total_weight = None
+    for name, weight in COMPONENT_WEIGHTS.items():
+        present = ~np.isnan(components[name])
+        term = np.where(present, components[name] * weight, 0.0)
+        w = np.where(present, weight, 0.0)
+        weighted_sum = term if weighted_sum is None else weighted_sum + term
+        total_weight = w if total_weight is None else total_weight + w
+
+    scores = np.zeros_like(weighted_sum)
+    np.divide(weighted_sum, total_weight, out=scores, where=total_weight > 0)
+    return scores
+
+
+def rerank(
+    candidates: List[Dict[str, Any]],
+    embedding_scores: Sequence[float],
+    profile: Dict[str, Any],
+    top_k: int
+) -> List[Dict[str, Any]]:
+    """
+    Score and sort candidates in one batched pass.
+
+    Produces the same final_score / embedding_score / feature_score values
+    and ordering as scoring each case with compute_feature_score. Each result
+    also gets ``feature_components``: the per-component closeness (0-1, None
+    when the profile or case lacks the field) behind its feature_score.
+
+    Args:
+        candidates: Candidate case payloads
+        embedding_scores: Vector similarity for each candidate
+        profile: Query profile used for feature scoring
+        top_k: Number of top cases to return
+
+    Returns:
+        Top-k case dictionaries sorted by final_score (highest first)
+    """
+    if not candidates:
+        return []
+
+    arrays = CandidateArrays(candidates)
+    components = feature_components(arrays, profile)
+    normalized_feature = np.clip(feature_scores(components), 0, 1)
+    normalized_embedding = np.clip(np.asarray(embedding_scores, dtype=float), 0, 1)
+    final = FEATURE_WEIGHT * normalized_feature + EMBEDDING_WEIGHT * normalized_embedding
+
+    # Stable sort keeps the vector-search order for ties
+    order = np.argsort(-final, kind="stable")[:top_k]
+
+    results = []
+    for i in order:
+        case = candidates[i]
+        case['final_score'] = float(final[i])
+        case['embedding_score'] = float(normalized_embedding[i])
+        case['feature_score'] = float(normalized_feature[i])
+        case['feature_components'] = {
+            name: None if np.isnan(values[i]) else float(values[i])
+            for name, values in components.items()
+        }
+        results.append(case)
+    return results
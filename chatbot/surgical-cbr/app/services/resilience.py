@@ -0,0 +1,369 @@
+"""Deadlines, retries, hedging and circuit breaking for embedding / LLM calls."""
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+from app.config import (
+    PROVIDER_MAX_RETRIES, PROVIDER_RETRY_BASE_MS, PROVIDER_RETRY_MAX_MS,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS
+)
+from app.utils.concurrency import limiter
+from app.utils.metrics import PROVIDER_HEDGES, PROVIDER_RETRIES
+
+
+T = TypeVar("T")
+
+# Transient error classes (google.api_core.exceptions, httpx / qdrant_client
+# transport failures), matched by name so this module never imports an SDK
+RETRYABLE_ERROR_NAMES = frozenset({
+    "ServerError", "TooManyRequests", "ResourceExhausted", "DeadlineExceeded", "ServiceUnavailable",
+    "TransportError", "ResponseHandlingException",
+})
+
+
+class DeadlineExpired(TimeoutError):
+    """The request's deadline budget is used up; no further attempts are made."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The dependency's circuit breaker is open; the call was not attempted."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for transient errors: timeouts, connection errors, 429 and 5xx responses."""
+    if isinstance(error, (DeadlineExpired, CircuitOpenError)):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """True when an error means the dependency is degraded rather than the request is bad."""
+    return isinstance(error, (DeadlineExpired, CircuitOpenError)) or is_retryable(error)
+
+
+# Absolute time.monotonic() deadline of the current request (None = unbounded)
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound every provider call made inside the block by a time budget.
+
+    Usable in sync and async code; the budget follows the context into
+    run_db and worker threads. A nested budget can only shorten the outer
+    one, and None or a non-positive value leaves it unchanged.
+    """
+    if seconds is None or seconds <= 0:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current deadline (None when unbounded)."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def _attempt_timeout(timeout_ms: float) -> Optional[float]:
+    """Per-attempt timeout in seconds: timeout_ms capped by the remaining deadline."""
+    timeout = timeout_ms / 1000.0 if timeout_ms > 0 else None
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExpired("request deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one dependency.
+
+    closed: calls pass; failure_threshold consecutive retryable failures open it.
+    open: calls fail fast with CircuitOpenError for reset_seconds.
+    half_open: a single trial call is let through; success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit breaker is open")
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit breaker is half-open (trial in flight)")
+                self._trial_in_flight = True
+
+    def record_success(self):
+        """The dependency answered (including with a non-retryable error)."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """A call failed with a retryable error."""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failure_threshold <= 0:
+                return
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opens += 1
+                    print(f"Circuit breaker '{self.name}' opened after {self.failures} consecutive failure(s)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """A call ended without an answer either way (cancelled or out of deadline)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the shared circuit breaker of a dependency."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Return state / failures / opens / rejected calls per dependency."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def _retry_delay(breaker: CircuitBreaker, error: Exception, attempt: int) -> Optional[float]:
+    """
+    Record a failed attempt with the breaker.
+
+    Returns:
+        Seconds to back off before the next attempt (full jitter), or None
+        when the error is not retryable, retries are used up or the backoff
+        would overrun the deadline
+    """
+    if isinstance(error, DeadlineExpired):
+        breaker.abandon()
+        return None
+    if not is_retryable(error):
+        breaker.record_success()
+        return None
+    breaker.record_failure()
+    if attempt >= PROVIDER_MAX_RETRIES:
+        return None
+    delay = random.uniform(0, min(PROVIDER_RETRY_MAX_MS, PROVIDER_RETRY_BASE_MS * 2 ** attempt)) / 1000.0
+    left = remaining()
+    if left is not None and left <= delay:
+        return None
+    PROVIDER_RETRIES.inc(dependency=breaker.name)
+    return delay
+
+
+def call(dependency: str, func: Callable[[Optional[float]], T], timeout_ms: float) -> T:
+    """
+    Sync variant of call_async (no hedging, no concurrency limit).
+
+    The attempt timeout is passed to func and enforced by the provider's
+    transport.
+    """
+    breaker = circuit_breaker(dependency)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = func(_attempt_timeout(timeout_ms))
+        except Exception as e:
+            delay = _retry_delay(breaker, e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            breaker.abandon()
+            raise
+        breaker.record_success()
+        return result
+
+
+async def _attempt(dependency: str, func: Callable[[Optional[float]], Awaitable[T]], timeout_ms: float) -> T:
+    """One attempt under the dependency's concurrency limit and the attempt timeout."""
+    async with limiter(dependency):
+        timeout = _attempt_timeout(timeout_ms)
+        return await asyncio.wait_for(func(timeout), timeout)
+
+
+async def _hedged(
+    dependency: str,
+    func: Callable[[Optional[float]], Awaitable[T]],
+    timeout_ms: float,
+    hedge_after: float
+) -> T:
+    """Run an attempt and, if it is still running after hedge_after seconds, race a duplicate."""
+    tasks = [asyncio.ensure_future(_attempt(dependency, func, timeout_ms))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            PROVIDER_HEDGES.inc(dependency=dependency)
+            tasks.append(asyncio.ensure_future(_attempt(dependency, func, timeout_ms)))
+
+        # First success wins; fail only when every request failed
+        pending, error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_async(
+    dependency: str,
+    func: Callable[[Optional[float]], Awaitable[T]],
+    timeout_ms: float,
+    hedge_after_ms: Optional[float] = None
+) -> T:
+    """
+    Call a provider under the resilience policy.
+
+    Each attempt passes the dependency's circuit breaker, takes a slot of its
+    concurrency limiter and is bounded by timeout_ms and the remaining request
+    deadline. Retryable errors are retried up to PROVIDER_MAX_RETRIES times
+    with jittered exponential backoff while the deadline allows.
+
+    Args:
+        dependency: Limiter / breaker name ("gemini_embed" or "gemini_llm")
+        func: Makes one request, given the attempt timeout in seconds (or None)
+        timeout_ms: Per-attempt timeout (0 = none)
+        hedge_after_ms: Send a duplicate request when an attempt has not
+            answered after this long; the first answer wins (None = off)
+
+    Returns:
+        The result of the first successful attempt
+    """
+    breaker = circuit_breaker(dependency)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            if hedge_after_ms:
+                result = await _hedged(dependency, func, timeout_ms, hedge_after_ms / 1000.0)
+            else:
+                result = await _attempt(dependency, func, timeout_ms)
+        except Exception as e:
+            delay = _retry_delay(breaker, e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            breaker.abandon()
+            raise
+        breaker.record_success()
+        return result
+
+
+async def stream_async(
+    dependency: str,
+    func: Callable[[Optional[float]], AsyncIterator[T]],
+    timeout_ms: float
+) -> AsyncIterator[T]:
+    """
+    Streaming variant of call_async.
+
+    Attempts are retried only until the first chunk arrives; once output has
+    been yielded, errors propagate. timeout_ms (and the deadline) bound the
+    whole stream.
+    """
+    breaker = circuit_breaker(dependency)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        started = False
+        try:
+            async with limiter(dependency):
+                timeout = _attempt_timeout(timeout_ms)
+                expires = None if timeout is None else time.monotonic() + timeout
+                chunks = func(timeout).__aiter__()
+                try:
+                    while True:
+                        left = None if expires is None else expires - time.monotonic()
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), left)
+                        except StopAsyncIteration:
+                            break
+                        started = True
+                        yield chunk
+                finally:
+                    if hasattr(chunks, "aclose"):
+                        await chunks.aclose()
+        except Exception as e:
+            delay = _retry_delay(breaker, e, PROVIDER_MAX_RETRIES if started else attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            breaker.abandon()
+            raise
+        breaker.record_success()
+        return
@@ -1,79 +1,708 @@
-"""Hybrid retrieval service (vector + feature scoring)."""
-from typing import List, Dict, Any
+"""Hybrid retrieval service (vector + keyword + feature scoring)."""
+import asyncio
+import contextvars
+import dataclasses
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from app.config import (
-    QDRANT_COLLECTION,
-    FEATURE_WEIGHT, EMBEDDING_WEIGHT
+    RETRIEVAL_TOP_K, RRF_K, RETRIEVAL_FALLBACK_ENABLED, RETRIEVAL_EMBED_TIMEOUT_MS
 )
-from app.services.qdrant_client import get_qdrant_client
-from app.services.embeddings import embed_text
+from app.services.embeddings import embed_text, embed_text_async, embed_texts_async
+from app.services.vector_store import DEFAULT_SEARCH_PARAMS, SearchParams, VectorHit
+from app.utils.concurrency import run_db
+from app.utils.metrics import RETRIEVAL_FALLBACKS, span
+from app.services.reranking import rerank
+from app.services.filters import FILTER_MODES, profile_conditions
+from app.services.resilience import CircuitOpenError, is_unavailable
+from app.services.retrieval_cache import get_retrieval_cache, retrieval_key
+from app.db import case_store
 from app.db.case_store import build_blob_text
 
 
+# "vector" (embedding search), "keyword" (SQLite FTS5, no network) or
+# "hybrid" (both, merged with reciprocal rank fusion)
+RETRIEVAL_MODES = ("vector", "keyword", "hybrid")
+
+# Result field holding the similarity term of the final score, per source
+SIMILARITY_FIELDS = {"vector": "embedding_score", "keyword": "keyword_score", "hybrid": "fused_score"}
+
+
+def build_query_blob(user_text: str, structured_profile: Dict[str, Any]) -> str:
+    """Build the text embedded for a query (free text + profile blob)."""
+    query_blob = build_blob_text(structured_profile)
+    if user_text:
+        query_blob = f"{user_text}\n{query_blob}"
+    return query_blob
+
+
+def build_keyword_text(user_text: str, structured_profile: Dict[str, Any]) -> str:
+    """Build the text matched by keyword search (free text + donor site)."""
+    parts = [user_text, structured_profile.get('donor_site')]
+    return " ".join(str(part) for part in parts if part)
+
+
+def score_results(
+    search_results: List[Any],
+    structured_profile: Dict[str, Any],
+    top_k: int,
+    source: str = "vector"
+) -> List[Dict[str, Any]]:
+    """
+    Re-rank search hits with the hybrid (feature + similarity) score.
+    
+    Scoring is done in one vectorized pass (see app.services.reranking);
+    compute_feature_score remains the per-case reference implementation.
+    Each result records its ``retrieval_source``; the similarity term is
+    reported as embedding_score for vector hits and as keyword_score or
+    fused_score otherwise (embedding_score is then None).
+    
+    Args:
+        search_results: Hits with payloads (vector, keyword or fused)
+        structured_profile: Query profile used for feature scoring
+        top_k: Number of top cases to return
+        source: "vector", "keyword" or "hybrid" - what the hit scores are
+        
+    Returns:
+        List of case dictionaries sorted by final_score (highest first)
+    """
+    results = rerank(
+        candidates=[result.payload for result in search_results],
+        embedding_scores=[result.score for result in search_results],
+        profile=structured_profile,
+        top_k=top_k
+    )
+    field = SIMILARITY_FIELDS[source]
+    for result in results:
+        result['retrieval_source'] = source
+        if field != 'embedding_score':
+            result[field] = result['embedding_score']
+            result['embedding_score'] = None
+    return results
+
+
+def _merge_hits(filtered: List[Any], unfiltered: List[Any]) -> List[Any]:
+    """Append unfiltered hits not already present (soft filter fallback)."""
+    seen = {hit.id for hit in filtered}
+    return filtered + [hit for hit in unfiltered if hit.id not in seen]
+
+
+def _search_conditions(
+    structured_profile: Dict[str, Any],
+    filter_mode: str
+) -> Optional[Dict[str, Any]]:
+    """Return the profile conditions for a filter mode, or None for unfiltered search."""
+    if filter_mode not in FILTER_MODES:
+        raise ValueError(f"Unknown filter_mode '{filter_mode}' (expected one of {FILTER_MODES})")
+    if filter_mode == "none":
+        return None
+    return profile_conditions(structured_profile) or None
+
+
+def _check_retrieval_mode(retrieval_mode: str):
+    """Reject unknown retrieval modes."""
+    if retrieval_mode not in RETRIEVAL_MODES:
+        raise ValueError(
+            f"Unknown retrieval_mode '{retrieval_mode}' (expected one of {RETRIEVAL_MODES})"
+        )
+
+
+def search_params(
+    hnsw_ef: Optional[int] = None,
+    rescore: Optional[bool] = None,
+    oversampling: Optional[float] = None,
+    exact: bool = False
+) -> SearchParams:
+    """Override the configured SEARCH_* defaults with the non-None arguments."""
+    overrides = {"hnsw_ef": hnsw_ef, "rescore": rescore, "oversampling": oversampling}
+    overrides = {name: value for name, value in overrides.items() if value is not None}
+    if exact:
+        overrides["exact"] = True
+    return dataclasses.replace(DEFAULT_SEARCH_PARAMS, **overrides) if overrides else DEFAULT_SEARCH_PARAMS
+
+
+def _params_key(params: SearchParams) -> Optional[tuple]:
+    """Cache key component for non-default search parameters."""
+    return None if params == DEFAULT_SEARCH_PARAMS else dataclasses.astuple(params)
+
+
+def hydrate_hits(hits: List[Any]) -> List[Any]:
+    """
+    Fill in payloads for hits from backends that only store vectors.
+    
+    Missing payloads are loaded from SQLite in one query; hits whose case no
+    longer exists are dropped.
+    """
+    missing = [hit.id for hit in hits if hit.payload is None]
+    if not missing:
+        return hits
+    
+    cases = case_store.get_cases_by_ids(missing)
+    hydrated = []
+    for hit in hits:
+        if hit.payload is None:
+            if hit.id not in cases:
+                continue
+            hit.payload = cases[hit.id]
+        hydrated.append(hit)
+    return hydrated
+
+
+def hydrate_results(result_sets: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+    """
+    Replace slim payloads in re-ranked results with the full SQLite records.
+    
+    Only the final top_k cases are loaded, in one case_id IN (...) query
+    across all result sets; scores added by re-ranking are kept and results
+    whose case no longer exists are dropped.
+    
+    Args:
+        result_sets: Re-ranked result lists (full records pass through untouched)
+        
+    Returns:
+        The result lists with full case dictionaries, in the same order
+    """
+    missing = {
+        result['case_id'] for results in result_sets for result in results if 'title' not in result
+    }
+    if not missing:
+        return result_sets
+    
+    cases = case_store.get_cases_by_ids(list(missing))
+    hydrated_sets = []
+    for results in result_sets:
+        hydrated = []
+        for result in results:
+            if 'title' not in result:
+                if result['case_id'] not in cases:
+                    continue
+                result = {**cases[result['case_id']], **result}
+            hydrated.append(result)
+        hydrated_sets.append(hydrated)
+    return hydrated_sets
+
+
+def keyword_hits(
+    user_text: str,
+    structured_profile: Dict[str, Any],
+    conditions: Optional[Dict[str, Any]] = None,
+    filter_mode: str = "none",
+    limit: int = RETRIEVAL_TOP_K
+) -> List[VectorHit]:
+    """
+    Search the FTS5 keyword index (no embedding call, no vector store).
+    
+    Hits carry the full case as payload and the bm25 relevance scaled to
+    [0, 1] (best hit = 1.0) as score; score_results(..., source="keyword")
+    reports it as keyword_score.
+    
+    Args:
+        user_text: User query text
+        structured_profile: Query profile (its donor site is matched too)
+        conditions: Profile conditions from _search_conditions
+        filter_mode: "soft" tops up too few filtered hits with unfiltered ones
+        limit: Maximum number of hits per search
+        
+    Returns:
+        List of hits, most relevant first
+    """
+    text = build_keyword_text(user_text, structured_profile)
+    with span("keyword"):
+        matches = case_store.search_cases_fts(text, limit, conditions)
+        if conditions is not None and filter_mode == "soft" and len(matches) < limit:
+            seen = {case['case_id'] for case, _ in matches}
+            matches += [
+                match for match in case_store.search_cases_fts(text, limit)
+                if match[0]['case_id'] not in seen
+            ]
+    
+    best = max((relevance for _, relevance in matches), default=0.0)
+    return [
+        VectorHit(id=case['case_id'], score=relevance / best if best > 0 else 0.0, payload=case)
+        for case, relevance in matches
+    ]
+
+
+def fuse_hits(
+    rankings: List[List[Any]],
+    limit: int = RETRIEVAL_TOP_K,
+    k: int = RRF_K
+) -> List[VectorHit]:
+    """
+    Merge ranked hit lists with reciprocal rank fusion.
+    
+    Each case scores sum(1 / (k + rank)) over the lists it appears in,
+    scaled so that ranking first in every list gives 1.0. The first payload
+    seen for a case is kept (vector hits may have none until hydration).
+    
+    Args:
+        rankings: Hit lists, each sorted best first
+        limit: Number of fused hits to keep
+        k: RRF constant (higher flattens the rank curve)
+        
+    Returns:
+        Fused hits sorted by fused score (highest first)
+    """
+    scores: Dict[int, float] = {}
+    payloads: Dict[int, Any] = {}
+    for hits in rankings:
+        for rank, hit in enumerate(hits, start=1):
+            scores[hit.id] = scores.get(hit.id, 0.0) + 1.0 / (k + rank)
+            if hit.payload is not None:
+                payloads.setdefault(hit.id, hit.payload)
+    
+    best = len(rankings) / (k + 1)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [
+        VectorHit(id=case_id, score=score / best, payload=payloads.get(case_id))
+        for case_id, score in fused
+    ]
+
+
+def _can_fall_back(error: BaseException) -> bool:
+    """
+    Whether a vector retrieval failure may be answered from the keyword index.
+    
+    Only an unavailable provider or vector store qualifies (timeouts,
+    connection errors, open circuit); anything else - a missing API key, a
+    dimension mismatch, a bug - is raised rather than hidden behind keyword
+    results.
+    """
+    return RETRIEVAL_FALLBACK_ENABLED and is_unavailable(error)
+
+
+# Fallback reasons collected by the enclosing fallback_scope (None = not collected)
+_fallbacks: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("fallbacks", default=None)
+
+
+@contextmanager
+def fallback_scope() -> Iterator[List[str]]:
+    """
+    Collect the keyword fallbacks taken by retrievals inside the block.
+    
+    Yields a list that receives one reason per fallback, so a caller can tell
+    a degraded answer from a full one (even when it has no matches).
+    """
+    reasons: List[str] = []
+    token = _fallbacks.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _fallbacks.reset(token)
+
+
+def _record_fallback(error: BaseException):
+    """Count and log a vector retrieval failure answered from the keyword index."""
+    if isinstance(error, CircuitOpenError):
+        reason = "circuit_open"
+    elif isinstance(error, asyncio.TimeoutError):
+        reason = "timeout"
+    else:
+        reason = "unavailable"
+    RETRIEVAL_FALLBACKS.inc(reason=reason)
+    reasons = _fallbacks.get()
+    if reasons is not None:
+        reasons.append(reason)
+    print(f"Vector retrieval failed ({reason}: {error!r}); using keyword fallback")
+
+
+def _vector_hits(
+    user_text: str,
+    structured_profile: Dict[str, Any],
+    conditions: Optional[Dict[str, Any]],
+    filter_mode: str,
+    params: SearchParams
+) -> List[Any]:
+    """
+    Embed the query and search the vector store for the candidate pool.
+    
+    The query is embedded with the model the active collection was built
+    with, which differs from EMBED_MODEL until a reindex has swapped.
+    """
+    backend = case_store.ready_vector_backend()
+    with span("embed"):
+        query_vector = embed_text(
+            build_query_blob(user_text, structured_profile), backend.embed_model, backend.embed_dims
+        )
+    
+    with span("search"):
+        hits = backend.search(query_vector, RETRIEVAL_TOP_K, conditions, params)
+        if conditions is not None and filter_mode == "soft" and len(hits) < RETRIEVAL_TOP_K:
+            hits = _merge_hits(hits, backend.search(query_vector, RETRIEVAL_TOP_K, None, params))
+    return hits
+
+
+async def _vector_hits_async(
+    user_text: str,
+    structured_profile: Dict[str, Any],
+    conditions: Optional[Dict[str, Any]],
+    filter_mode: str,
+    params: SearchParams
+) -> List[Any]:
+    """Async variant of _vector_hits (the embedding is bounded by RETRIEVAL_EMBED_TIMEOUT_MS)."""
+    backend = await run_db(case_store.ready_vector_backend)
+    with span("embed"):
+        embedding = embed_text_async(
+            build_query_blob(user_text, structured_profile), backend.embed_model, backend.embed_dims
+        )
+        if RETRIEVAL_FALLBACK_ENABLED and RETRIEVAL_EMBED_TIMEOUT_MS > 0:
+            embedding = asyncio.wait_for(embedding, RETRIEVAL_EMBED_TIMEOUT_MS / 1000.0)
+        query_vector = await embedding
+    
+    with span("search"):
+        hits = await backend.search_async(query_vector, RETRIEVAL_TOP_K, conditions, params)
+        if conditions is not None and filter_mode == "soft" and len(hits) < RETRIEVAL_TOP_K:
+            hits = _merge_hits(
+                hits, await backend.search_async(query_vector, RETRIEVAL_TOP_K, None, params)
+            )
+    return hits
+
+
 def retrieve_top_k(
     user_text: str,
     structured_profile: Dict[str, Any],
-    top_k: int = 3
+    top_k: int = 3,
+    filter_mode: str = "none",
+    hnsw_ef: Optional[int] = None,
+    rescore: Optional[bool] = None,
+    oversampling: Optional[float] = None,
+    exact: bool = False,
+    retrieval_mode: str = "vector"
 ) -> List[Dict[str, Any]]:
     """
     Retrieve top-k cases using hybrid scoring (feature + embedding).
     
+    Candidate hits are cached per canonicalized query and corpus generation,
+    so a repeated or near-identical query skips the embedding call and vector
+    search; the hits are always re-ranked for the exact profile.
+    When the embedding provider or vector store fails and
+    RETRIEVAL_FALLBACK_ENABLED is set, the keyword index answers instead
+    (such results are not cached).
+    
     Args:
         user_text: User query text
         structured_profile: Dictionary with age, sex, bmi, smoker, defect_length_cm, donor_site
         top_k: Number of top cases to return
+        filter_mode: "none" (vector search only), "hard" (only cases matching the
+            profile filters are searched) or "soft" (filtered hits first, topped
+            up with unfiltered hits when there are too few)
+        hnsw_ef: HNSW beam width for this search (default SEARCH_HNSW_EF)
+        rescore: Re-rank quantized candidates with the original vectors
+            (default SEARCH_RESCORE)
+        oversampling: Quantized candidates fetched per result (default
+            SEARCH_OVERSAMPLING)
+        exact: Scan the original vectors exactly (recall baseline)
+        retrieval_mode: "vector", "keyword" (FTS5 only) or "hybrid" (vector
+            and keyword hits fused with reciprocal rank fusion)
         
     Returns:
         List of case dictionaries sorted by final_score (highest first)
     """
-    # Build query blob
-    query_blob = build_blob_text(structured_profile)
-    if user_text:
-        query_blob = f"{user_text}\n{query_blob}"
+    conditions = _search_conditions(structured_profile, filter_mode)
+    _check_retrieval_mode(retrieval_mode)
+    params = search_params(hnsw_ef, rescore, oversampling, exact)
     
-    # Embed query
-    query_vector = embed_text(query_blob)
+    # Reuse the candidates of repeated / near-identical queries
+    cache = get_retrieval_cache()
+    hits = None
+    if cache is not None:
+        key = retrieval_key(
+            user_text, structured_profile, filter_mode, _params_key(params), retrieval_mode
+        )
+        generation = case_store.get_corpus_generation()
+        hits = cache.get(key, generation)
     
-    # Query Qdrant for top 20
-    client = get_qdrant_client()
+    fallback = False
+    if hits is None:
+        if retrieval_mode == "keyword":
+            hits = keyword_hits(user_text, structured_profile, conditions, filter_mode)
+        else:
+            try:
+                hits = _vector_hits(user_text, structured_profile, conditions, filter_mode, params)
+            except Exception as e:
+                if not _can_fall_back(e):
+                    raise
+                _record_fallback(e)
+                hits = keyword_hits(user_text, structured_profile, conditions, filter_mode)
+                fallback = True
+            else:
+                if retrieval_mode == "hybrid":
+                    hits = fuse_hits([
+                        hits, keyword_hits(user_text, structured_profile, conditions, filter_mode)
+                    ])
+        
+        with span("hydrate"):
+            hits = hydrate_hits(hits)
+        if cache is not None and not fallback:
+            cache.set(key, generation, hits)
     
-    search_response = client.query_points(
-        collection_name=QDRANT_COLLECTION,
-        query=query_vector,
-        limit=20,
-        with_payload=True
-    )
-    search_results = search_response.points
+    with span("rerank"):
+        results = score_results(
+            hits, structured_profile, top_k, "keyword" if fallback else retrieval_mode
+        )
+    with span("hydrate"):
+        return hydrate_results([results])[0]
+
+
+async def retrieve_top_k_async(
+    user_text: str,
+    structured_profile: Dict[str, Any],
+    top_k: int = 3,
+    filter_mode: str = "none",
+    hnsw_ef: Optional[int] = None,
+    rescore: Optional[bool] = None,
+    oversampling: Optional[float] = None,
+    exact: bool = False,
+    retrieval_mode: str = "vector"
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of retrieve_top_k.
     
-    # Compute hybrid scores
-    scored_cases = []
+    Vector search goes through the backend's async path (bounded by
+    VECTOR_SEARCH_CONCURRENCY) and SQLite work runs on the database executor.
+    In hybrid mode the keyword search runs while the query is embedded, and
+    an embedding slower than RETRIEVAL_EMBED_TIMEOUT_MS falls back to it.
+    """
+    conditions = _search_conditions(structured_profile, filter_mode)
+    _check_retrieval_mode(retrieval_mode)
+    params = search_params(hnsw_ef, rescore, oversampling, exact)
     
-    for result in search_results:
-        case = result.payload
-        embedding_score = result.score
-        
-        # Compute feature score
-        feature_score = compute_feature_score(case, structured_profile)
-        
-        # Normalize scores to 0-1
-        normalized_embedding = max(0, min(1, embedding_score))  # Cosine similarity already 0-1
-        normalized_feature = max(0, min(1, feature_score))
-        
-        # Final hybrid score
-        final_score = (
-            FEATURE_WEIGHT * normalized_feature +
-            EMBEDDING_WEIGHT * normalized_embedding
+    cache = get_retrieval_cache()
+    hits = None
+    if cache is not None:
+        key = retrieval_key(
+            user_text, structured_profile, filter_mode, _params_key(params), retrieval_mode
         )
+        generation = await run_db(case_store.get_corpus_generation)
+        hits = cache.get(key, generation)
+    
+    fallback = False
+    if hits is None:
+        hits, fallback = await _search_hits_async(
+            user_text, structured_profile, conditions, filter_mode, params, retrieval_mode
+        )
+        with span("hydrate"):
+            hits = await run_db(hydrate_hits, hits)
+        if cache is not None and not fallback:
+            cache.set(key, generation, hits)
+    
+    with span("rerank"):
+        results = score_results(
+            hits, structured_profile, top_k, "keyword" if fallback else retrieval_mode
+        )
+    with span("hydrate"):
+        return (await run_db(hydrate_results, [results]))[0]
+
+
+async def _search_hits_async(
+    user_text: str,
+    structured_profile: Dict[str, Any],
+    conditions: Optional[Dict[str, Any]],
+    filter_mode: str,
+    params: SearchParams,
+    retrieval_mode: str
+) -> Tuple[List[Any], bool]:
+    """Candidate hits for a retrieval mode; returns (hits, answered by the keyword fallback)."""
+    if retrieval_mode == "keyword":
+        return await run_db(keyword_hits, user_text, structured_profile, conditions, filter_mode), False
+    
+    keyword_task = None
+    if retrieval_mode == "hybrid":
+        keyword_task = asyncio.ensure_future(
+            run_db(keyword_hits, user_text, structured_profile, conditions, filter_mode)
+        )
+    try:
+        try:
+            hits = await _vector_hits_async(
+                user_text, structured_profile, conditions, filter_mode, params
+            )
+        except Exception as e:
+            if not _can_fall_back(e):
+                raise
+            _record_fallback(e)
+            hits = await (keyword_task or run_db(
+                keyword_hits, user_text, structured_profile, conditions, filter_mode
+            ))
+            return hits, True
+        if keyword_task is not None:
+            hits = fuse_hits([hits, await keyword_task])
+        return hits, False
+    finally:
+        if keyword_task is not None and not keyword_task.done():
+            keyword_task.cancel()
+
+
+async def retrieve_top_k_batch_async(
+    queries: List[Dict[str, Any]]
+) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve top-k cases for many queries at once.
+    
+    Cached queries reuse their candidate hits from the retrieval cache; the
+    rest share one batched embedding call (bounded by
+    RETRIEVAL_EMBED_TIMEOUT_MS, like a single query) and one batch vector
+    search per distinct set of search parameters. Every query's hits are
+    then re-ranked against its own profile, with one SQLite hydration of all
+    final results. Keyword and hybrid queries take the single-query path. If
+    the batch embedding or search fails, the vector queries fall back to the
+    keyword index.
+    
+    Args:
+        queries: One dict per query with user_text, structured_profile and
+            optionally top_k (default 3), filter_mode (default "none"),
+            retrieval_mode (default "vector") and the search parameters of
+            retrieve_top_k (hnsw_ef, rescore, oversampling, exact)
         
-        case['final_score'] = final_score
-        case['embedding_score'] = normalized_embedding
-        case['feature_score'] = normalized_feature
-        
-        scored_cases.append(case)
+    Returns:
+        One list of case dictionaries per query, in input order
+    """
+    queries = [
+        {"top_k": 3, "filter_mode": "none", "retrieval_mode": "vector", **query} for query in queries
+    ]
+    conditions = []
+    params = []
+    for query in queries:
+        conditions.append(_search_conditions(query["structured_profile"], query["filter_mode"]))
+        _check_retrieval_mode(query["retrieval_mode"])
+        params.append(search_params(
+            query.get("hnsw_ef"), query.get("rescore"), query.get("oversampling"), query.get("exact", False)
+        ))
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+    
+    single = [i for i, query in enumerate(queries) if query["retrieval_mode"] != "vector"]
+    if single:
+        single_results = await asyncio.gather(*(
+            retrieve_top_k_async(
+                queries[i]["user_text"], queries[i]["structured_profile"], queries[i]["top_k"],
+                queries[i]["filter_mode"], params[i].hnsw_ef, params[i].rescore,
+                params[i].oversampling, params[i].exact, queries[i]["retrieval_mode"]
+            )
+            for i in single
+        ))
+        for i, result in zip(single, single_results):
+            results[i] = result
+    
+    batched = [i for i, query in enumerate(queries) if query["retrieval_mode"] == "vector"]
+    if not batched:
+        return results
+    cache = get_retrieval_cache()
+    keys: List[Optional[str]] = [None] * len(queries)
+    cached_hits: Dict[int, List[Any]] = {}
+    if cache is not None:
+        generation = await run_db(case_store.get_corpus_generation)
+        for i in batched:
+            keys[i] = retrieval_key(
+                queries[i]["user_text"], queries[i]["structured_profile"], queries[i]["filter_mode"],
+                _params_key(params[i])
+            )
+            hits = cache.get(keys[i], generation)
+            if hits is not None:
+                cached_hits[i] = hits
     
-    # Sort by final_score descending
-    scored_cases.sort(key=lambda x: x['final_score'], reverse=True)
+    pending = [i for i in batched if i not in cached_hits]
+    hit_lists = []
+    fallback = False
+    if pending:
+        hit_lists, fallback = await _search_hits_batch_async(queries, conditions, params, pending)
+        with span("hydrate"):
+            # One SQLite lookup for every result set; hits of deleted cases keep no payload
+            await run_db(hydrate_hits, [hit for hits in hit_lists for hit in hits])
+            hit_lists = [[hit for hit in hits if hit.payload is not None] for hits in hit_lists]
+            # Queries hitting the same case share its hydrated payload, and re-ranking
+            # writes scores into it, so every result set gets its own copy
+            for hits in hit_lists:
+                for hit in hits:
+                    hit.payload = dict(hit.payload)
+        if cache is not None and not fallback:
+            for i, hits in zip(pending, hit_lists):
+                cache.set(keys[i], generation, hits)
     
-    return scored_cases[:top_k]
+    pending_hits = dict(zip(pending, hit_lists))
+    with span("rerank"):
+        for i in batched:
+            results[i] = score_results(
+                cached_hits[i] if i in cached_hits else pending_hits[i],
+                queries[i]["structured_profile"], queries[i]["top_k"],
+                "keyword" if fallback and i in pending_hits else "vector"
+            )
+    with span("hydrate"):
+        # Full records for every query's final top_k in one SQLite lookup
+        hydrated = await run_db(hydrate_results, [results[i] for i in batched])
+    for i, query_results in zip(batched, hydrated):
+        results[i] = query_results
+    return results
+
+
+async def _search_hits_batch_async(
+    queries: List[Dict[str, Any]],
+    conditions: List[Optional[Dict[str, Any]]],
+    params: List[SearchParams],
+    pending: List[int]
+) -> Tuple[List[List[Any]], bool]:
+    """
+    Candidate hits for the pending vector queries of a batch.
+    
+    Returns:
+        (one hit list per pending query, answered by the keyword fallback)
+    """
+    try:
+        backend = await run_db(case_store.ready_vector_backend)
+        with span("embed"):
+            embedding = embed_texts_async(
+                [
+                    build_query_blob(queries[i]["user_text"], queries[i]["structured_profile"])
+                    for i in pending
+                ],
+                model=backend.embed_model,
+                dims=backend.embed_dims
+            )
+            if RETRIEVAL_FALLBACK_ENABLED and RETRIEVAL_EMBED_TIMEOUT_MS > 0:
+                embedding = asyncio.wait_for(embedding, RETRIEVAL_EMBED_TIMEOUT_MS / 1000.0)
+            vectors = await embedding
+        
+        # Queries sharing search parameters share a batch search
+        groups: Dict[Optional[tuple], List[int]] = {}
+        for j, i in enumerate(pending):
+            groups.setdefault(_params_key(params[i]), []).append(j)
+        
+        async def search_group(group: List[int]) -> List[List[Any]]:
+            group_params = params[pending[group[0]]]
+            found = await backend.search_batch_async(
+                [vectors[j] for j in group], RETRIEVAL_TOP_K,
+                [conditions[pending[j]] for j in group], group_params
+            )
+            # Soft filtering: top up queries with too few filtered hits
+            short = [
+                k for k, j in enumerate(group)
+                if conditions[pending[j]] is not None and queries[pending[j]]["filter_mode"] == "soft"
+                and len(found[k]) < RETRIEVAL_TOP_K
+            ]
+            if short:
+                extra = await backend.search_batch_async(
+                    [vectors[group[k]] for k in short], RETRIEVAL_TOP_K, None, group_params
+                )
+                for k, hits in zip(short, extra):
+                    found[k] = _merge_hits(found[k], hits)
+            return found
+        
+        with span("search"):
+            group_hits = await asyncio.gather(*(search_group(group) for group in groups.values()))
+        hit_lists: List[List[Any]] = [[] for _ in pending]
+        for group, hits_per_query in zip(groups.values(), group_hits):
+            for j, hits in zip(group, hits_per_query):
+                hit_lists[j] = hits
+    except Exception as e:
+        if not _can_fall_back(e):
+            raise
+        _record_fallback(e)
+        hit_lists = await asyncio.gather(*(
+            run_db(
+                keyword_hits, queries[i]["user_text"], queries[i]["structured_profile"],
+                conditions[i], queries[i]["filter_mode"]
+            )
+            for i in pending
+        ))
+        return list(hit_lists), True
+    return hit_lists, False
 
 
 def compute_feature_score(case: Dict[str, Any], profile: Dict[str, Any]) -> float:
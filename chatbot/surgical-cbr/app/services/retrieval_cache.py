@@ -0,0 +1,120 @@
+"""Retrieval candidate cache invalidated by the corpus generation counter."""
+import dataclasses
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from app.config import (
+    RETRIEVAL_CACHE_ENABLED, RETRIEVAL_CACHE_SIZE,
+    RETRIEVAL_CACHE_BMI_STEP, RETRIEVAL_CACHE_DEFECT_STEP_CM
+)
+from app.services.filters import donor_site_key
+from app.services.vector_store import VectorHit
+from app.utils.cache import LRUCache
+
+
+def _round_to(value: Any, step: float) -> Any:
+    """Round a numeric value to the nearest multiple of step."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and step > 0:
+        return round(round(value / step) * step, 6)
+    return value
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace in free text."""
+    return " ".join((text or "").lower().split())
+
+
+def canonical_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonicalize a structured profile so near-identical queries share a key.
+
+    BMI and defect length are rounded to RETRIEVAL_CACHE_*_STEP, donor site is
+    normalized like donor_site_key, sex is uppercased and unset fields dropped.
+    """
+    canonical = {}
+    for field_name, value in profile.items():
+        if value is None:
+            continue
+        if field_name == 'bmi':
+            value = _round_to(value, RETRIEVAL_CACHE_BMI_STEP)
+        elif field_name == 'defect_length_cm':
+            value = _round_to(value, RETRIEVAL_CACHE_DEFECT_STEP_CM)
+        elif field_name == 'donor_site':
+            value = donor_site_key(value)
+        elif field_name == 'sex' and isinstance(value, str):
+            value = value.strip().upper()
+        canonical[field_name] = value
+    return canonical
+
+
+def retrieval_key(
+    user_text: str,
+    structured_profile: Dict[str, Any],
+    filter_mode: str,
+    search_params: Optional[tuple] = None,
+    retrieval_mode: str = "vector"
+) -> str:
+    """
+    Build the cache key for a retrieval's candidate hits (excluding the generation).
+    
+    top_k is not part of the key: every query fetches RETRIEVAL_TOP_K
+    candidates and only the re-rank cuts them down.
+    """
+    parts = [normalize_text(user_text), canonical_profile(structured_profile), filter_mode]
+    if search_params is not None:
+        parts.append(list(search_params))
+    if retrieval_mode != "vector":
+        parts.append(retrieval_mode)
+    return json.dumps(
+        parts,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+
+
+class RetrievalCache:
+    """
+    LRU of hydrated candidate hits (before the feature re-rank).
+
+    Near-identical profiles share an entry, so only the embedding and search
+    are reused; callers re-rank the hits for their exact profile. Entries are
+    stored together with the corpus generation they were computed at; a
+    lookup at any other generation is a miss, so hits are never served after
+    a case has been added.
+    """
+
+    def __init__(self, maxsize: int = RETRIEVAL_CACHE_SIZE):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.stale = 0
+
+    def get(self, key: str, generation: int) -> Optional[List[VectorHit]]:
+        entry = self.memory.get(key)
+        if entry is None:
+            return None
+        cached_generation, hits = entry
+        if cached_generation != generation:
+            self.stale += 1
+            return None
+        # Copies, so re-ranking can annotate payloads without touching the cache
+        return [_copy_hit(hit) for hit in hits]
+
+    def set(self, key: str, generation: int, hits: List[VectorHit]):
+        self.memory.set(key, (generation, [_copy_hit(hit) for hit in hits]))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.memory.stats(), "stale": self.stale}
+
+
+def _copy_hit(hit: VectorHit) -> VectorHit:
+    """Copy a hit together with its payload."""
+    payload = None if hit.payload is None else dict(hit.payload)
+    return dataclasses.replace(hit, payload=payload)
+
+
+@lru_cache(maxsize=1)
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Return the shared retrieval cache, or None when caching is disabled."""
+    if not RETRIEVAL_CACHE_ENABLED:
+        return None
+    return RetrievalCache()
@@ -0,0 +1,84 @@
+"""Application startup: one-time initialization and readiness tracking."""
+import asyncio
+from typing import Any, Dict, Optional
+from app.config import STARTUP_MODE, VECTOR_INIT_RETRY_SECONDS
+from app.db import case_store
+from app.utils.concurrency import run_db
+
+
+STARTUP_MODES = ("eager", "background")
+
+_ready = {"sqlite": False, "vector_store": False}
+_last_error: Optional[str] = None
+_task: Optional["asyncio.Task"] = None
+
+
+async def _init_vector_store(retry: bool):
+    """Initialize the vector store off the event loop, retrying in background mode."""
+    global _last_error
+    while True:
+        try:
+            await run_db(case_store.init_vector_store)
+        except Exception as exc:
+            _last_error = f"vector_store: {exc}"
+            if not retry:
+                raise
+            print(f"Vector store initialization failed ({exc}); retrying in {VECTOR_INIT_RETRY_SECONDS}s")
+            await asyncio.sleep(VECTOR_INIT_RETRY_SECONDS)
+            continue
+        _ready["vector_store"] = True
+        _last_error = None
+        print("Vector store ready")
+        return
+
+
+async def start(mode: str = STARTUP_MODE):
+    """
+    Initialize SQLite and the vector store.
+    
+    Both steps are idempotent. In ``eager`` mode this returns once everything
+    is ready (and raises on failure); in ``background`` mode the vector store
+    (Qdrant collection checks, payload index creation, backfills) is brought up
+    in a background task and the app starts serving immediately.
+    
+    Args:
+        mode: "eager" or "background"
+    """
+    global _task
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"Unknown STARTUP_MODE '{mode}' (expected one of {STARTUP_MODES})")
+    
+    case_store.init_sqlite()
+    _ready["sqlite"] = True
+    
+    if mode == "background":
+        if _task is None or _task.done():
+            _task = asyncio.create_task(_init_vector_store(retry=True))
+    else:
+        await _init_vector_store(retry=False)
+
+
+async def stop():
+    """Cancel a pending background initialization."""
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = None
+
+
+def is_ready() -> bool:
+    """Return True once SQLite and the vector store are initialized."""
+    return all(_ready.values())
+
+
+def readiness() -> Dict[str, Any]:
+    """Describe the readiness of each startup dependency."""
+    return {
+        "status": "ready" if is_ready() else "starting",
+        "checks": dict(_ready),
+        "error": _last_error,
+    }
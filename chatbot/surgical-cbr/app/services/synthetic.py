@@ -1,32 +1,17 @@
 """Synthetic case generation service."""
 import json
-import google.generativeai as genai
 from typing import Dict, Any
-from app.config import GEMINI_API_KEY, GEMINI_MODEL
+from app.config import LLM_TIMEOUT_MS
+from app.services.providers import get_llm_provider
+from app.services.resilience import call, call_async
 
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
-
-def generate_synthetic_case(
+def build_synthetic_prompt(
     description: str,
     constraints: Dict[str, Any] = None
-) -> Dict[str, Any]:
-    """
-    Generate a synthetic case using Gemini.
-    
-    Args:
-        description: Description of the case to generate
-        constraints: Optional constraints (age_range, bmi_range, etc.)
-        
-    Returns:
-        Dictionary representing a synthetic case
-    """
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not configured")
-    
-    prompt = f"""Generate a realistic surgical case for reconstructive surgery pre-planning.
+) -> str:
+    """Build the prompt asking Gemini for a synthetic case as JSON."""
+    return f"""Generate a realistic surgical case for reconstructive surgery pre-planning.
 
 Description: {description}
 
@@ -52,11 +37,11 @@ Generate a JSON object with these exact fields:
 
 Return ONLY valid JSON, no markdown formatting, no explanations."""
 
-    model = genai.GenerativeModel(GEMINI_MODEL)
-    response = model.generate_content(prompt)
-    
+
+def parse_synthetic_case(text: str) -> Dict[str, Any]:
+    """Parse the JSON case out of a Gemini response."""
     # Extract JSON from response
-    response_text = response.text.strip()
+    response_text = text.strip()
     
     # Remove markdown code blocks if present
     if response_text.startswith("```"):
@@ -70,3 +55,44 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
     
     return case
 
+
+def generate_synthetic_case(
+    description: str,
+    constraints: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """
+    Generate a synthetic case using the configured LLM provider.
+    
+    Args:
+        description: Description of the case to generate
+        constraints: Optional constraints (age_range, bmi_range, etc.)
+        
+    Returns:
+        Dictionary representing a synthetic case
+    """
+    prompt = build_synthetic_prompt(description, constraints)
+    provider = get_llm_provider()
+    text = call(
+        "gemini_llm",
+        lambda timeout: provider.generate(prompt, task="synthetic", timeout=timeout),
+        LLM_TIMEOUT_MS
+    )
+    
+    return parse_synthetic_case(text)
+
+
+async def generate_synthetic_case_async(
+    description: str,
+    constraints: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """Async variant of generate_synthetic_case (bounded by GEMINI_LLM_CONCURRENCY)."""
+    prompt = build_synthetic_prompt(description, constraints)
+    provider = get_llm_provider()
+    text = await call_async(
+        "gemini_llm",
+        lambda timeout: provider.generate_async(prompt, task="synthetic", timeout=timeout),
+        LLM_TIMEOUT_MS
+    )
+    
+    return parse_synthetic_case(text)
+
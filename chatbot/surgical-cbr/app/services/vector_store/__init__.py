@@ -0,0 +1,105 @@
+"""Pluggable vector storage backends (selected with VECTOR_BACKEND)."""
+import threading
+from typing import Optional, Tuple
+from app.config import (
+    VECTOR_BACKEND, VECTOR_QUANTIZATION, QDRANT_COLLECTION, EMBED_MODEL, EMBED_DIMS
+)
+from app.services.vector_store.base import (
+    DEFAULT_SEARCH_PARAMS, PAYLOAD_MODES, QUANTIZATION_MODES, SLIM_PAYLOAD_FIELDS,
+    SearchParams, VectorBackend, VectorHit, VectorPoint
+)
+
+
+BACKENDS = ("qdrant", "numpy")
+
+
+def create_backend(
+    name: str,
+    collection: str,
+    quantization: str = VECTOR_QUANTIZATION,
+    embed_model: str = EMBED_MODEL,
+    embed_dims: int = EMBED_DIMS
+) -> VectorBackend:
+    """Instantiate a backend by name for a collection of embed_model / embed_dims vectors."""
+    if name == "qdrant":
+        from app.services.vector_store.qdrant_backend import QdrantBackend
+        return QdrantBackend(collection, quantization, embed_model, embed_dims)
+    if name == "numpy":
+        from app.services.vector_store.numpy_backend import NumpyBackend
+        return NumpyBackend(
+            collection, quantization=quantization, embed_model=embed_model, embed_dims=embed_dims
+        )
+    raise ValueError(f"Unknown VECTOR_BACKEND '{name}' (expected one of {BACKENDS})")
+
+
+_active: Optional[VectorBackend] = None
+_active_generation: Optional[int] = None
+_active_lock = threading.Lock()
+
+
+def active_collection_name() -> str:
+    """Return the collection recorded as active (QDRANT_COLLECTION until a reindex swaps it)."""
+    from app.db.case_store import get_corpus_meta
+    return get_corpus_meta('active_collection', QDRANT_COLLECTION)
+
+
+def active_embedding() -> Tuple[str, int]:
+    """
+    Return the (model, dims) the active collection was embedded with.
+
+    Recorded by init_sqlite and by each reindex swap; EMBED_MODEL /
+    EMBED_DIMS before that.
+    """
+    from app.db.case_store import get_corpus_meta
+    return (
+        get_corpus_meta('active_embed_model', EMBED_MODEL),
+        int(get_corpus_meta('active_embed_dims', str(EMBED_DIMS)))
+    )
+
+
+def get_vector_backend(generation: Optional[int] = None) -> VectorBackend:
+    """
+    Return the configured backend for the active case collection.
+
+    Pass the current corpus generation to pick up a reindex swap made by
+    another process (e.g. scripts/reindex.py): when it differs from the last
+    one seen, the active collection is looked up again.
+    """
+    global _active, _active_generation
+    if _active is not None and (generation is None or generation == _active_generation):
+        return _active
+    with _active_lock:
+        if _active is None or (generation is not None and generation != _active_generation):
+            collection = active_collection_name()
+            embed_model, embed_dims = active_embedding()
+            current = _active
+            if current is None or (current.collection, current.embed_model, current.embed_dims) != (
+                collection, embed_model, embed_dims
+            ):
+                backend = create_backend(
+                    VECTOR_BACKEND, collection, embed_model=embed_model, embed_dims=embed_dims
+                )
+                if current is not None:
+                    backend.ensure_collection()
+                    print(
+                        f"Active collection is now '{collection}' ({embed_model}/{embed_dims}); "
+                        f"was '{current.collection}'"
+                    )
+                _active = backend
+            _active_generation = generation
+        return _active
+
+
+def set_vector_backend(backend: VectorBackend):
+    """Point this process at another collection (used after a reindex swap)."""
+    global _active
+    with _active_lock:
+        _active = backend
+
+
+__all__ = [
+    'DEFAULT_SEARCH_PARAMS', 'PAYLOAD_MODES', 'QUANTIZATION_MODES', 'SLIM_PAYLOAD_FIELDS', 'SearchParams',
+    'VectorBackend', 'VectorHit', 'VectorPoint',
+    'active_collection_name', 'active_embedding', 'create_backend', 'get_vector_backend',
+    'set_vector_backend'
+]
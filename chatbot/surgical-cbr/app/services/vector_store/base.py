@@ -0,0 +1,193 @@
+"""Vector backend interface shared by the Qdrant and NumPy implementations."""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.config import (
+    EMBED_DIMS, EMBED_MODEL, VECTOR_QUANTIZATION, SEARCH_HNSW_EF, SEARCH_RESCORE, SEARCH_OVERSAMPLING
+)
+from app.utils.concurrency import run_limited
+
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+PAYLOAD_MODES = ("slim", "full")
+
+# Payload kept per vector in "slim" mode: the case ID plus the fields used by
+# filtered search and feature scoring; everything else is read from SQLite
+SLIM_PAYLOAD_FIELDS = (
+    "case_id", "sex", "bmi", "smoker", "defect_length_cm", "donor_site", "donor_site_key"
+)
+
+
+@dataclass
+class VectorPoint:
+    """A case vector to store, with its (filterable) payload."""
+    case_id: int
+    vector: List[float]
+    payload: Dict[str, Any]
+
+
+@dataclass
+class VectorHit:
+    """
+    A search hit.
+
+    Mirrors the id/score/payload attributes of Qdrant's ScoredPoint. payload
+    is None when the backend does not store payloads; retrieval then hydrates
+    the case from SQLite.
+    """
+    id: int
+    score: float
+    payload: Optional[Dict[str, Any]] = None
+
+
+@dataclass(frozen=True)
+class SearchParams:
+    """
+    Per-search accuracy/speed knobs.
+
+    hnsw_ef is the HNSW beam width (Qdrant only); exact forces a full scan of
+    the original vectors. With a quantized collection, oversampling candidates
+    per requested hit are found on the quantized vectors and, when rescore is
+    set, re-ranked using the original vectors.
+    """
+    hnsw_ef: Optional[int] = SEARCH_HNSW_EF
+    exact: bool = False
+    rescore: bool = SEARCH_RESCORE
+    oversampling: float = SEARCH_OVERSAMPLING
+
+
+DEFAULT_SEARCH_PARAMS = SearchParams()
+
+
+class VectorBackend(ABC):
+    """
+    Interface for vector storage and similarity search.
+
+    Subclasses must implement ensure_collection, upsert, search, count and
+    drop_collection; the async and batch variants and the payload methods
+    have defaults. embed_model / embed_dims describe the vectors the
+    collection holds: queries must be embedded the same way to search it.
+    """
+
+    name = "base"
+    stores_payloads = False
+
+    def __init__(
+        self,
+        collection: str,
+        quantization: str = VECTOR_QUANTIZATION,
+        embed_model: str = EMBED_MODEL,
+        embed_dims: int = EMBED_DIMS
+    ):
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown VECTOR_QUANTIZATION '{quantization}' (expected one of {QUANTIZATION_MODES})"
+            )
+        self.collection = collection
+        self.quantization = quantization
+        self.embed_model = embed_model
+        self.embed_dims = embed_dims
+
+    @abstractmethod
+    def ensure_collection(self):
+        """Create the collection if needed (idempotent)."""
+
+    @abstractmethod
+    def upsert(self, points: List[VectorPoint]):
+        """Insert or replace points."""
+
+    @abstractmethod
+    def search(
+        self,
+        vector: List[float],
+        limit: int,
+        conditions: Optional[Dict[str, Any]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[Any]:
+        """
+        Return up to ``limit`` hits by cosine similarity, best first.
+
+        Args:
+            vector: Query vector
+            limit: Maximum number of hits
+            conditions: Optional profile conditions (see filters.profile_conditions)
+            params: Search parameters (DEFAULT_SEARCH_PARAMS when None)
+        """
+
+    async def search_async(
+        self,
+        vector: List[float],
+        limit: int,
+        conditions: Optional[Dict[str, Any]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[Any]:
+        """Async search; by default runs search() in a worker thread."""
+        return await run_limited("vector_search", self.search, vector, limit, conditions, params)
+
+    def search_batch(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        conditions: Optional[List[Optional[Dict[str, Any]]]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[List[Any]]:
+        """
+        Search several query vectors at once; returns one hit list per vector.
+
+        Args:
+            vectors: Query vectors
+            limit: Maximum number of hits per query
+            conditions: Optional per-query profile conditions (None entries search unfiltered)
+            params: Search parameters shared by all queries
+        """
+        conditions = conditions or [None] * len(vectors)
+        return [
+            self.search(vector, limit, query_conditions, params)
+            for vector, query_conditions in zip(vectors, conditions)
+        ]
+
+    async def search_batch_async(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        conditions: Optional[List[Optional[Dict[str, Any]]]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[List[Any]]:
+        """Async batch search; by default runs search_batch() in a worker thread."""
+        return await run_limited("vector_search", self.search_batch, vectors, limit, conditions, params)
+
+    def scroll_payloads(self, page_size: int = 256) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        """Yield pages of (case_id, stored payload) for every point (none without stored payloads)."""
+        return iter(())
+
+    def overwrite_payloads(self, payloads: Dict[int, Dict[str, Any]]):
+        """Replace the payloads of existing points, keyed by case_id (no-op without stored payloads)."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return the number of stored points."""
+
+    @abstractmethod
+    def drop_collection(self):
+        """Delete the collection and its vectors (idempotent)."""
+
+    def originals_on_disk(self) -> bool:
+        """Whether the original float vectors are read from disk rather than held in RAM."""
+        return False
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Estimated bytes of vector storage, original and RAM-resident."""
+        points = self.count()
+        original = points * self.embed_dims * 4
+        quantized = {
+            "none": 0,
+            "scalar": points * self.embed_dims,
+            "binary": points * ((self.embed_dims + 7) // 8),
+        }[self.quantization]
+        return {
+            "points": points,
+            "dims": self.embed_dims,
+            "quantization": self.quantization,
+            "original_bytes": original,
+            "resident_bytes": quantized + (0 if self.originals_on_disk() else original),
+        }
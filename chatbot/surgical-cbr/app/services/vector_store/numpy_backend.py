@@ -0,0 +1,404 @@
+"""Exact in-memory vector backend backed by memory-mapped .npy files."""
+import contextlib
+import json
+import math
+import os
+import shutil
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single writer
+    fcntl = None
+from app.config import EMBED_DIMS, EMBED_MODEL, VECTOR_INDEX_PATH, VECTOR_QUANTIZATION, VECTOR_SCALAR_QUANTILE
+from app.services.vector_store.base import (
+    DEFAULT_SEARCH_PARAMS, SearchParams, VectorBackend, VectorHit, VectorPoint
+)
+
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_LEN = 128  # fixed header size so the shape can be rewritten in place
+
+# Filterable payload fields kept in a parallel float64 matrix (NaN = missing)
+ATTR_COLUMNS = ("smoker", "bmi", "defect_length_cm", "sex", "donor_site_key")
+CODED_COLUMNS = ("sex", "donor_site_key")  # stored as interned integer codes
+
+# Quantized scans run over this many rows at a time to bound temporary memory
+SCAN_CHUNK_ROWS = 65536
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _write_header(f, dtype: np.dtype, shape: Tuple[int, ...]):
+    """Write a fixed-size .npy v1.0 header at the start of f."""
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(np.dtype(dtype)), tuple(shape)
+    )
+    body_len = NPY_HEADER_LEN - len(NPY_MAGIC) - 2
+    header = header.ljust(body_len - 1) + "\n"
+    f.seek(0)
+    f.write(NPY_MAGIC + struct.pack("<H", body_len) + header.encode("latin1"))
+
+
+def _create_npy(path: Path, dtype, row_shape: Tuple[int, ...]):
+    """Create an empty .npy file with zero rows."""
+    with open(path, "wb") as f:
+        _write_header(f, dtype, (0, *row_shape))
+
+
+def _append_npy(path: Path, rows: np.ndarray):
+    """Append rows to a .npy file created by _create_npy and update its shape."""
+    with open(path, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(rows).tobytes())
+        n = (f.tell() - NPY_HEADER_LEN) // (rows.itemsize * int(np.prod(rows.shape[1:], dtype=np.int64)))
+        _write_header(f, rows.dtype, (n, *rows.shape[1:]))
+
+
+def _truncate_npy(path: Path, dtype, row_shape: Tuple[int, ...], n: int):
+    """
+    Cut a .npy file created by _create_npy back to n rows.
+    
+    Drops rows left behind by a write that crashed before ids.npy was
+    appended, so the next append lines up with ids.npy again.
+    """
+    size = NPY_HEADER_LEN + n * np.dtype(dtype).itemsize * int(np.prod(row_shape, dtype=np.int64))
+    if path.stat().st_size == size:
+        return
+    with open(path, "r+b") as f:
+        f.truncate(size)
+        _write_header(f, dtype, (n, *row_shape))
+
+
+def _load_npy(path: Path, dtype, row_shape: Tuple[int, ...], mode: str = "r") -> np.ndarray:
+    """Memory-map a .npy file (an empty file yields an empty in-memory array)."""
+    array = np.load(path, mmap_mode=mode) if path.stat().st_size > NPY_HEADER_LEN else None
+    if array is None or array.shape[0] == 0:
+        return np.empty((0, *row_shape), dtype=dtype)
+    return array
+
+
+def _scalar_quantize(vectors: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Quantize normalized vectors to int8; returns (codes, value of one code step)."""
+    sample = np.abs(np.asarray(vectors[:4096], dtype=np.float32))
+    clip = float(np.quantile(sample, VECTOR_SCALAR_QUANTILE)) if sample.size else 1.0
+    clip = clip or 1.0
+    codes = np.empty(vectors.shape, dtype=np.int8)
+    for start in range(0, len(vectors), SCAN_CHUNK_ROWS):
+        chunk = np.asarray(vectors[start:start + SCAN_CHUNK_ROWS], dtype=np.float32)
+        codes[start:start + len(chunk)] = np.clip(np.rint(chunk * (127.0 / clip)), -127, 127)
+    return codes, clip / 127.0
+
+
+def _binary_quantize(vectors: np.ndarray) -> np.ndarray:
+    """Quantize vectors to sign bits, packed 8 dimensions per byte."""
+    bits = np.empty((len(vectors), (vectors.shape[1] + 7) // 8), dtype=np.uint8)
+    for start in range(0, len(vectors), SCAN_CHUNK_ROWS):
+        chunk = vectors[start:start + SCAN_CHUNK_ROWS]
+        bits[start:start + len(chunk)] = np.packbits(chunk > 0, axis=1)
+    return bits
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Brute-force exact cosine search over a normalized float32 matrix.
+
+    Each collection is a directory holding vectors.npy (n x dims, L2-normalized),
+    ids.npy (case_id per row), attrs.npy (filterable payload fields) and
+    vocab.json (codes for string fields). Files are memory-mapped; new cases
+    are appended in place, and other processes pick up appends on their next
+    search. Payloads are not stored: retrieval hydrates hits from SQLite.
+
+    Writers (API workers, scripts/reindex.py, scripts/seed_db.py) hold an
+    exclusive flock on the collection's write.lock while they reload, append
+    and rewrite vocab.json; searches take no file lock. Where fcntl is not
+    available (Windows) only one process may write at a time.
+
+    With VECTOR_QUANTIZATION=scalar (int8) or binary (sign bits) an in-memory
+    quantized copy is scanned instead, built on the first search after the
+    index changes; only the oversampled candidates are read back from the
+    memory-mapped originals for rescoring.
+    """
+
+    name = "numpy"
+
+    def __init__(
+        self,
+        collection: str,
+        root: Path = VECTOR_INDEX_PATH,
+        quantization: str = VECTOR_QUANTIZATION,
+        embed_model: str = EMBED_MODEL,
+        embed_dims: int = EMBED_DIMS
+    ):
+        super().__init__(collection, quantization, embed_model, embed_dims)
+        self.dir = Path(root) / collection
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._vectors = np.empty((0, embed_dims), dtype=np.float32)
+        self._ids = np.empty((0,), dtype=np.int64)
+        self._attrs = np.empty((0, len(ATTR_COLUMNS)), dtype=np.float64)
+        self._rows: Dict[int, int] = {}
+        self._vocab: Dict[str, Dict[str, int]] = {column: {} for column in CODED_COLUMNS}
+        self._quantized: Optional[Tuple[np.ndarray, float]] = None
+
+    @property
+    def _paths(self) -> Dict[str, Path]:
+        return {
+            "vectors": self.dir / "vectors.npy",
+            "ids": self.dir / "ids.npy",
+            "attrs": self.dir / "attrs.npy",
+            "vocab": self.dir / "vocab.json",
+        }
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Hold the thread lock and the collection's cross-process write lock."""
+        with self._lock:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            with open(self.dir / "write.lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file closes
+                yield
+
+    def ensure_collection(self):
+        paths = self._paths
+        with self._writing():
+            if paths["ids"].exists():
+                print(f"NumPy vector index '{self.collection}' already exists")
+                return
+            _create_npy(paths["vectors"], np.float32, (self.embed_dims,))
+            _create_npy(paths["attrs"], np.float64, (len(ATTR_COLUMNS),))
+            self._write_vocab()
+            # ids.npy is created last: its presence marks a complete index
+            _create_npy(paths["ids"], np.int64, ())
+            print(f"NumPy vector index '{self.collection}' created at {self.dir}")
+
+    def _write_vocab(self):
+        path = self._paths["vocab"]
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._vocab))
+        os.replace(tmp, path)
+
+    def _refresh(self):
+        """(Re)load the memory maps if the index changed on disk."""
+        paths = self._paths
+        ids_stat, vocab_stat = paths["ids"].stat(), paths["vocab"].stat()
+        stamp = (ids_stat.st_size, ids_stat.st_mtime_ns, vocab_stat.st_mtime_ns)
+        if stamp == self._stamp:
+            return
+
+        ids = _load_npy(paths["ids"], np.int64, ())
+        self._vectors = _load_npy(paths["vectors"], np.float32, (self.embed_dims,))[:len(ids)]
+        self._attrs = _load_npy(paths["attrs"], np.float64, (len(ATTR_COLUMNS),))[:len(ids)]
+        self._ids = ids
+        self._rows = {int(case_id): row for row, case_id in enumerate(ids)}
+        self._vocab = json.loads(paths["vocab"].read_text())
+        self._quantized = None
+        self._stamp = stamp
+
+    def _quantized_vectors(self) -> Tuple[np.ndarray, float]:
+        """Return (codes, step) for the current vectors, quantizing them if needed."""
+        if self._quantized is None:
+            if self.quantization == "scalar":
+                self._quantized = _scalar_quantize(self._vectors)
+            else:
+                self._quantized = (_binary_quantize(self._vectors), 1.0)
+        return self._quantized
+
+    def _code(self, column: str, value: Any, add: bool) -> Optional[int]:
+        vocab = self._vocab[column]
+        if value not in vocab and add:
+            vocab[value] = len(vocab)
+        return vocab.get(value)
+
+    def _encode_attrs(self, payload: Dict[str, Any]) -> List[float]:
+        row = []
+        for column in ATTR_COLUMNS:
+            value = payload.get(column)
+            if value is None or value == "":
+                row.append(np.nan)
+            elif column in CODED_COLUMNS:
+                row.append(float(self._code(column, str(value), add=True)))
+            else:
+                row.append(float(value))
+        return row
+
+    def upsert(self, points: List[VectorPoint]):
+        if not points:
+            return
+        paths = self._paths
+        with self._writing():
+            # Another process may have appended rows or added vocabulary codes
+            # (re-read unconditionally: mtimes can be too coarse to tell)
+            self._refresh()
+            self._vocab = json.loads(paths["vocab"].read_text())
+            matrix = np.asarray([point.vector for point in points], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+            attrs = np.asarray([self._encode_attrs(point.payload) for point in points], dtype=np.float64)
+
+            # Replace existing rows in place; append the rest
+            existing = [(i, self._rows[point.case_id]) for i, point in enumerate(points)
+                        if point.case_id in self._rows]
+            if existing:
+                vectors = np.load(paths["vectors"], mmap_mode="r+")
+                stored_attrs = np.load(paths["attrs"], mmap_mode="r+")
+                for i, row in existing:
+                    vectors[row] = matrix[i]
+                    stored_attrs[row] = attrs[i]
+                vectors.flush()
+                stored_attrs.flush()
+                del vectors, stored_attrs
+
+            replaced = {i for i, _ in existing}
+            new = [i for i in range(len(points)) if i not in replaced]
+            if new:
+                n = len(self._ids)
+                _truncate_npy(paths["vectors"], np.float32, (self.embed_dims,), n)
+                _truncate_npy(paths["attrs"], np.float64, (len(ATTR_COLUMNS),), n)
+                _truncate_npy(paths["ids"], np.int64, (), n)
+                _append_npy(paths["vectors"], matrix[new])
+                _append_npy(paths["attrs"], attrs[new])
+                self._write_vocab()
+                # ids.npy is appended last so readers never see ids without vectors
+                _append_npy(paths["ids"], np.asarray([points[i].case_id for i in new], dtype=np.int64))
+            else:
+                self._write_vocab()
+
+            self._stamp = None
+            self._refresh()
+
+    def _mask(self, conditions: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask of rows matching the profile conditions."""
+        mask = np.ones(len(self._ids), dtype=bool)
+        for field_name, value in conditions.items():
+            if field_name not in ATTR_COLUMNS:
+                continue
+            column = self._attrs[:, ATTR_COLUMNS.index(field_name)]
+            if isinstance(value, tuple):
+                lo, hi = value
+                if lo is not None:
+                    mask &= column >= lo
+                if hi is not None:
+                    mask &= column <= hi
+            elif field_name in CODED_COLUMNS:
+                values = value if isinstance(value, list) else [value]
+                codes = [self._code(field_name, str(v), add=False) for v in values]
+                mask &= np.isin(column, [c for c in codes if c is not None])
+            else:
+                mask &= column == float(value)
+        return mask
+
+    def _quantized_scores(self, query: np.ndarray, codes: np.ndarray, step: float) -> np.ndarray:
+        """Approximate cosine scores of every row from the quantized vectors."""
+        scores = np.empty(len(codes), dtype=np.float32)
+        if self.quantization == "binary":
+            query_bits = np.packbits(query > 0)
+            dims = len(query)
+            for start in range(0, len(codes), SCAN_CHUNK_ROWS):
+                chunk = codes[start:start + SCAN_CHUNK_ROWS]
+                distance = _POPCOUNT[np.bitwise_xor(chunk, query_bits)].sum(axis=1, dtype=np.int32)
+                scores[start:start + len(chunk)] = 1.0 - 2.0 * distance / dims
+        else:
+            for start in range(0, len(codes), SCAN_CHUNK_ROWS):
+                chunk = codes[start:start + SCAN_CHUNK_ROWS]
+                scores[start:start + len(chunk)] = (chunk.astype(np.float32) @ query) * step
+        return scores
+
+    def search(
+        self,
+        vector: List[float],
+        limit: int,
+        conditions: Optional[Dict[str, Any]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[VectorHit]:
+        return self.search_batch([vector], limit, [conditions], params)[0]
+
+    def search_batch(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        conditions: Optional[List[Optional[Dict[str, Any]]]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[List[VectorHit]]:
+        """Score all queries against the matrix in one multiplication (exact search)."""
+        params = params or DEFAULT_SEARCH_PARAMS
+        conditions = conditions or [None] * len(vectors)
+        quantized = self.quantization != "none" and not params.exact
+        with self._lock:
+            self._refresh()
+            stored, ids = self._vectors, self._ids
+            masks = [self._mask(c) if c else None for c in conditions]
+            codes, step = self._quantized_vectors() if quantized else (None, 1.0)
+        if len(ids) == 0 or limit <= 0 or not vectors:
+            return [[] for _ in vectors]
+
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = np.divide(queries, norms, out=np.zeros_like(queries), where=norms > 0)
+        if quantized:
+            score_rows = [self._quantized_scores(query, codes, step) for query in queries]
+        else:
+            score_rows = np.ascontiguousarray((stored @ queries.T).T)
+
+        return [
+            self._top_hits(scores, mask, query, stored, ids, limit, params, quantized)
+            for scores, mask, query in zip(score_rows, masks, queries)
+        ]
+
+    def _top_hits(
+        self,
+        scores: np.ndarray,
+        mask: Optional[np.ndarray],
+        query: np.ndarray,
+        stored: np.ndarray,
+        ids: np.ndarray,
+        limit: int,
+        params: SearchParams,
+        quantized: bool
+    ) -> List[VectorHit]:
+        """Select the best ``limit`` rows (matching ``mask``) from one query's scores."""
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return []
+            scores = scores[candidates]
+        else:
+            candidates = None
+
+        # Quantized search keeps oversampled candidates to rescore with the originals
+        rescore = quantized and params.rescore
+        k = min(math.ceil(limit * max(1.0, params.oversampling)) if rescore else limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows = top if candidates is None else candidates[top]
+        if rescore:
+            order = np.sort(rows)  # ascending reads from the memory map
+            exact = np.asarray(stored[order], dtype=np.float32) @ query
+            best = np.argsort(-exact, kind="stable")[:limit]
+            return [VectorHit(id=int(ids[order[i]]), score=float(exact[i])) for i in best]
+
+        order = np.argsort(-scores[top], kind="stable")
+        top, rows = top[order], rows[order]
+        return [VectorHit(id=int(ids[row]), score=float(scores[i])) for i, row in zip(top, rows)]
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    def originals_on_disk(self) -> bool:
+        # Quantized search only touches the memory-mapped originals of candidates
+        return self.quantization != "none"
+
+    def drop_collection(self):
+        with self._writing():
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self._stamp = None
+            self._vectors = np.empty((0, self.embed_dims), dtype=np.float32)
+            self._ids = np.empty((0,), dtype=np.int64)
+            self._attrs = np.empty((0, len(ATTR_COLUMNS)), dtype=np.float64)
+            self._rows = {}
+            self._quantized = None
+        print(f"NumPy vector index '{self.collection}' dropped")
@@ -0,0 +1,335 @@
+"""Qdrant vector backend (embedded or remote)."""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from qdrant_client import models
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, PayloadSchemaType,
+    Filter, IsEmptyCondition, PayloadField
+)
+from app.config import (
+    HNSW_EF_CONSTRUCT, HNSW_M, VECTOR_ON_DISK, VECTOR_PAYLOAD_MODE, VECTOR_SCALAR_QUANTILE
+)
+from app.services.filters import donor_site_key, to_qdrant_filter
+from app.services.qdrant_client import (
+    get_qdrant_client, get_async_qdrant_client, is_remote_qdrant
+)
+from app.services.vector_store.base import (
+    DEFAULT_SEARCH_PARAMS, SLIM_PAYLOAD_FIELDS, SearchParams, VectorBackend, VectorPoint
+)
+from app.utils.concurrency import limiter
+
+
+# Payload fields used for filtered search, and their index types
+PAYLOAD_INDEXES = {
+    "donor_site_key": PayloadSchemaType.KEYWORD,
+    "sex": PayloadSchemaType.KEYWORD,
+    "smoker": PayloadSchemaType.BOOL,
+    "bmi": PayloadSchemaType.FLOAT,
+    "defect_length_cm": PayloadSchemaType.FLOAT,
+}
+
+
+def _quantization_config(mode: str):
+    """Qdrant quantization config for VECTOR_QUANTIZATION (quantized vectors stay in RAM)."""
+    if mode == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=VECTOR_SCALAR_QUANTILE, always_ram=True
+            )
+        )
+    if mode == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def _hnsw_config() -> Optional[models.HnswConfigDiff]:
+    if HNSW_M is None and HNSW_EF_CONSTRUCT is None:
+        return None
+    return models.HnswConfigDiff(m=HNSW_M, ef_construct=HNSW_EF_CONSTRUCT)
+
+
+def _with_payload():
+    """
+    Payload selector for searches.
+
+    In slim mode only the slim fields are transferred, even from collections
+    still holding full payloads; retrieval hydrates the final results from SQLite.
+    """
+    return list(SLIM_PAYLOAD_FIELDS) if VECTOR_PAYLOAD_MODE == "slim" else True
+
+
+def _search_params(params: Optional[SearchParams]) -> models.SearchParams:
+    params = params or DEFAULT_SEARCH_PARAMS
+    return models.SearchParams(
+        hnsw_ef=params.hnsw_ef,
+        exact=params.exact,
+        quantization=models.QuantizationSearchParams(
+            rescore=params.rescore, oversampling=params.oversampling
+        )
+    )
+
+
+class QdrantBackend(VectorBackend):
+    """Stores vectors and their payloads (see VECTOR_PAYLOAD_MODE) in a Qdrant collection."""
+
+    name = "qdrant"
+    stores_payloads = True
+
+    def ensure_collection(self):
+        """Create the collection, payload indexes and backfill donor_site_key."""
+        client = get_qdrant_client()
+        
+        # Check if collection exists
+        collections = client.get_collections().collections
+        collection_names = [c.name for c in collections]
+        
+        if self.collection not in collection_names:
+            client.create_collection(
+                collection_name=self.collection,
+                vectors_config=VectorParams(
+                    size=self.embed_dims,
+                    distance=Distance.COSINE,
+                    on_disk=VECTOR_ON_DISK
+                ),
+                hnsw_config=_hnsw_config(),
+                quantization_config=_quantization_config(self.quantization)
+            )
+            print(f"Qdrant collection '{self.collection}' created (quantization: {self.quantization})")
+        else:
+            print(f"Qdrant collection '{self.collection}' already exists")
+            self._update_storage_config(client)
+        
+        self._ensure_payload_indexes(client)
+        self._backfill_donor_site_keys(client)
+
+    def _update_storage_config(self, client):
+        """Apply changed quantization / on-disk / HNSW settings to an existing collection."""
+        # Embedded Qdrant searches exactly and ignores these settings
+        if not is_remote_qdrant():
+            return
+        
+        config = client.get_collection(self.collection).config
+        current = config.quantization_config
+        current_mode = (
+            "scalar" if isinstance(current, models.ScalarQuantization)
+            else "binary" if isinstance(current, models.BinaryQuantization)
+            else "none"
+        )
+        changes: Dict[str, Any] = {}
+        if current_mode != self.quantization:
+            changes["quantization_config"] = (
+                _quantization_config(self.quantization) or models.Disabled.DISABLED
+            )
+        if bool(config.params.vectors.on_disk) != VECTOR_ON_DISK:
+            changes["vectors_config"] = {"": models.VectorParamsDiff(on_disk=VECTOR_ON_DISK)}
+        hnsw = _hnsw_config()
+        if hnsw is not None and (
+            (HNSW_M is not None and config.hnsw_config.m != HNSW_M)
+            or (HNSW_EF_CONSTRUCT is not None and config.hnsw_config.ef_construct != HNSW_EF_CONSTRUCT)
+        ):
+            changes["hnsw_config"] = hnsw
+        
+        if changes:
+            client.update_collection(collection_name=self.collection, **changes)
+            print(f"Qdrant collection '{self.collection}' updated: {', '.join(changes)}")
+
+    def _ensure_payload_indexes(self, client):
+        """Create payload indexes for the filterable profile fields (idempotent)."""
+        # Embedded Qdrant does not use payload indexes (filters are still applied)
+        if not is_remote_qdrant():
+            return
+        
+        existing = client.get_collection(self.collection).payload_schema or {}
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            if field_name not in existing:
+                client.create_payload_index(
+                    collection_name=self.collection,
+                    field_name=field_name,
+                    field_schema=schema
+                )
+                print(f"Qdrant payload index created on '{field_name}'")
+
+    def _backfill_donor_site_keys(self, client, page_size: int = 256):
+        """Add donor_site_key to points upserted before it was part of the payload."""
+        missing = Filter(
+            must=[IsEmptyCondition(is_empty=PayloadField(key="donor_site_key"))],
+            must_not=[IsEmptyCondition(is_empty=PayloadField(key="donor_site"))]
+        )
+        updated = 0
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=self.collection,
+                scroll_filter=missing,
+                limit=page_size,
+                offset=offset,
+                with_payload=["donor_site"],
+                with_vectors=False
+            )
+            by_key: Dict[str, List[int]] = {}
+            for point in points:
+                key = donor_site_key(point.payload.get("donor_site"))
+                if key:
+                    by_key.setdefault(key, []).append(point.id)
+            for key, ids in by_key.items():
+                client.set_payload(
+                    collection_name=self.collection,
+                    payload={"donor_site_key": key},
+                    points=ids
+                )
+                updated += len(ids)
+            if offset is None:
+                break
+        
+        if updated:
+            print(f"Backfilled donor_site_key on {updated} Qdrant point(s)")
+
+    def upsert(self, points: List[VectorPoint]):
+        get_qdrant_client().upsert(
+            collection_name=self.collection,
+            points=[
+                PointStruct(id=point.case_id, vector=point.vector, payload=point.payload)
+                for point in points
+            ]
+        )
+
+    def search(
+        self,
+        vector: List[float],
+        limit: int,
+        conditions: Optional[Dict[str, Any]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[Any]:
+        return get_qdrant_client().query_points(
+            collection_name=self.collection,
+            query=vector,
+            query_filter=to_qdrant_filter(conditions) if conditions else None,
+            search_params=_search_params(params),
+            limit=limit,
+            with_payload=_with_payload()
+        ).points
+
+    async def search_async(
+        self,
+        vector: List[float],
+        limit: int,
+        conditions: Optional[Dict[str, Any]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[Any]:
+        """Use AsyncQdrantClient when remote; embedded storage runs in a thread."""
+        async_client = get_async_qdrant_client()
+        if async_client is None:
+            return await super().search_async(vector, limit, conditions, params)
+        
+        async with limiter("vector_search"):
+            search_response = await async_client.query_points(
+                collection_name=self.collection,
+                query=vector,
+                query_filter=to_qdrant_filter(conditions) if conditions else None,
+                search_params=_search_params(params),
+                limit=limit,
+                with_payload=_with_payload()
+            )
+        return search_response.points
+
+    def _batch_requests(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        conditions: Optional[List[Optional[Dict[str, Any]]]],
+        params: Optional[SearchParams]
+    ) -> List[models.QueryRequest]:
+        search_params = _search_params(params)
+        conditions = conditions or [None] * len(vectors)
+        return [
+            models.QueryRequest(
+                query=vector,
+                filter=to_qdrant_filter(query_conditions) if query_conditions else None,
+                params=search_params,
+                limit=limit,
+                with_payload=_with_payload()
+            )
+            for vector, query_conditions in zip(vectors, conditions)
+        ]
+
+    def search_batch(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        conditions: Optional[List[Optional[Dict[str, Any]]]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[List[Any]]:
+        """Run all searches in one query_batch_points call."""
+        if not vectors:
+            return []
+        responses = get_qdrant_client().query_batch_points(
+            collection_name=self.collection,
+            requests=self._batch_requests(vectors, limit, conditions, params)
+        )
+        return [response.points for response in responses]
+
+    async def search_batch_async(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        conditions: Optional[List[Optional[Dict[str, Any]]]] = None,
+        params: Optional[SearchParams] = None
+    ) -> List[List[Any]]:
+        async_client = get_async_qdrant_client()
+        if async_client is None or not vectors:
+            return await super().search_batch_async(vectors, limit, conditions, params)
+        
+        async with limiter("vector_search"):
+            responses = await async_client.query_batch_points(
+                collection_name=self.collection,
+                requests=self._batch_requests(vectors, limit, conditions, params)
+            )
+        return [response.points for response in responses]
+
+    def scroll_payloads(self, page_size: int = 256) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        client = get_qdrant_client()
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=self.collection,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            if points:
+                yield [(point.id, point.payload or {}) for point in points]
+            if offset is None:
+                break
+
+    def overwrite_payloads(self, payloads: Dict[int, Dict[str, Any]]):
+        """Replace the payloads in one batch_update_points request."""
+        if not payloads:
+            return
+        get_qdrant_client().batch_update_points(
+            collection_name=self.collection,
+            update_operations=[
+                models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(payload=payload, points=[case_id])
+                )
+                for case_id, payload in payloads.items()
+            ]
+        )
+
+    def count(self) -> int:
+        return get_qdrant_client().count(collection_name=self.collection, exact=True).count
+
+    def originals_on_disk(self) -> bool:
+        return VECTOR_ON_DISK and is_remote_qdrant()
+
+    def drop_collection(self):
+        client = get_qdrant_client()
+        if client.collection_exists(self.collection):
+            client.delete_collection(self.collection)
+            print(f"Qdrant collection '{self.collection}' dropped")
+
+    def memory_stats(self) -> Dict[str, Any]:
+        stats = super().memory_stats()
+        if not is_remote_qdrant():
+            # Embedded Qdrant ignores quantization and keeps the originals in RAM
+            stats.update(quantization="none (embedded)", resident_bytes=stats["original_bytes"])
+        return stats
@@ -0,0 +1,220 @@
+"""Async helpers: bounded executors, per-dependency concurrency limits and request coalescing."""
+import asyncio
+import contextvars
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+from app.config import (
+    SQLITE_EXECUTOR_WORKERS, SINGLE_FLIGHT_ENABLED,
+    GEMINI_EMBED_CONCURRENCY, GEMINI_LLM_CONCURRENCY, VECTOR_SEARCH_CONCURRENCY
+)
+
+
+# Concurrency limit per external dependency
+LIMITS: Dict[str, int] = {
+    "gemini_embed": GEMINI_EMBED_CONCURRENCY,
+    "gemini_llm": GEMINI_LLM_CONCURRENCY,
+    "vector_search": VECTOR_SEARCH_CONCURRENCY,
+}
+
+_db_executor = ThreadPoolExecutor(
+    max_workers=SQLITE_EXECUTOR_WORKERS,
+    thread_name_prefix="sqlite"
+)
+_limiters: Dict[str, "Limiter"] = {}
+_flights: Dict[str, "SingleFlight"] = {}
+
+
+class Limiter:
+    """
+    Semaphore for one dependency that also counts in-flight and waiting calls.
+
+    asyncio primitives belong to one event loop, so each running loop gets
+    its own semaphore (TestClient instances and repeated asyncio.run calls
+    each start a new loop); the counters cover all of them.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self.total = 0
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore of the running loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    async def __aenter__(self):
+        self.waiting += 1
+        try:
+            await self._semaphore().acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.total += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._semaphore().release()
+
+
+def limiter(name: str) -> Limiter:
+    """Return the shared limiter bounding concurrent calls to a dependency."""
+    shared = _limiters.get(name)
+    if shared is None:
+        shared = Limiter(name, LIMITS[name])
+        _limiters[name] = shared
+    return shared
+
+
+def limiter_stats() -> Dict[str, Dict[str, int]]:
+    """Return limit / in-flight / waiting / total calls per dependency."""
+    return {
+        name: {
+            "limit": limit,
+            "in_flight": _limiters[name].in_flight if name in _limiters else 0,
+            "waiting": _limiters[name].waiting if name in _limiters else 0,
+            "total": _limiters[name].total if name in _limiters else 0,
+        }
+        for name, limit in LIMITS.items()
+    }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same keys into one upstream call.
+
+    The first caller for a key starts the call; callers arriving while it is
+    in flight await the same result (or exception) instead of calling again.
+    The call runs as its own task, so a caller that is cancelled does not
+    cancel it for the others; it inherits the first caller's context
+    (deadline, request timings). Calls are only shared within one event
+    loop, since their futures cannot be awaited from another.
+    """
+
+    def __init__(self, name: str, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self._loops = weakref.WeakKeyDictionary()  # event loop -> {key: asyncio.Future}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Return func() for key, sharing the result with concurrent callers."""
+        async def call_one(keys: List[Hashable]) -> List[Any]:
+            return [await func()]
+        return (await self.do_many([key], call_one))[0]
+
+    async def do_many(
+        self,
+        keys: List[Hashable],
+        func: Callable[[List[Hashable]], Awaitable[List[Any]]]
+    ) -> List[Any]:
+        """
+        Resolve many keys, joining calls already in flight.
+
+        Args:
+            keys: Distinct keys to resolve
+            func: Called once with the keys not already in flight; returns
+                one result per key, in order
+
+        Returns:
+            One result per key, in the order of ``keys``
+        """
+        if not self.enabled:
+            self.calls += 1
+            return await func(keys)
+
+        loop = asyncio.get_running_loop()
+        in_flight = self._loops.get(loop)
+        if in_flight is None:
+            in_flight = self._loops[loop] = {}
+        futures: Dict[Hashable, asyncio.Future] = {}
+        owned = []
+        for key in keys:
+            future = in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                futures[key] = future
+            else:
+                owned.append(key)
+
+        if owned:
+            self.calls += 1
+            owned_futures = [loop.create_future() for _ in owned]
+            for key, future in zip(owned, owned_futures):
+                in_flight[key] = futures[key] = future
+            task = asyncio.ensure_future(func(owned))
+            task.add_done_callback(functools.partial(self._settle, in_flight, owned, owned_futures))
+
+        return [await asyncio.shield(futures[key]) for key in keys]
+
+    def _settle(
+        self,
+        in_flight: Dict[Hashable, asyncio.Future],
+        keys: List[Hashable],
+        futures: List[asyncio.Future],
+        task: asyncio.Future
+    ):
+        """Hand a finished call's results (or exception) to everyone awaiting its keys."""
+        for key, future in zip(keys, futures):
+            if in_flight.get(key) is future:
+                del in_flight[key]
+        if task.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+        error = task.exception()
+        results = task.result() if error is None else [None] * len(futures)
+        for future, result in zip(futures, results):
+            if error is not None:
+                future.set_exception(error)
+                future.exception()  # retrieved: no "never retrieved" warning without waiters
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, int]:
+        in_flight = sum(len(keys) for keys in list(self._loops.values()))
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": in_flight}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """Return the shared request coalescer for a kind of upstream call."""
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights[name] = SingleFlight(name)
+    return flight
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Return upstream calls / coalesced callers / keys in flight per coalescer."""
+    return {name: flight.stats() for name, flight in _flights.items()}
+
+
+async def run_db(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run blocking SQLite work on the bounded database executor.
+
+    The executor's worker threads each hold their own pooled connection
+    (see app.db.connection), so the pool size also bounds open connections.
+    The caller's context variables (e.g. request timings) are carried over.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _db_executor, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+async def run_limited(name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call for a dependency in a worker thread under its limit."""
+    async with limiter(name):
+        return await asyncio.to_thread(func, *args, **kwargs)
@@ -0,0 +1,263 @@
+"""In-process Prometheus-style metrics and per-request timing spans."""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.config import METRICS_ENABLED
+
+
+# Latency buckets in seconds (Prometheus client defaults, plus 30s for LLM calls)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in items:
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {counts[-2]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {counts[-1]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {counts[-2]}"
+
+
+class GaugeCollector:
+    """Gauge whose samples are read from a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], List[Tuple[Labels, float]]]
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+STAGE_SECONDS = Histogram(
+    "cbr_stage_duration_seconds", "Duration of request pipeline stages.", ("stage",)
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "cbr_http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")
+)
+HTTP_REQUESTS = Counter(
+    "cbr_http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+RETRIEVAL_FALLBACKS = Counter(
+    "cbr_retrieval_fallbacks_total", "Retrievals answered by the keyword fallback.", ("reason",)
+)
+PROVIDER_RETRIES = Counter(
+    "cbr_provider_retries_total", "Provider calls retried after a transient error.", ("dependency",)
+)
+PROVIDER_HEDGES = Counter(
+    "cbr_provider_hedged_requests_total", "Duplicate (hedged) provider requests sent.", ("dependency",)
+)
+
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a pipeline stage.
+    
+    The duration is observed in cbr_stage_duration_seconds and, inside an HTTP
+    request, added to that request's Server-Timing header. Usable in sync and
+    async code (``with span("embed"): ...``).
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Begin collecting span durations for the current request."""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    """Format stage durations (seconds) as a Server-Timing header value."""
+    entries = [f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _cache_samples(field: str) -> List[Tuple[Labels, float]]:
+    """Read hit/miss/size counters from the embedding, LLM and retrieval caches."""
+    from app.services.embedding_cache import get_embedding_cache
+    from app.services.llm_cache import get_recommendation_cache
+    from app.services.retrieval_cache import get_retrieval_cache
+    
+    samples = []
+    for cache_name, cache in (
+        ("embedding", get_embedding_cache()),
+        ("recommendation", get_recommendation_cache()),
+        ("retrieval", get_retrieval_cache()),
+    ):
+        if cache is None:
+            continue
+        stats = cache.stats()
+        tiers = {"memory": stats["memory"], "disk": stats.get("disk")} if "memory" in stats else {"memory": stats}
+        for tier, tier_stats in tiers.items():
+            if tier_stats and field in tier_stats:
+                samples.append(((cache_name, tier), tier_stats[field]))
+    return samples
+
+
+# Circuit breaker state as a number for cbr_circuit_breaker_state
+BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _breaker_samples(field: str) -> List[Tuple[Labels, float]]:
+    from app.services.resilience import breaker_stats
+    samples = []
+    for name, stats in breaker_stats().items():
+        value = BREAKER_STATE_VALUES[stats["state"]] if field == "state" else stats[field]
+        samples.append(((name,), value))
+    return samples
+
+
+def _single_flight_samples(field: str) -> List[Tuple[Labels, float]]:
+    from app.utils.concurrency import single_flight_stats
+    return [((name,), stats[field]) for name, stats in single_flight_stats().items()]
+
+
+def _limiter_samples(field: str) -> List[Tuple[Labels, float]]:
+    from app.utils.concurrency import limiter_stats
+    return [((name,), stats[field]) for name, stats in limiter_stats().items()]
+
+
+REGISTRY = [
+    STAGE_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    RETRIEVAL_FALLBACKS,
+    PROVIDER_RETRIES,
+    PROVIDER_HEDGES,
+    GaugeCollector("cbr_cache_hits", "Cache hits since start.", ("cache", "tier"),
+                   lambda: _cache_samples("hits")),
+    GaugeCollector("cbr_cache_misses", "Cache misses since start.", ("cache", "tier"),
+                   lambda: _cache_samples("misses")),
+    GaugeCollector("cbr_cache_hit_ratio", "Cache hit ratio since start.", ("cache", "tier"),
+                   lambda: _cache_samples("hit_rate")),
+    GaugeCollector("cbr_cache_entries", "Entries held in memory.", ("cache", "tier"),
+                   lambda: _cache_samples("size")),
+    GaugeCollector("cbr_external_in_flight", "External calls currently in flight.", ("dependency",),
+                   lambda: _limiter_samples("in_flight")),
+    GaugeCollector("cbr_external_waiting", "External calls waiting for a concurrency slot.", ("dependency",),
+                   lambda: _limiter_samples("waiting")),
+    GaugeCollector("cbr_external_calls", "External calls started since start.", ("dependency",),
+                   lambda: _limiter_samples("total")),
+    GaugeCollector("cbr_single_flight_calls", "Upstream calls started by request coalescing since start.",
+                   ("flight",), lambda: _single_flight_samples("calls")),
+    GaugeCollector("cbr_single_flight_coalesced", "Calls that joined an identical in-flight call since start.",
+                   ("flight",), lambda: _single_flight_samples("coalesced")),
+    GaugeCollector("cbr_circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+                   ("dependency",), lambda: _breaker_samples("state")),
+    GaugeCollector("cbr_circuit_breaker_rejected", "Calls rejected by an open circuit breaker since start.",
+                   ("dependency",), lambda: _breaker_samples("rejected")),
+]
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,25 @@
+"""Newline-delimited JSON helpers for streamed request bodies."""
+from typing import AsyncIterator, Tuple
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Split a streamed byte body into NDJSON lines as they arrive.
+    
+    Args:
+        chunks: Async iterator of raw body chunks (e.g. ``request.stream()``)
+    
+    Yields:
+        (line_number, line) pairs, 1-based; blank lines are skipped
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
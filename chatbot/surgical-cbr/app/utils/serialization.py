@@ -0,0 +1,61 @@
+"""Fast JSON serialization for API responses (orjson when available)."""
+import json
+from typing import Any, Dict, Iterable, Optional
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# Columns of a cases row exposed through CaseResponse, in schema order
+CASE_RESPONSE_FIELDS = (
+    "title", "age", "sex", "bmi", "smoker", "defect_length_cm", "donor_site",
+    "technique_summary", "complications", "notes", "outcome_rating",
+    "imaging_meta", "case_id", "synthetic", "created_at",
+)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _iso_timestamp(value: Optional[str]) -> Optional[str]:
+    """Render a SQLite CURRENT_TIMESTAMP string the way pydantic renders datetimes."""
+    if isinstance(value, str) and len(value) > 10 and value[10] == " ":
+        return f"{value[:10]}T{value[11:]}"
+    return value
+
+
+def case_row_to_json(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a cases row like a serialized CaseResponse without building the model.
+    
+    Args:
+        row: Row dictionary from the cases table
+    
+    Returns:
+        Dictionary with exactly the CaseResponse fields
+    """
+    case = {field: row.get(field) for field in CASE_RESPONSE_FIELDS}
+    case["smoker"] = bool(case["smoker"])
+    case["synthetic"] = bool(case["synthetic"])
+    case["created_at"] = _iso_timestamp(case["created_at"])
+    return case
+
+
+def cases_to_json(rows: Iterable[Dict[str, Any]]) -> list:
+    """Shape several cases rows for a response."""
+    return [case_row_to_json(row) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with dumps() instead of the stdlib encoder."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
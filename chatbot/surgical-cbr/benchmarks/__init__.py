@@ -0,0 +1 @@
+"""Latency/throughput benchmarks for the CBR API (see README)."""
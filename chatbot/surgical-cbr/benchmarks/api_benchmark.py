@@ -0,0 +1,260 @@
+"""
+End-to-end latency/throughput benchmark for the CBR API.
+
+Builds (or reuses) a generated corpus in a scratch directory, serves the app
+in-process with the local embedding/LLM providers, and drives concurrent
+requests against each endpoint in turn. Reports p50/p95/p99 latency, requests
+per second and per-stage timings as JSON.
+
+    python benchmarks/api_benchmark.py --corpus-size 10000 --requests 500 \\
+        --concurrency 16 --output bench.json
+
+Pass --url to drive an already running server instead (no stage timings).
+"""
+import argparse
+import asyncio
+import functools
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    build_corpus, generate_case, generate_profile, prepare_environment,
+    report_meta, summarize, write_report
+)
+
+
+ENDPOINTS = ("query", "retrieve", "list_cases", "get_case", "create_case", "dream")
+
+
+class StageTimer:
+    """Collects per-stage durations by wrapping functions on their modules."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._restore: List[Callable[[], None]] = []
+
+    def _record(self, stage: str, started: float):
+        self.samples[stage].append((time.perf_counter() - started) * 1000.0)
+
+    def wrap(self, owner: Any, attribute: str, stage: str):
+        """Time every call to ``owner.attribute`` (sync or async) as ``stage``."""
+        original = getattr(owner, attribute)
+        
+        if asyncio.iscoroutinefunction(original):
+            @functools.wraps(original)
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    self._record(stage, started)
+        else:
+            @functools.wraps(original)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self._record(stage, started)
+        
+        setattr(owner, attribute, timed)
+        self._restore.append(lambda: setattr(owner, attribute, original))
+
+    def install(self):
+        """Instrument the retrieval, LLM and storage stages of the request path."""
+        from app.api import routes_cases, routes_query, routes_synthetic
+        from app.db import case_store
+        from app.services import retrieval
+        from app.services.vector_store import get_vector_backend
+        
+        self.wrap(retrieval, "embed_text_async", "embed_query")
+        self.wrap(get_vector_backend(), "search_async", "vector_search")
+        self.wrap(retrieval, "hydrate_hits", "hydrate")
+        self.wrap(retrieval, "score_results", "rerank")
+        self.wrap(routes_query, "retrieve_top_k_async", "retrieve")
+        self.wrap(routes_query, "recommend_async", "llm")
+        self.wrap(routes_cases, "embed_text_async", "embed_case")
+        self.wrap(routes_synthetic, "embed_text_async", "embed_case")
+        self.wrap(routes_synthetic, "generate_synthetic_case_async", "llm")
+        self.wrap(case_store, "insert_case_with_cursor", "sqlite_insert")
+        self.wrap(case_store, "get_case_by_id", "sqlite_get")
+        self.wrap(case_store, "get_cases_page", "sqlite_list")
+
+    def uninstall(self):
+        for restore in reversed(self._restore):
+            restore()
+        self._restore.clear()
+
+    def drain(self) -> Dict[str, Dict[str, Any]]:
+        """Return and reset the stage summaries."""
+        stages = {stage: summarize(samples) for stage, samples in sorted(self.samples.items())}
+        self.samples.clear()
+        return stages
+
+
+def request_factory(endpoint: str, rng: random.Random, corpus_size: int) -> Callable[[Any], Awaitable[Any]]:
+    """Return a coroutine function issuing one request of the given kind."""
+    async def query(client):
+        return await client.post("/api/v1/query", json={
+            "user_text": f"{rng.choice(('Leg', 'Hand', 'Scalp', 'Foot'))} defect after trauma",
+            "structured_profile": generate_profile(rng),
+            "top_k": 3,
+        })
+
+    async def retrieve(client):
+        return await client.post("/api/v1/query/retrieve", json={
+            "user_text": f"{rng.choice(('Leg', 'Hand', 'Scalp', 'Foot'))} defect after trauma",
+            "structured_profile": generate_profile(rng),
+            "top_k": 10,
+        })
+
+    async def list_cases(client):
+        return await client.get("/api/v1/cases", params={"limit": 100})
+
+    async def get_case(client):
+        return await client.get(f"/api/v1/cases/{rng.randint(1, corpus_size)}")
+
+    async def create_case(client):
+        return await client.post("/api/v1/cases", json=generate_case(rng, rng.randint(0, 10 ** 9)))
+
+    async def dream(client):
+        return await client.post("/api/v1/dream", json={
+            "description": f"{rng.choice(('Elderly', 'Young', 'Diabetic'))} patient, case {rng.random():.6f}"
+        })
+
+    return {
+        "query": query,
+        "retrieve": retrieve,
+        "list_cases": list_cases,
+        "get_case": get_case,
+        "create_case": create_case,
+        "dream": dream,
+    }[endpoint]
+
+
+async def drive(
+    client: Any,
+    send: Callable[[Any], Awaitable[Any]],
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Issue ``requests`` requests from ``concurrency`` workers; summarize latency."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await send(client)
+                if response.status_code >= 400:
+                    errors[str(response.status_code)] += 1
+                    continue
+            except Exception as e:
+                errors[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": dict(errors),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": summarize(latencies),
+    }
+
+
+async def run(args: argparse.Namespace, corpus_size: int) -> Dict[str, Any]:
+    """Run every selected endpoint phase and collect the results."""
+    import httpx
+    
+    timer: Optional[StageTimer] = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from app.main import app
+        timer = StageTimer()
+        timer.install()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout
+        )
+    
+    rng = random.Random(args.seed)
+    results = {}
+    try:
+        for endpoint in args.endpoints:
+            send = request_factory(endpoint, rng, corpus_size)
+            if args.warmup:
+                await drive(client, send, args.warmup, args.concurrency)
+                if timer:
+                    timer.drain()
+            print(f"Benchmarking {endpoint}: {args.requests} requests, concurrency {args.concurrency}")
+            results[endpoint] = await drive(client, send, args.requests, args.concurrency)
+            if timer:
+                results[endpoint]["stages_ms"] = timer.drain()
+    finally:
+        await client.aclose()
+        if timer:
+            timer.uninstall()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end CBR API benchmark")
+    parser.add_argument("--corpus-size", type=int, default=1000, help="cases in the generated corpus")
+    parser.add_argument("--workdir", default=None, help="scratch directory (reused across runs)")
+    parser.add_argument("--backend", default="numpy", choices=("numpy", "qdrant"))
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--caches", action="store_true", help="enable embedding/LLM/retrieval caches")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="simulated embedding latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated LLM latency")
+    parser.add_argument("--url", default=None, help="benchmark a running server instead")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+    
+    corpus_size = args.corpus_size
+    if not args.url:
+        workdir = Path(args.workdir or Path(__file__).parent / ".work" / f"{args.backend}-{corpus_size}")
+        prepare_environment(
+            workdir,
+            vector_backend=args.backend,
+            caches=args.caches,
+            embed_latency_ms=args.embed_latency_ms,
+            llm_latency_ms=args.llm_latency_ms
+        )
+        corpus_size = build_corpus(corpus_size, seed=args.seed)
+    
+    results = asyncio.run(run(args, corpus_size))
+    write_report({
+        "meta": report_meta(
+            benchmark="api",
+            corpus_size=corpus_size,
+            backend=None if args.url else args.backend,
+            url=args.url,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            caches=args.caches,
+            embed_latency_ms=args.embed_latency_ms,
+            llm_latency_ms=args.llm_latency_ms,
+        ),
+        "endpoints": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Shared helpers for the benchmark scripts: environment, corpus, statistics, reports."""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+TITLES = ("Free Flap", "Pedicled Flap", "Perforator Flap", "Local Flap", "Composite Flap")
+REGIONS = ("hand", "forearm", "lower leg", "foot", "scalp", "head and neck", "breast", "trunk")
+DONOR_SITES = (
+    "anterolateral thigh", "radial forearm", "latissimus dorsi", "fibula",
+    "gracilis", "deep inferior epigastric", "scapular", "medial sural",
+)
+COMPLICATIONS = (
+    None, "Partial flap necrosis", "Venous congestion requiring re-exploration",
+    "Donor site seroma", "Minor wound dehiscence", "Hematoma evacuated on day 1",
+)
+
+
+def prepare_environment(
+    workdir: Path,
+    vector_backend: str = "numpy",
+    caches: bool = False,
+    embed_latency_ms: float = 0.0,
+    llm_latency_ms: float = 0.0
+):
+    """
+    Point the app at an isolated working directory with the local providers.
+    
+    Must run before anything under ``app`` is imported (config is read at import).
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    flag = "true" if caches else "false"
+    os.environ.update({
+        "DB_PATH": str(workdir / "cases.db"),
+        "QDRANT_PATH": str(workdir / "qdrant_data"),
+        "QDRANT_HOST": "",
+        "VECTOR_INDEX_PATH": str(workdir / "vector_index"),
+        "VECTOR_BACKEND": vector_backend,
+        "EMBED_PROVIDER": "local",
+        "LLM_PROVIDER": "local",
+        "GEMINI_API_KEY": "",
+        "LOCAL_EMBED_LATENCY_MS": str(embed_latency_ms),
+        "LOCAL_LLM_LATENCY_MS": str(llm_latency_ms),
+        "EMBED_CACHE_ENABLED": flag,
+        "EMBED_CACHE_PATH": str(workdir / "embed_cache.db"),
+        "LLM_CACHE_ENABLED": flag,
+        "LLM_CACHE_PATH": str(workdir / "llm_cache.db"),
+        "RETRIEVAL_CACHE_ENABLED": flag,
+    })
+    sys.path.insert(0, str(BASE_DIR))
+
+
+def generate_case(rng: random.Random, index: int) -> Dict[str, Any]:
+    """Generate one plausible CaseCreate-shaped case."""
+    donor_site = rng.choice(DONOR_SITES)
+    region = rng.choice(REGIONS)
+    return {
+        "title": f"{donor_site.title()} {rng.choice(TITLES)} for {region.title()} Reconstruction #{index}",
+        "age": rng.randint(18, 85),
+        "sex": rng.choice(("M", "F")),
+        "bmi": round(rng.uniform(17.0, 40.0), 1),
+        "smoker": rng.random() < 0.25,
+        "defect_length_cm": round(rng.uniform(1.0, 30.0), 1),
+        "donor_site": donor_site,
+        "technique_summary": (
+            f"{donor_site.title()} flap harvested with {rng.randint(6, 16)}cm pedicle. "
+            f"Anastomosis to recipient vessels in the {region}. "
+            f"{rng.choice(('Primary closure', 'Split-thickness skin graft'))} of donor site."
+        ),
+        "complications": rng.choice(COMPLICATIONS),
+        "notes": rng.choice((None, "Doppler monitoring showed good flow.", "Prolonged ischemia time.")),
+        "outcome_rating": rng.randint(1, 5),
+        "imaging_meta": rng.choice((None, "CT angiogram: patent vessels")),
+    }
+
+
+def generate_cases(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` deterministic cases."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield generate_case(rng, index)
+
+
+def generate_profile(rng: random.Random) -> Dict[str, Any]:
+    """Generate a query profile."""
+    return {
+        "age": rng.randint(18, 85),
+        "sex": rng.choice(("M", "F")),
+        "bmi": round(rng.uniform(17.0, 40.0), 1),
+        "smoker": rng.random() < 0.25,
+        "defect_length_cm": round(rng.uniform(1.0, 30.0), 1),
+        "donor_site": rng.choice(DONOR_SITES),
+    }
+
+
+def build_corpus(size: int, seed: int = 0, chunk_size: int = 2000) -> int:
+    """
+    Create the schema and vector collection and fill them up to ``size`` cases.
+    
+    An existing corpus in the working directory is reused (and topped up).
+    
+    Returns:
+        Number of cases in the corpus
+    """
+    from app.config import EMBED_MODEL, EMBED_DIMS
+    from app.db import case_store
+    from app.db.connection import get_read_connection
+    from app.services.embeddings import embed_texts
+    
+    case_store.init_sqlite()
+    case_store.init_vector_store()
+    
+    existing = get_read_connection().execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+    if existing >= size:
+        return existing
+    
+    started = time.perf_counter()
+    cases = list(generate_cases(size, seed))[existing:]
+    for start in range(0, len(cases), chunk_size):
+        chunk = cases[start:start + chunk_size]
+        blob_texts = [case_store.build_blob_text(case) for case in chunk]
+        case_store.insert_cases_batch(
+            chunk, blob_texts, EMBED_MODEL, EMBED_DIMS, vectors=embed_texts(blob_texts)
+        )
+    print(f"Built corpus of {size} cases in {time.perf_counter() - started:.1f}s")
+    return size
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, Optional[float]]:
+    """Latency summary (milliseconds) of a list of samples."""
+    if not samples_ms:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    values = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit (with a -dirty suffix for uncommitted changes)."""
+    try:
+        revision = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+        dirty = subprocess.call(
+            ["git", "diff", "--quiet", "HEAD", "--", "."], cwd=BASE_DIR, stderr=subprocess.DEVNULL
+        )
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report_meta(**settings: Any) -> Dict[str, Any]:
+    """Metadata identifying a benchmark run."""
+    return {
+        "git_revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **settings,
+    }
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]):
+    """Print the report as JSON and optionally write it to a file."""
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+        print(f"Report written to {output}")
+    print(text)
@@ -0,0 +1,58 @@
+"""
+Compare two benchmark reports (e.g. from two commits).
+
+    python benchmarks/compare.py base.json new.json
+
+Prints the relative change of latency percentiles, throughput and
+micro-benchmark timings; negative latency / positive rps changes are better.
+"""
+import argparse
+import json
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def _delta(old: Optional[float], new: Optional[float]) -> str:
+    if old is None or new is None:
+        return "n/a"
+    if old == 0:
+        return "+inf%" if new else "0.0%"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def _rows(base: Dict[str, Any], new: Dict[str, Any]) -> Iterator[Tuple[str, Any, Any]]:
+    """Yield (metric, base value, new value) for every comparable metric."""
+    for endpoint, result in new.get("endpoints", {}).items():
+        old = base.get("endpoints", {}).get(endpoint)
+        if not old:
+            continue
+        yield f"{endpoint} rps", old.get("rps"), result.get("rps")
+        for pct in ("p50", "p95", "p99"):
+            yield f"{endpoint} {pct} ms", old["latency_ms"].get(pct), result["latency_ms"].get(pct)
+        for stage, stats in result.get("stages_ms", {}).items():
+            old_stage = old.get("stages_ms", {}).get(stage)
+            if old_stage:
+                yield f"{endpoint} stage {stage} p50 ms", old_stage.get("p50"), stats.get("p50")
+    for name, result in new.get("results", {}).items():
+        old = base.get("results", {}).get(name)
+        if old:
+            yield f"{name} best us", old.get("best_us"), result.get("best_us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    args = parser.parse_args()
+    
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    
+    print(f"base: {base['meta'].get('git_revision')}  new: {new['meta'].get('git_revision')}")
+    for metric, old, current in _rows(base, new):
+        print(f"{metric:45} {str(old):>12} {str(current):>12} {_delta(old, current):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmarks for hot helpers on the request and ingest paths.
+
+    python benchmarks/micro_benchmark.py --output micro.json
+
+Each benchmark reports the best and mean time per operation over several
+repeats, in microseconds.
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import generate_case, generate_profile, prepare_environment, report_meta, write_report
+
+
+def measure(func: Callable[[], Any], number: int, repeat: int, ops_per_call: int = 1) -> Dict[str, Any]:
+    """Time ``func`` ``number`` times per repeat; return per-operation stats (µs)."""
+    func()  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / (number * ops_per_call))
+    best = min(timings)
+    return {
+        "best_us": round(best * 1e6, 3),
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 3),
+        "ops_per_s": round(1.0 / best, 1) if best else None,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CBR micro-benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+    parser.add_argument("--insert-batch", type=int, default=500, help="cases per batched SQLite insert")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+    
+    workdir = Path(tempfile.mkdtemp(prefix="cbr-micro-"))
+    prepare_environment(workdir)
+    
+    from app.config import EMBED_MODEL, EMBED_DIMS
+    from app.db import case_store
+    from app.services.llm_client import extract_flags
+    from app.services.providers.local import TemplateLLMProvider
+    from app.services.reranking import rerank
+    from app.services.retrieval import compute_feature_score
+    
+    case_store.init_sqlite()
+    rng = random.Random(args.seed)
+    cases = [generate_case(rng, i) for i in range(max(args.insert_batch, 1000))]
+    for i, case in enumerate(cases):
+        case["case_id"] = i + 1
+    profile = generate_profile(rng)
+    candidates = cases[:20]
+    embedding_scores = [rng.random() for _ in candidates]
+    llm_text = TemplateLLMProvider(latency_ms=0)._render('"case_id": 1 "case_id": 2', "recommendation")
+    n = lambda count: max(1, int(count * args.scale))
+    
+    def sqlite_insert_single():
+        case = {**rng.choice(cases), "case_id": None}
+        case_store.insert_cases_batch([case], [case_store.build_blob_text(case)], EMBED_MODEL, EMBED_DIMS)
+    
+    batch = [{**case, "case_id": None} for case in cases[:args.insert_batch]]
+    batch_blobs = [case_store.build_blob_text(case) for case in batch]
+    
+    def sqlite_insert_batch():
+        case_store.insert_cases_batch(batch, batch_blobs, EMBED_MODEL, EMBED_DIMS)
+    
+    benchmarks = {
+        "build_blob_text": lambda: measure(
+            lambda: [case_store.build_blob_text(case) for case in cases[:100]], n(200), args.repeat, 100),
+        "compute_feature_score": lambda: measure(
+            lambda: [compute_feature_score(case, profile) for case in candidates], n(500), args.repeat, len(candidates)),
+        "rerank_20_candidates": lambda: measure(
+            lambda: rerank(candidates, embedding_scores, profile, 3), n(500), args.repeat),
+        "extract_flags": lambda: measure(lambda: extract_flags(llm_text), n(2000), args.repeat),
+        "sqlite_insert_single": lambda: measure(sqlite_insert_single, n(200), args.repeat),
+        "sqlite_insert_batch_per_case": lambda: measure(
+            sqlite_insert_batch, n(5), args.repeat, len(batch)),
+    }
+    
+    results = {}
+    try:
+        for name, bench in benchmarks.items():
+            print(f"Running {name}...")
+            results[name] = bench()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    write_report({
+        "meta": report_meta(benchmark="micro", insert_batch=args.insert_batch, scale=args.scale),
+        "results": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Recall and memory of quantized vector storage against exact search.
+
+    python benchmarks/recall_benchmark.py --corpus-size 20000 --output recall.json
+
+Every quantization mode gets its own collection holding the same generated
+corpus. Each query's exact top-k (a full float32 scan) is the ground truth;
+the report gives recall@k, search latency and the estimated vector memory
+per mode. Embedded Qdrant always searches exactly, so run the qdrant backend
+against a server (QDRANT_HOST) to measure its quantization.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    generate_cases, generate_profile, prepare_environment, report_meta, summarize, write_report
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantization recall benchmark")
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20, help="hits per search (RETRIEVAL_TOP_K)")
+    parser.add_argument("--backend", choices=("numpy", "qdrant"), default="numpy")
+    parser.add_argument("--modes", default="none,scalar,binary", help="quantization modes to compare")
+    parser.add_argument("--dims", type=int, default=None, help="EMBED_DIMS for the corpus")
+    parser.add_argument("--oversampling", type=float, default=None)
+    parser.add_argument("--no-rescore", action="store_true")
+    parser.add_argument("--hnsw-ef", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="cbr-recall-"))
+    prepare_environment(workdir, vector_backend=args.backend)
+    if args.dims:
+        os.environ["EMBED_DIMS"] = str(args.dims)
+
+    from app.config import EMBED_DIMS
+    from app.db import case_store
+    from app.services.providers import get_embedding_provider
+    from app.services.retrieval import build_query_blob, search_params
+    from app.services.vector_store import VectorPoint, create_backend
+
+    try:
+        provider = get_embedding_provider()
+        cases = list(generate_cases(args.corpus_size, args.seed))
+        blob_texts = [case_store.build_blob_text(case) for case in cases]
+        print(f"Embedding {len(cases)} cases ({EMBED_DIMS} dims)...")
+        points = [
+            VectorPoint(case_id=i + 1, vector=vector, payload=case_store.build_payload(case, i + 1, blob))
+            for i, (case, blob, vector) in enumerate(zip(cases, blob_texts, provider.embed(blob_texts)))
+        ]
+        rng = random.Random(args.seed + 1)
+        queries = provider.embed([
+            build_query_blob("", generate_profile(rng)) for _ in range(args.queries)
+        ])
+
+        exact_params = search_params(exact=True)
+        params = search_params(
+            hnsw_ef=args.hnsw_ef,
+            rescore=False if args.no_rescore else None,
+            oversampling=args.oversampling
+        )
+        truth = None
+        results = {}
+        for mode in args.modes.split(","):
+            backend = create_backend(args.backend, f"recall_{mode}", quantization=mode)
+            backend.ensure_collection()
+            for start in range(0, len(points), 1000):
+                backend.upsert(points[start:start + 1000])
+            if truth is None:
+                truth = [
+                    {hit.id for hit in backend.search(query, args.top_k, params=exact_params)}
+                    for query in queries
+                ]
+
+            backend.search(queries[0], args.top_k, params=params)  # warm up (builds the quantized copy)
+            latencies, recalls = [], []
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                hits = backend.search(query, args.top_k, params=params)
+                latencies.append((time.perf_counter() - started) * 1000.0)
+                recalls.append(len(expected & {hit.id for hit in hits}) / max(1, len(expected)))
+
+            memory = backend.memory_stats()
+            results[mode] = {
+                "recall_at_k": round(sum(recalls) / len(recalls), 4),
+                "min_recall_at_k": round(min(recalls), 4),
+                "search_ms": summarize(latencies),
+                "memory": memory,
+                "memory_reduction": round(memory["original_bytes"] / max(1, memory["resident_bytes"]), 1),
+            }
+            print(f"{mode}: recall@{args.top_k}={results[mode]['recall_at_k']}, "
+                  f"memory x{results[mode]['memory_reduction']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report({
+        "meta": report_meta(
+            benchmark="recall", backend=args.backend, corpus_size=args.corpus_size,
+            queries=args.queries, top_k=args.top_k, dims=EMBED_DIMS,
+            search_params={
+                "hnsw_ef": params.hnsw_ef, "rescore": params.rescore, "oversampling": params.oversampling
+            },
+        ),
+        "results": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
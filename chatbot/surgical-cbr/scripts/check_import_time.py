@@ -0,0 +1,68 @@
+"""Check that importing the app stays within its cold-start budget."""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Heavy SDKs that must only be loaded on first use, never by `import app.main`
+LAZY_MODULES = ("google.generativeai", "qdrant_client")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Import a module in a fresh interpreter; return its import time and loaded modules."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=BASE_DIR,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    """Measure the import time (best of N cold runs) and fail over the budget."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument(
+        "--budget-ms", type=float,
+        default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1000")),
+        help="maximum import time in milliseconds (IMPORT_TIME_BUDGET_MS)"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(max(1, args.runs))]
+    best_ms = min(run["seconds"] for run in runs) * 1000
+    loaded = set(runs[0]["modules"])
+    eager = [name for name in LAZY_MODULES if name in loaded]
+
+    print(f"import {args.module}: {best_ms:.0f} ms (best of {len(runs)}, budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if best_ms > args.budget_ms:
+        print("FAIL: import time is over budget (run `python -X importtime -c 'import "
+              f"{args.module}'` to find the slow imports)")
+        failed = True
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Script to rewrite stored vector payloads for VECTOR_PAYLOAD_MODE (e.g. full -> slim)."""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import case_store
+from app.config import VECTOR_PAYLOAD_MODE
+from app.services.vector_store import PAYLOAD_MODES
+
+
+def main():
+    """Overwrite the payloads of the active collection in place (no re-embedding)."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=PAYLOAD_MODES, default=VECTOR_PAYLOAD_MODE)
+    parser.add_argument("--page-size", type=int, default=256)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args()
+    
+    case_store.init_sqlite()
+    backend = case_store.ready_vector_backend()
+    if not backend.stores_payloads:
+        print(f"The {backend.name} backend stores no payloads; nothing to migrate")
+        return
+    
+    stats = case_store.migrate_vector_payloads(args.mode, args.page_size, args.dry_run)
+    verb = "Would update" if args.dry_run else "Updated"
+    print(
+        f"{verb} {stats['updated']} of {stats['points']} point(s) in '{stats['collection']}' "
+        f"to {stats['mode']} payloads ({stats['orphaned']} without a SQLite case)"
+    )
+    print(f"Payload size: {stats['payload_bytes_before']} -> {stats['payload_bytes_after']} bytes (JSON)")
+
+
+if __name__ == "__main__":
+    main()
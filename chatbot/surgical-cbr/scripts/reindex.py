@@ -0,0 +1,46 @@
+"""Script to re-embed all cases after EMBED_MODEL / EMBED_DIMS change."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import case_store
+from app.services import reindex
+from app.config import REINDEX_BATCH_SIZE, REINDEX_CONCURRENCY
+
+
+def main():
+    """Run (or resume) a reindex job and swap the active collection when done."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=REINDEX_CONCURRENCY)
+    parser.add_argument("--force", action="store_true", help="rebuild even if no case is stale")
+    parser.add_argument("--status", action="store_true", help="only print the current status")
+    parser.add_argument(
+        "--drop-previous", action="store_true",
+        help="delete the collection replaced by the last swap"
+    )
+    args = parser.parse_args()
+    
+    case_store.init_sqlite()
+    if args.status:
+        print(reindex.get_reindex_status())
+        return
+    if args.drop_previous:
+        dropped = reindex.drop_previous_collection()
+        print(f"Dropped previous collection '{dropped}'" if dropped else "No previous collection retained")
+        return
+    
+    result = asyncio.run(reindex.run_reindex(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        force=args.force
+    ))
+    print(f"Reindex result: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.db import case_store
-from app.services.embeddings import embed_text
+from app.services.embeddings import embed_texts
 from app.config import BASE_DIR
 
 
@@ -20,10 +20,10 @@ def main():
     
     print("Initializing database...")
     case_store.init_sqlite()
-    case_store.init_qdrant()
+    case_store.init_vector_store()
     
     print(f"Seeding cases from {seed_file}...")
-    case_store.batch_seed_from_json(seed_file, embed_text)
+    case_store.batch_seed_from_json(seed_file, embed_texts)
     
     print("Seeding complete!")
 
@@ -0,0 +1,38 @@
+"""Shared fixtures: the app on a throwaway database with the offline providers."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Settings are read at import time, so they are set before the app is imported
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="surgical-cbr-tests-"))
+os.environ.update({
+    "DB_PATH": str(_WORK_DIR / "cases.db"),
+    "EMBED_CACHE_PATH": str(_WORK_DIR / "embed_cache.db"),
+    "LLM_CACHE_PATH": str(_WORK_DIR / "llm_cache.db"),
+    "VECTOR_BACKEND": "numpy",
+    "VECTOR_INDEX_PATH": str(_WORK_DIR / "vector_index"),
+    "EMBED_PROVIDER": "local",
+    "LLM_PROVIDER": "local",
+    "RETRIEVAL_CACHE_ENABLED": "false",
+    "PROVIDER_MAX_RETRIES": "0",
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient for the app, seeded with seed/seed_cases.json."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db import case_store
+    from app.services.embeddings import embed_texts
+    
+    with TestClient(app) as test_client:
+        if not case_store.get_all_cases():
+            case_store.batch_seed_from_json(BASE_DIR / "seed" / "seed_cases.json", embed_texts)
+        yield test_client
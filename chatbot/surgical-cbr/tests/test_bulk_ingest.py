@@ -0,0 +1,40 @@
+"""POST /cases/bulk: a chunk whose vectors cannot be stored leaves no rows behind."""
+import json
+
+from app.db.connection import get_read_connection
+from app.services.vector_store import get_vector_backend
+
+CASE = {
+    "title": "Fibula free flap for mandible", "age": 61, "sex": "M", "bmi": 26.5,
+    "smoker": False, "defect_length_cm": 9.0, "donor_site": "fibula",
+    "technique_summary": "Osteocutaneous fibula flap with two osteotomies.", "outcome_rating": 4,
+}
+
+
+def _case_count():
+    return get_read_connection().execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+
+def _bulk(client, cases):
+    body = "\n".join(json.dumps(case) for case in cases)
+    return client.post("/api/v1/cases/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+
+def test_failed_vector_upsert_inserts_nothing(client, monkeypatch):
+    def unavailable(points):
+        raise ConnectionError("vector store down")
+    
+    before = _case_count()
+    monkeypatch.setattr(get_vector_backend(), "upsert", unavailable)
+    response = _bulk(client, [CASE, {**CASE, "title": "Second fibula flap"}])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (0, 2)
+    assert all(result["error"].startswith("Insert failed") for result in body["results"])
+    assert _case_count() == before
+    
+    # The retried import stores each case once
+    monkeypatch.undo()
+    body = _bulk(client, [CASE, {**CASE, "title": "Second fibula flap"}]).json()
+    assert (body["inserted"], body["failed"]) == (2, 0)
+    assert _case_count() == before + 2
@@ -0,0 +1,24 @@
+"""Shared limiters and coalescers work across event loops."""
+import asyncio
+
+from app.utils.concurrency import Limiter, SingleFlight
+
+
+def test_limiter_and_single_flight_survive_a_new_event_loop():
+    limiter = Limiter("test", 1)
+    flight = SingleFlight("test", enabled=True)
+    
+    async def work():
+        async with limiter:
+            await asyncio.sleep(0.01)
+        return "done"
+    
+    async def session():
+        # Contended, so the semaphore and the shared future bind to this loop
+        results = await asyncio.gather(work(), work(), flight.do("key", work), flight.do("key", work))
+        assert results == ["done"] * 4
+    
+    asyncio.run(session())
+    asyncio.run(session())  # e.g. a second TestClient or asyncio.run in a CLI
+    assert limiter.in_flight == 0 and limiter.total == 6
+    assert flight.stats() == {"calls": 2, "coalesced": 2, "in_flight": 0}
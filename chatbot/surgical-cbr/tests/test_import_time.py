@@ -0,0 +1,17 @@
+"""Cold-start budget: `import app.main` stays fast and loads no SDK eagerly."""
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def test_import_time_within_budget():
+    # Fresh interpreters, so modules already imported by the test run do not count
+    result = subprocess.run(
+        [sys.executable, str(BASE_DIR / "scripts" / "check_import_time.py")],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
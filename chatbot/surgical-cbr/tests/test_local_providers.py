@@ -0,0 +1,33 @@
+"""The local providers honour the per-request timeout on their async paths."""
+import asyncio
+import time
+
+import pytest
+
+from app.services.providers.local import HashingEmbeddingProvider, TemplateLLMProvider
+
+
+async def _stream(llm, timeout):
+    return "".join([chunk async for chunk in llm.stream_async("prompt", timeout=timeout)])
+
+
+def test_async_calls_time_out():
+    embedder = HashingEmbeddingProvider(dims=8, latency_ms=500)
+    llm = TemplateLLMProvider(latency_ms=500, fixture_path=None)
+    calls = [
+        lambda: embedder.embed_async(["fibula flap"], timeout=0.02),
+        lambda: llm.generate_async("prompt", timeout=0.02),
+        lambda: _stream(llm, 0.02),
+    ]
+    for call in calls:
+        started = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            asyncio.run(call())
+        assert time.perf_counter() - started < 0.3
+
+
+def test_async_calls_within_the_timeout_complete():
+    embedder = HashingEmbeddingProvider(dims=8, latency_ms=10)
+    llm = TemplateLLMProvider(latency_ms=10, fixture_path=None)
+    assert len(asyncio.run(embedder.embed_async(["fibula flap"], timeout=1.0))[0]) == 8
+    assert asyncio.run(llm.generate_async("prompt", timeout=1.0)) == asyncio.run(_stream(llm, 1.0))
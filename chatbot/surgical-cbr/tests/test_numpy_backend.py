@@ -0,0 +1,75 @@
+"""NumPy index: concurrent writer processes and recovery from interrupted appends."""
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from app.services.vector_store import VectorPoint
+from app.services.vector_store.numpy_backend import ATTR_COLUMNS, NumpyBackend, _append_npy
+
+BASE_DIR = Path(__file__).parent.parent
+DIMS = 8
+
+WRITER = """
+import sys
+import numpy as np
+from app.services.vector_store import VectorPoint
+from app.services.vector_store.numpy_backend import NumpyBackend
+
+root, worker = sys.argv[1], int(sys.argv[2])
+backend = NumpyBackend("shared", root=root, embed_dims=8)
+backend.ensure_collection()
+for batch in range(20):
+    case_ids = [worker * 1000 + batch * 5 + i for i in range(5)]
+    backend.upsert([
+        VectorPoint(case_id=case_id, vector=np.random.default_rng(case_id).normal(size=8).tolist(),
+                    payload={"donor_site_key": f"site_{worker}_{batch}", "sex": f"sex_{worker}"})
+        for case_id in case_ids
+    ])
+"""
+
+
+def _vector(case_id):
+    return np.random.default_rng(case_id).normal(size=DIMS).tolist()
+
+
+def _point(case_id, donor_site_key):
+    return VectorPoint(case_id=case_id, vector=_vector(case_id), payload={"donor_site_key": donor_site_key})
+
+
+def test_concurrent_writer_processes_keep_rows_and_codes_consistent(tmp_path):
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WRITER, str(tmp_path), str(worker)], cwd=BASE_DIR)
+        for worker in range(4)
+    ]
+    assert [worker.wait(timeout=120) for worker in workers] == [0] * 4
+
+    backend = NumpyBackend("shared", root=tmp_path, embed_dims=DIMS)
+    assert backend.count() == 4 * 20 * 5
+    for worker in range(4):
+        for batch in (0, 7, 19):
+            case_id = worker * 1000 + batch * 5 + 3
+            conditions = {"donor_site_key": f"site_{worker}_{batch}", "sex": f"sex_{worker}"}
+            hits = backend.search(_vector(case_id), 10, conditions)
+            assert sorted(hit.id for hit in hits) == [worker * 1000 + batch * 5 + i for i in range(5)]
+            assert hits[0].id == case_id
+
+
+def test_rows_left_by_an_interrupted_append_are_discarded(tmp_path):
+    backend = NumpyBackend("crashed", root=tmp_path, embed_dims=DIMS)
+    backend.ensure_collection()
+    backend.upsert([_point(1, "fibula")])
+
+    # A writer died after appending vectors and attrs but before ids
+    _append_npy(backend.dir / "vectors.npy", np.ones((2, DIMS), dtype=np.float32))
+    _append_npy(backend.dir / "attrs.npy", np.zeros((2, len(ATTR_COLUMNS))))
+
+    backend = NumpyBackend("crashed", root=tmp_path, embed_dims=DIMS)
+    backend.upsert([_point(2, "scapula"), _point(3, "fibula")])
+    assert backend.count() == 3
+    for case_id, donor_site_key in ((1, "fibula"), (2, "scapula"), (3, "fibula")):
+        hits = backend.search(_vector(case_id), 1, {"donor_site_key": donor_site_key})
+        assert hits[0].id == case_id
+        assert abs(hits[0].score - 1.0) < 1e-5
+    assert np.load(backend.dir / "vectors.npy").shape == (3, DIMS)
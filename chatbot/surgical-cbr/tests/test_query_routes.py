@@ -0,0 +1,17 @@
+"""POST /query keeps its own HTTP errors instead of reporting them as 500."""
+from app.api import routes_query
+
+QUERY = {
+    "user_text": "fibula free flap for mandible",
+    "structured_profile": {"bmi": 27, "smoker": False, "defect_length_cm": 8, "donor_site": "fibula"},
+}
+
+
+def test_no_matches_is_404(client, monkeypatch):
+    async def no_matches(**kwargs):
+        return []
+
+    monkeypatch.setattr(routes_query, "retrieve_top_k_async", no_matches)
+    response = client.post("/api/v1/query", json=QUERY)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No matching cases found"
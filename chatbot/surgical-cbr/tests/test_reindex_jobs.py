@@ -0,0 +1,68 @@
+"""Reindex jobs are run by one process at a time; inserts for a retired collection are refused."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.config import EMBED_DIMS, EMBED_MODEL, VECTOR_BACKEND
+from app.db import case_store
+from app.db.connection import get_read_connection, write_transaction
+from app.services import reindex
+from app.services.vector_store import create_backend
+
+BASE_DIR = Path(__file__).parent.parent
+
+CASE = {
+    "title": "Scapular flap for maxilla", "age": 55, "sex": "M", "bmi": 25.0,
+    "smoker": False, "defect_length_cm": 6.0, "donor_site": "scapula",
+    "technique_summary": "Scapular tip flap for the orbital floor.", "outcome_rating": 4,
+}
+
+
+def _case_count():
+    return get_read_connection().execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+
+@pytest.fixture
+def abandon_jobs():
+    yield
+    with write_transaction() as conn:
+        conn.execute("UPDATE reindex_jobs SET status = 'abandoned' WHERE status = 'running'")
+        conn.execute("DELETE FROM reindex_leases")
+
+
+def test_only_one_owner_holds_a_job(client, abandon_jobs):
+    job = reindex._claim_job("worker-a")
+    assert job is not None
+    assert reindex._claim_job("worker-b") is None
+    assert reindex._claim_job("worker-a")['job_id'] == job['job_id']
+
+    # A run in another process skips the job instead of copying alongside
+    result = subprocess.run(
+        [sys.executable, str(BASE_DIR / "scripts" / "reindex.py"), "--force"],
+        cwd=BASE_DIR, env=dict(os.environ), capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "running_elsewhere" in result.stdout
+    assert reindex.get_job(job['job_id'])['status'] == 'running'
+
+    # Once the lease lapses the job can be taken over, and the old owner stops
+    with write_transaction() as conn:
+        conn.execute("UPDATE reindex_leases SET expires_at = 0")
+    assert reindex._claim_job("worker-b")['job_id'] == job['job_id']
+    with pytest.raises(reindex.LeaseLostError):
+        reindex._checkpoint(job['job_id'], "worker-a", 1, 1)
+    reindex._checkpoint(job['job_id'], "worker-b", 1, 1)
+
+
+def test_insert_embedded_for_a_retired_collection_is_refused(client):
+    retired = create_backend(VECTOR_BACKEND, "retired_collection", embed_model=EMBED_MODEL, embed_dims=EMBED_DIMS)
+    before = _case_count()
+    with pytest.raises(case_store.CollectionSwappedError):
+        case_store.insert_cases_batch(
+            [CASE], [case_store.build_blob_text(CASE)], EMBED_MODEL, EMBED_DIMS,
+            vectors=[[0.1] * EMBED_DIMS], backend=retired
+        )
+    assert _case_count() == before
@@ -0,0 +1,69 @@
+"""Reindex swaps made by another process are picked up without a restart."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.config import EMBED_DIMS, EMBED_MODEL, VECTOR_INDEX_PATH
+from app.db import case_store
+from app.services import reindex
+from app.services.vector_store import active_collection_name, get_vector_backend
+
+BASE_DIR = Path(__file__).parent.parent
+
+QUERY = {
+    "user_text": "fibula free flap for mandible",
+    "structured_profile": {"bmi": 27, "smoker": False, "defect_length_cm": 8, "donor_site": "fibula"},
+}
+
+CASE = {
+    "title": "Radial forearm flap for floor of mouth",
+    "age": 58, "sex": "F", "bmi": 24.0, "smoker": False,
+    "defect_length_cm": 4.0, "donor_site": "radial forearm",
+    "technique_summary": "Radial forearm free flap with primary closure.", "outcome_rating": 4,
+}
+
+
+def _reindex_script(*args, **env):
+    result = subprocess.run(
+        [sys.executable, str(BASE_DIR / "scripts" / "reindex.py"), *args],
+        cwd=BASE_DIR,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def test_swap_by_another_process_is_picked_up(client):
+    assert client.post("/api/v1/query/retrieve", json=QUERY).status_code == 200
+    original = active_collection_name()
+
+    # This process stays configured for EMBED_MODEL/EMBED_DIMS
+    _reindex_script("--force", EMBED_MODEL="hashing-test", EMBED_DIMS="256")
+    status = reindex.get_reindex_status()
+    assert status["previous_collection"] == original
+    assert (status["active_embed_model"], status["active_embed_dims"]) == ("hashing-test", 256)
+
+    response = client.post("/api/v1/query/retrieve", json=QUERY)
+    assert response.status_code == 200
+    assert response.json()["top_matches"][0]["retrieval_source"] == "vector"
+    backend = get_vector_backend()
+    assert backend.collection == status["active_collection"]
+    assert (backend.embed_model, backend.embed_dims) == ("hashing-test", 256)
+
+    # New cases are embedded and stamped for the active collection
+    assert client.post("/api/v1/cases", json=CASE).status_code == 201
+    assert case_store.count_stale_cases("hashing-test", 256) == 0
+
+    assert f"'{original}'" in _reindex_script("--drop-previous")
+    assert not (VECTOR_INDEX_PATH / original).exists()
+    assert reindex.get_reindex_status()["previous_collection"] is None
+
+    # Back to the configured embedding for the other tests
+    _reindex_script("--force")
+    _reindex_script("--drop-previous")
+    assert client.post("/api/v1/query/retrieve", json=QUERY).status_code == 200
+    assert (get_vector_backend().embed_model, get_vector_backend().embed_dims) == (EMBED_MODEL, EMBED_DIMS)
+    assert case_store.count_stale_cases() == 0
@@ -0,0 +1,81 @@
+"""The vectorized rerank matches scoring each case with compute_feature_score."""
+import random
+
+import pytest
+
+from app.config import EMBEDDING_WEIGHT, FEATURE_WEIGHT
+from app.services.reranking import rerank
+from app.services.retrieval import compute_feature_score
+
+DONOR_SITES = ["fibula", "Fibula", "radial forearm", "ALT", "alt", "scapula", ""]
+
+
+def _maybe(rng, value):
+    """The value, or one of the ways a field can be missing."""
+    return rng.choice([value, value, value, None, 0, "absent"])
+
+
+def _record(fields):
+    return {key: value for key, value in fields.items() if value != "absent"}
+
+
+def _case(rng, case_id):
+    return _record({
+        "case_id": case_id,
+        "defect_length_cm": _maybe(rng, round(rng.uniform(1, 25), 1)),
+        "bmi": _maybe(rng, round(rng.uniform(16, 45), 1)),
+        "smoker": rng.choice([True, False, 1, 0, None, "absent"]),
+        "donor_site": rng.choice(DONOR_SITES + [None, "absent"]),
+    })
+
+
+def _profile(rng):
+    return _record({
+        "defect_length_cm": rng.choice([round(rng.uniform(1, 25), 1), 0, None, "absent"]),
+        "bmi": rng.choice([round(rng.uniform(16, 45), 1), 0, None, "absent"]),
+        "smoker": rng.choice([True, False, None, "absent"]),
+        "donor_site": rng.choice(DONOR_SITES + [None, "absent"]),
+    })
+
+
+def _scalar_rerank(candidates, embedding_scores, profile, top_k):
+    """The per-case scoring loop rerank replaced."""
+    scored = []
+    for case, embedding_score in zip(candidates, embedding_scores):
+        feature = max(0, min(1, compute_feature_score(case, profile)))
+        embedding = max(0, min(1, embedding_score))
+        scored.append({
+            **case,
+            "final_score": FEATURE_WEIGHT * feature + EMBEDDING_WEIGHT * embedding,
+            "embedding_score": embedding,
+            "feature_score": feature,
+        })
+    scored.sort(key=lambda case: case["final_score"], reverse=True)
+    return scored[:top_k]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_rerank_matches_scalar_scoring(seed):
+    rng = random.Random(seed)
+    candidates = [_case(rng, case_id) for case_id in range(rng.randint(1, 30))]
+    # Out-of-range similarities are clipped; repeated ones produce ties
+    embedding_scores = [rng.choice([round(rng.uniform(-0.2, 1.2), 2), 0.5]) for _ in candidates]
+    profile = _profile(rng)
+    top_k = rng.randint(1, len(candidates))
+
+    expected = _scalar_rerank(candidates, embedding_scores, profile, top_k)
+    actual = rerank([dict(case) for case in candidates], embedding_scores, profile, top_k)
+
+    assert [case["case_id"] for case in actual] == [case["case_id"] for case in expected]
+    for got, want in zip(actual, expected):
+        for field in ("final_score", "embedding_score", "feature_score"):
+            assert got[field] == want[field], (field, got, profile)
+
+
+def test_rerank_mismatches_score_zero():
+    profile = {"smoker": True, "donor_site": "Fibula"}
+    case = {"case_id": 1, "smoker": 0, "donor_site": "radial forearm"}
+    assert compute_feature_score(case, profile) == 0.0
+    [result] = rerank([case], [1.0], profile, 1)
+    assert result["feature_score"] == 0.0
+    assert result["feature_components"] == {"defect": None, "donor": 0.0, "smoker": 0.0, "bmi": None}
@@ -0,0 +1,45 @@
+"""Batch retrieval: the same embedding timeout and search parameters as a single query."""
+import asyncio
+import time
+
+from app.services import retrieval
+from app.services.vector_store import get_vector_backend
+
+QUERY = {
+    "user_text": "fibula free flap for mandible",
+    "structured_profile": {"bmi": 27, "smoker": False, "defect_length_cm": 8, "donor_site": "fibula"},
+}
+OTHER = {
+    "user_text": "radial forearm flap for floor of mouth",
+    "structured_profile": {"bmi": 23, "smoker": True, "defect_length_cm": 4, "donor_site": "radial forearm"},
+}
+
+
+def test_slow_batch_embedding_falls_back_to_keyword(client, monkeypatch):
+    async def slow_embed(texts, **kwargs):
+        await asyncio.sleep(2)
+
+    monkeypatch.setattr(retrieval, "embed_texts_async", slow_embed)
+    monkeypatch.setattr(retrieval, "RETRIEVAL_EMBED_TIMEOUT_MS", 50.0)
+    started = time.perf_counter()
+    results = asyncio.run(retrieval.retrieve_top_k_batch_async([QUERY, OTHER]))
+    assert time.perf_counter() - started < 1.0
+    assert all(results)
+    assert all(case["retrieval_source"] == "keyword" for cases in results for case in cases)
+
+
+def test_batch_queries_are_searched_with_their_own_params(client, monkeypatch):
+    backend = get_vector_backend()
+    searches = []
+    search_batch_async = backend.search_batch_async
+
+    async def recorded(vectors, limit, conditions=None, params=None):
+        searches.append((len(vectors), params))
+        return await search_batch_async(vectors, limit, conditions, params)
+
+    monkeypatch.setattr(backend, "search_batch_async", recorded)
+    results = asyncio.run(retrieval.retrieve_top_k_batch_async([
+        QUERY, {**OTHER, "exact": True}, {**QUERY, "user_text": "fibula flap", "exact": True}
+    ]))
+    assert all(results)
+    assert sorted((count, params.exact) for count, params in searches) == [(1, False), (2, True)]
@@ -0,0 +1,65 @@
+"""Retrieval cache: near-identical profiles share hits, never each other's scores."""
+import asyncio
+
+from app.config import EMBEDDING_WEIGHT, FEATURE_WEIGHT
+from app.services import retrieval
+from app.services.retrieval_cache import RetrievalCache
+
+PROFILE = {"bmi": 24, "smoker": True, "defect_length_cm": 6.1, "donor_site": "radial forearm"}
+# Rounds to the same cache key as PROFILE, but scores cases differently
+NEARBY = {**PROFILE, "bmi": 24.2, "defect_length_cm": 5.9}
+TEXT = "radial forearm flap dehiscence"
+
+
+def _feature_scores(results):
+    """Feature scores by case (the similarity term comes from the cached hits)."""
+    return {case["case_id"]: (case["feature_score"], case["feature_components"]) for case in results}
+
+
+def _is_ranked(results):
+    """final_score combines each result's own scores and orders the results."""
+    finals = [case["final_score"] for case in results]
+    return finals == sorted(finals, reverse=True) and all(
+        case["final_score"] == FEATURE_WEIGHT * case["feature_score"] + EMBEDDING_WEIGHT * case["embedding_score"]
+        for case in results
+    )
+
+
+def _count_embeddings(monkeypatch):
+    calls = []
+    embed_text, embed_text_async = retrieval.embed_text, retrieval.embed_text_async
+    
+    def counted(*args):
+        calls.append(args[0])
+        return embed_text(*args)
+    
+    async def counted_async(*args):
+        calls.append(args[0])
+        return await embed_text_async(*args)
+    
+    monkeypatch.setattr(retrieval, "embed_text", counted)
+    monkeypatch.setattr(retrieval, "embed_text_async", counted_async)
+    return calls
+
+
+def test_cache_hit_is_reranked_for_the_exact_profile(client, monkeypatch):
+    expected = _feature_scores(retrieval.retrieve_top_k(TEXT, NEARBY, top_k=20))
+    
+    cache = RetrievalCache()
+    monkeypatch.setattr(retrieval, "get_retrieval_cache", lambda: cache)
+    calls = _count_embeddings(monkeypatch)
+    
+    first = retrieval.retrieve_top_k(TEXT, PROFILE, top_k=20)
+    nearby = retrieval.retrieve_top_k(TEXT, NEARBY, top_k=20)
+    nearby_async = asyncio.run(retrieval.retrieve_top_k_async(TEXT, NEARBY, top_k=20))
+    [nearby_batch] = asyncio.run(retrieval.retrieve_top_k_batch_async([
+        {"user_text": TEXT, "structured_profile": NEARBY, "top_k": 20}
+    ]))
+    
+    # The nearby queries reused the first query's hits
+    assert len(calls) == 1
+    assert len(cache.memory) == 1 and cache.stats()["hits"] == 3
+    for results in (nearby, nearby_async, nearby_batch):
+        assert _feature_scores(results) == expected
+        assert _is_ranked(results)
+    assert _feature_scores(first) != expected
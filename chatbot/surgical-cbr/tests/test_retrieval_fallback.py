@@ -0,0 +1,53 @@
+"""Keyword fallback: only for an unavailable provider, and labelled as keyword results."""
+import pytest
+
+from app.services import retrieval
+
+QUERY = {
+    "user_text": "fibula free flap for mandible",
+    "structured_profile": {"bmi": 27, "smoker": False, "defect_length_cm": 8, "donor_site": "fibula"},
+}
+
+
+def _failing_embedding(error):
+    async def embed(text, *args):
+        raise error
+    return embed
+
+
+def test_vector_matches_report_embedding_score(client):
+    response = client.post("/api/v1/query/retrieve", json=QUERY)
+    assert response.status_code == 200
+    matches = response.json()["top_matches"]
+    assert matches
+    for match in matches:
+        assert match["retrieval_source"] == "vector"
+        assert match["embedding_score"] is not None
+        assert match["keyword_score"] is None
+
+
+def test_unavailable_provider_falls_back_to_keyword(client, monkeypatch):
+    monkeypatch.setattr(retrieval, "embed_text_async", _failing_embedding(ConnectionError("down")))
+    response = client.post("/api/v1/query/retrieve", json=QUERY)
+    assert response.status_code == 200
+    matches = response.json()["top_matches"]
+    assert matches
+    for match in matches:
+        assert match["retrieval_source"] == "keyword"
+        assert match["embedding_score"] is None
+        assert match["keyword_score"] is not None
+
+
+@pytest.mark.parametrize("error", [RuntimeError("bug"), KeyError("bmi"), ValueError("GEMINI_API_KEY not configured")])
+def test_other_errors_are_not_hidden(client, monkeypatch, error):
+    monkeypatch.setattr(retrieval, "embed_text_async", _failing_embedding(error))
+    assert client.post("/api/v1/query/retrieve", json=QUERY).status_code == 500
+
+
+def test_hybrid_matches_report_fused_score(client):
+    response = client.post("/api/v1/query/retrieve", json={**QUERY, "retrieval_mode": "hybrid"})
+    assert response.status_code == 200
+    for match in response.json()["top_matches"]:
+        assert match["retrieval_source"] == "hybrid"
+        assert match["fused_score"] is not None
+        assert match["embedding_score"] is None
@@ -0,0 +1,51 @@
+"""ETags of POST /query/retrieve: degraded answers must never be revalidated."""
+from app.services import retrieval
+
+QUERY = {
+    "user_text": "radial forearm flap dehiscence",
+    "structured_profile": {"bmi": 24, "smoker": True, "defect_length_cm": 6, "donor_site": "radial forearm"},
+}
+
+
+def test_etag_revalidates(client):
+    response = client.post("/api/v1/query/retrieve", json=QUERY)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    
+    revalidated = client.post("/api/v1/query/retrieve", json=QUERY, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+
+def test_fallback_then_recover_then_revalidate(client, monkeypatch):
+    async def unavailable(text, *args):
+        raise ConnectionError("embedding provider down")
+    
+    # Provider down: keyword fallback, flagged and without an ETag
+    monkeypatch.setattr(retrieval, "embed_text_async", unavailable)
+    degraded = client.post("/api/v1/query/retrieve", json=QUERY)
+    assert degraded.status_code == 200
+    assert degraded.json()["fallback"] is True
+    assert "etag" not in degraded.headers
+    assert degraded.headers["cache-control"] == "no-store"
+    
+    # Provider back: full vector results with an ETag
+    monkeypatch.undo()
+    recovered = client.post("/api/v1/query/retrieve", json=QUERY)
+    assert recovered.status_code == 200
+    body = recovered.json()
+    assert body["fallback"] is False
+    assert all(match["retrieval_source"] == "vector" for match in body["top_matches"])
+    etag = recovered.headers["etag"]
+    
+    # Revalidating the recovered answer hits; nothing from the outage could be sent
+    revalidated = client.post("/api/v1/query/retrieve", json=QUERY, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+
+def test_profiles_sharing_a_cache_key_get_different_etags(client):
+    # BMI 24 and 24.2 round to the same retrieval cache key, but score differently
+    first = client.post("/api/v1/query/retrieve", json=QUERY)
+    other = {**QUERY, "structured_profile": {**QUERY["structured_profile"], "bmi": 24.2}}
+    second = client.post("/api/v1/query/retrieve", json=other, headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]